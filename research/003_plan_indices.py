@@ -0,0 +1,95 @@
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+# Planes de las consultas "últimos N eventos por máquina" con y sin el índice (machineID, datetime DESC)
+# INCLUDE, sobre datos sintéticos de N máquinas x M años en un schema desechable.
+#
+# El 'sin índice' quita sólo ese índice (DROP INDEX dentro de una transacción que se deshace): el
+# planner sigue teniendo la PK y los demás índices, así la diferencia es atribuible al índice nuevo.
+# DB_SCHEMA y DATA_PATH se fijan ANTES de importar src, como en 010_benchmark_suite.py.
+BENCH_SCHEMA = "pdm_benchmark"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="EXPLAIN (ANALYZE, BUFFERS) con y sin los índices de acceso por máquina.")
+    parser.add_argument("--machines", type=int, default=1_000)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--machine-id", type=int, default=None, help="Máquina consultada (por defecto la del medio).")
+    parser.add_argument("--keep", action="store_true", help="No borra el schema ni los CSV al terminar.")
+    return parser.parse_args()
+
+args = parse_args()
+data_dir = Path(tempfile.mkdtemp(prefix="pdm_synthetic_"))
+os.environ["DB_SCHEMA"] = BENCH_SCHEMA
+os.environ["DATA_PATH"] = str(data_dir)
+
+from sqlalchemy import select, text  # noqa: E402
+
+from src.database.session import engine  # noqa: E402
+from src.models.error import Error  # noqa: E402
+from src.models.failure import Failure  # noqa: E402
+from src.models.maintenance import Maintenance  # noqa: E402
+from src.models.telemetry import Telemetry  # noqa: E402
+from src.services.ingestion import create_tables, ingest_csv_to_db  # noqa: E402
+from src.services.synthetic_data import generate_dataset  # noqa: E402
+
+# Mismas consultas "últimos N eventos por máquina" que ejecuta update_dashboard, con el índice que las sirve
+def dashboard_queries(machine_id: int):
+    return {
+        "telemetry": ("ix_telemetry_machine_datetime", select(Telemetry.datetime, Telemetry.volt, Telemetry.rotate, Telemetry.pressure, Telemetry.vibration)
+            .filter(Telemetry.machineID == machine_id).order_by(Telemetry.datetime.desc()).limit(200)),
+        "errors": ("ix_errors_machine_datetime", select(Error.datetime, Error.errorID)
+            .filter(Error.machineID == machine_id).order_by(Error.datetime.desc()).limit(10)),
+        "failures": ("ix_failures_machine_datetime", select(Failure.datetime, Failure.failure, Failure.id)
+            .filter(Failure.machineID == machine_id).order_by(Failure.datetime.desc()).limit(10)),
+        "maint": ("ix_maint_machine_datetime", select(Maintenance.datetime, Maintenance.comp)
+            .filter(Maintenance.machineID == machine_id).order_by(Maintenance.datetime.desc()).limit(10)),
+    }
+
+def explain(conn, query) -> tuple[str, str, str]:
+    """(nodo principal de acceso, buffers, tiempo de ejecución) de EXPLAIN (ANALYZE, BUFFERS)."""
+    sql = str(query.compile(engine, compile_kwargs={"literal_binds": True}))
+    conn.execute(text(sql)).all()  # misma caché para las dos variantes
+    plan = [row[0] for row in conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"))]
+    access = next((line.strip().lstrip("-> ") for line in plan if "Scan" in line), plan[0])
+    buffers = next((line.strip() for line in plan if line.strip().startswith("Buffers")), "")
+    timing = next((line for line in plan if line.startswith("Execution Time")), "")
+    return access.split("  ")[0], buffers, timing
+
+def run():
+    print(f"🧪 Generando {args.machines:,} máquinas x {args.years} años en {data_dir}...")
+    rows = generate_dataset(data_dir, args.machines, args.years)
+    print(f"   {', '.join(f'{k} {v:,}' for k, v in rows.items())}")
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCH_SCHEMA}" CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA "{BENCH_SCHEMA}"'))
+    create_tables()
+    ingest_csv_to_db()
+
+    machine_id = args.machine_id or max(1, args.machines // 2)
+    with engine.connect() as conn:
+        conn.execute(text(f'ANALYZE "{BENCH_SCHEMA}".telemetry, "{BENCH_SCHEMA}".errors, "{BENCH_SCHEMA}".failures, "{BENCH_SCHEMA}".maint'))
+        conn.commit()
+        for name, (index, query) in dashboard_queries(machine_id).items():
+            after = explain(conn, query)
+            conn.commit()
+            # Sin el índice nuevo: se quita dentro de la transacción y se restaura con el ROLLBACK
+            conn.execute(text(f'DROP INDEX "{BENCH_SCHEMA}"."{index}"'))
+            before = explain(conn, query)
+            conn.rollback()
+
+            print(f"📊 {name} (máquina {machine_id})")
+            print(f"   sin {index}: {before[0]:<70} {before[1]:<40} {before[2]}")
+            print(f"   con {index}: {after[0]:<70} {after[1]:<40} {after[2]}")
+
+if __name__ == "__main__":
+    try:
+        run()
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCH_SCHEMA}" CASCADE'))
+            for path in data_dir.glob("*.csv"):
+                path.unlink()
+            data_dir.rmdir()
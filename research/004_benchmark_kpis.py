@@ -0,0 +1,78 @@
+import time
+import polars as pl
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+from src.analysis.reliability_metrics import get_processed_data
+from src.core.config import settings
+from src.database.base import Base
+from src.database.session import engine
+from src.models.failure import Failure
+from src.models.maintenance import Maintenance
+
+# Schema desechable con los eventos reales replicados N veces (máquinas desplazadas por 'offset')
+BENCH_SCHEMA = "pdm_benchmark"
+translate = {settings.DB_SCHEMA: BENCH_SCHEMA}
+bench_engine = engine.execution_options(schema_translate_map=translate)
+
+def build_scaled(scale: int):
+    src, dst = settings.DB_SCHEMA, BENCH_SCHEMA
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{dst}" CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA "{dst}"'))
+        Base.metadata.create_all(conn.execution_options(schema_translate_map=translate))
+        offset = conn.execute(text(f'SELECT max("machineID") FROM "{src}".machines')).scalar()
+        conn.execute(text(
+            f'INSERT INTO "{dst}".machines ("machineID", model, age) '
+            f'SELECT m."machineID" + k * {offset}, m.model, m.age FROM "{src}".machines m, generate_series(0, {scale - 1}) k'
+        ))
+        for table, column in [("failures", "failure"), ("maint", "comp")]:
+            conn.execute(text(
+                f'INSERT INTO "{dst}".{table} (datetime, "machineID", {column}) '
+                f'SELECT e.datetime, e."machineID" + k * {offset}, e.{column} FROM "{src}".{table} e, generate_series(0, {scale - 1}) k'
+            ))
+        conn.execute(text(f'ANALYZE "{dst}".failures; ANALYZE "{dst}".maint'))
+
+def legacy_processed_data(bind):
+    """Ruta anterior: objetos ORM -> dicts -> Polars -> diff().over('machineID')."""
+    with Session(bind) as db:
+        fail_results = db.execute(select(Failure)).scalars().all()
+        maint_results = db.execute(select(Maintenance)).scalars().all()
+
+        df_fail = pl.DataFrame([{"machineID": f.machineID, "datetime": f.datetime, "type": "failure"} for f in fail_results])
+        df_maint = pl.DataFrame([{"machineID": m.machineID, "datetime": m.datetime, "type": "maint"} for m in maint_results])
+
+        df_combined = pl.concat([df_fail, df_maint]).sort(["machineID", "datetime", "type"])
+        df_combined = df_combined.with_columns(pl.col("datetime").diff().over("machineID").alias("diff"))
+        return df_combined.group_by("machineID").agg([
+            pl.col("diff").filter(pl.col("type") == "failure").dt.total_hours().mean().alias("MTBF_hours"),
+            pl.col("diff").filter(pl.col("type") == "maint").dt.total_hours().mean().alias("MTTR_hours"),
+            pl.col("type").filter(pl.col("type") == "failure").count().alias("total_failures"),
+        ]).fill_null(0)
+
+def timed(fn, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def run():
+    for scale in (1, 10, 100):
+        build_scaled(scale)
+        t_orm, orm = timed(lambda: legacy_processed_data(bench_engine))
+        t_sql, sql = timed(lambda: get_processed_data(bind=bench_engine))
+
+        # Ambas rutas deben producir los mismos KPIs
+        joined = orm.sort("machineID").join(sql, on="machineID", suffix="_sql")
+        same = all((joined[c] - joined[f"{c}_sql"]).abs().max() < 1e-9 for c in ["MTBF_hours", "MTTR_hours", "total_failures"])
+
+        print(f"⏱ x{scale:<4} máquinas={sql.height:>7,}  ORM: {t_orm:7.3f}s  SQL: {t_sql:7.3f}s  "
+              f"speedup x{t_orm / t_sql:5.1f}  {'✅ iguales' if same else '❌ difieren'}")
+
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCH_SCHEMA}" CASCADE'))
+
+if __name__ == "__main__":
+    run()
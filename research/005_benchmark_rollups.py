@@ -0,0 +1,56 @@
+import time
+import polars as pl
+from sqlalchemy import func, select
+
+from src.analysis.telemetry_rollups import SENSORS, fleet_summary, rollup_series
+from src.database.session import engine
+from src.models.telemetry import Telemetry
+
+# Vistas de rango largo: telemetría cruda vs rollups (ambas deben dar los mismos estadísticos)
+
+def raw_fleet_summary(conn) -> pl.DataFrame:
+    t = Telemetry.__table__
+    aggregates = [func.count().label("samples")]
+    for s in SENSORS:
+        aggregates += [
+            func.avg(t.c[s]).label(f"{s}_mean"),
+            func.min(t.c[s]).label(f"{s}_min"),
+            func.max(t.c[s]).label(f"{s}_max"),
+            func.stddev_samp(t.c[s]).label(f"{s}_std"),
+        ]
+    query = select(t.c.machineID, *aggregates).group_by(t.c.machineID).order_by(t.c.machineID)
+    return pl.read_database(query, connection=conn)
+
+def raw_daily_series(conn, machine_id: int) -> pl.DataFrame:
+    t = Telemetry.__table__
+    day = func.date_trunc("day", t.c.datetime)
+    query = (
+        select(day.label("bucket"), *[func.avg(t.c[s]).label(f"{s}_mean") for s in SENSORS])
+        .where(t.c.machineID == machine_id).group_by(day).order_by(day)
+    )
+    return pl.read_database(query, connection=conn)
+
+def timed(fn, repeat: int = 5):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def run():
+    with engine.connect() as conn:
+        t_raw, raw = timed(lambda: raw_fleet_summary(conn))
+        t_rollup, rollup = timed(lambda: fleet_summary(conn, "weekly"))
+        joined = raw.join(rollup, on="machineID", suffix="_r")
+        diff = max(float((joined[c] - joined[f"{c}_r"]).abs().max()) for c in raw.columns[1:])
+        print(f"⏱ Comparativa de flota   cruda: {t_raw * 1000:8.1f} ms  rollup: {t_rollup * 1000:8.1f} ms  "
+              f"speedup x{t_raw / t_rollup:6.1f}  máx. diferencia {diff:.1e}")
+
+        t_raw, _ = timed(lambda: raw_daily_series(conn, 1))
+        t_rollup, _ = timed(lambda: rollup_series(conn, 1, "daily"))
+        print(f"⏱ Historia diaria máq. 1 cruda: {t_raw * 1000:8.1f} ms  rollup: {t_rollup * 1000:8.1f} ms  "
+              f"speedup x{t_raw / t_rollup:6.1f}")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,36 @@
+import asyncio
+import time
+from sqlalchemy import select
+
+from src.api.v1.streaming import ndjson_lines
+from src.models.telemetry import Telemetry
+from src.services.columnar_export import export_stream
+
+# Extracto completo de telemetría: NDJSON (cursor + filas) vs Arrow IPC / Parquet (COPY + columnas)
+
+async def drain(chunks) -> int:
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk.encode() if isinstance(chunk, str) else chunk)
+    return size
+
+async def run():
+    t = Telemetry.__table__
+    query = select(t.c.datetime, t.c.machineID, t.c.volt, t.c.rotate, t.c.pressure, t.c.vibration).order_by(t.c.machineID, t.c.datetime)
+
+    cases = [
+        ("NDJSON", lambda: ndjson_lines(query)),
+        ("Arrow IPC", lambda: export_stream("telemetry", "arrow")),
+        ("Parquet", lambda: export_stream("telemetry", "parquet")),
+    ]
+    baseline = None
+    for name, build in cases:
+        start = time.perf_counter()
+        size = await drain(build())
+        elapsed = time.perf_counter() - start
+        baseline = baseline or (size, elapsed)
+        print(f"⏱ {name:<10} {size / 1e6:8.1f} MB ({size / baseline[0]:5.0%})  {elapsed:6.2f}s  "
+              f"{size / 1e6 / elapsed:6.1f} MB/s  speedup x{baseline[1] / elapsed:4.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(run())
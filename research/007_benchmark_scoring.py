@@ -0,0 +1,44 @@
+import time
+from datetime import datetime
+import numpy as np
+import polars as pl
+
+from src.services.scoring import MODEL_FEATURES, FailureModel, get_model, predictions_frame
+
+# Scoring de la flota: un lote vectorizado vs una inferencia por máquina (como haría un request por máquina)
+
+FLEET_SIZES = [100, 10_000, 100_000]
+# El bucle por máquina sólo se mide hasta este tamaño (y se extrapola): a 100k tarda demasiado
+LOOP_MAX_MACHINES = 10_000
+
+def synthetic_features(model: FailureModel, machines: int, seed: int = 0) -> pl.DataFrame:
+    """Frame con las columnas de machine_features, valores alrededor del centro/escala de entrenamiento."""
+    rng = np.random.default_rng(seed)
+    X = model.center + model.scale * rng.standard_normal((machines, len(MODEL_FEATURES)))
+    return pl.DataFrame({
+        "machineID": np.arange(1, machines + 1),
+        "datetime": [datetime(2016, 1, 1)] * machines,
+        **{c: X[:, i] for i, c in enumerate(MODEL_FEATURES)},
+    })
+
+def run():
+    model = get_model()
+    for machines in FLEET_SIZES:
+        features = synthetic_features(model, machines)
+
+        start = time.perf_counter()
+        predictions = predictions_frame(model, features)
+        batch = time.perf_counter() - start
+
+        looped = min(machines, LOOP_MAX_MACHINES)
+        start = time.perf_counter()
+        for i in range(looped):
+            model.predict(features.slice(i, 1))
+        loop = (time.perf_counter() - start) * machines / looped
+
+        print(f"⏱ {machines:>7,} máquinas ({predictions.height:>7,} riesgos): lote {batch * 1000:8.1f} ms | "
+              f"por máquina {loop * 1000:10.1f} ms{'*' if looped < machines else ' '} | speedup x{loop / batch:,.0f}")
+    print("* extrapolado desde", f"{LOOP_MAX_MACHINES:,}", "máquinas")
+
+if __name__ == "__main__":
+    run()
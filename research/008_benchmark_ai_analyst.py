@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Backend local con la latencia típica de un LLM: mide concurrencia, timeouts y caché sin llamar a Gemini
+os.environ.setdefault("AI_BACKEND", "stub")
+os.environ.setdefault("AI_STUB_LATENCY_SECONDS", "0.5")
+
+from src.core.config import settings
+from src.services.ai_analyst import AIAnalyst, StubBackend, get_analyst
+
+THREADS = 16        # hilos WSGI de Dash atendiendo clics a la vez
+QUESTIONS = 8       # preguntas distintas (el resto son repeticiones)
+REQUESTS = 64
+
+def run():
+    analyst = get_analyst()
+    context = "DATOS DEL DATA MART: " + str([{"machineID": i, "MTBF_hours": 500 + i} for i in range(100)])
+    questions = [f"¿Qué máquina priorizar? (variante {i % QUESTIONS})" for i in range(REQUESTS)]
+
+    def ask(question):
+        start = time.perf_counter()
+        analyst.ask_llm(context, question)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        start = time.perf_counter()
+        latencies = sorted(pool.map(ask, questions))
+        elapsed = time.perf_counter() - start
+
+    stats = analyst.cache.stats()
+    print(f"⏱ {REQUESTS} preguntas ({QUESTIONS} distintas), {THREADS} hilos, latencia LLM {settings.AI_STUB_LATENCY_SECONDS}s, "
+          f"máx. {settings.AI_MAX_CONCURRENCY} llamadas simultáneas")
+    print(f"   total {elapsed:.2f}s | p50 {latencies[len(latencies) // 2] * 1000:.0f} ms | p95 {latencies[int(len(latencies) * 0.95)] * 1000:.0f} ms | "
+          f"aciertos de caché {stats['hits']}/{stats['hits'] + stats['misses']}")
+
+    start = time.perf_counter()
+    analyst.ask_llm(context, questions[0])
+    print(f"   pregunta repetida (datos sin cambios): {(time.perf_counter() - start) * 1e6:.0f} µs")
+
+def check_zero_latency(prompts: int = 200, timeout: float = 10):
+    """
+    Regresión: con el stub sin latencia la llamada suele terminar antes de registrar el callback
+    que la saca de las 'en vuelo'; eso no debe bloquear el hilo (antes se trababa con su propio lock).
+    """
+    latency, settings.AI_STUB_LATENCY_SECONDS = settings.AI_STUB_LATENCY_SECONDS, 0
+    try:
+        analyst = AIAnalyst(StubBackend())
+        worker = threading.Thread(target=lambda: [analyst.complete(f"pregunta {i}") for i in range(prompts)], daemon=True)
+        worker.start()
+        worker.join(timeout)
+        if worker.is_alive():
+            raise SystemExit(f"❌ {prompts} preguntas con latencia 0 no terminaron en {timeout:.0f}s: AIAnalyst.complete se bloqueó")
+        print(f"✅ {prompts} preguntas con el stub sin latencia: sin bloqueos")
+    finally:
+        settings.AI_STUB_LATENCY_SECONDS = latency
+
+if __name__ == "__main__":
+    check_zero_latency()
+    run()
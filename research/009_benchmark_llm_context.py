@@ -0,0 +1,38 @@
+import time
+import numpy as np
+import polars as pl
+
+from src.core.config import settings
+from src.services.llm_context import estimate_tokens, fleet_digest
+
+# Tamaño del contexto estratégico: tabla de KPIs completa (str(kpi_data), lo de antes) vs digest acotado
+
+FLEET_SIZES = [100, 1_000, 10_000]
+
+def synthetic_fleet(machines: int, seed: int = 0) -> tuple[pl.DataFrame, list[dict]]:
+    rng = np.random.default_rng(seed)
+    kpis = pl.DataFrame({
+        "machineID": np.arange(1, machines + 1),
+        "MTBF_hours": rng.gamma(4, 110, machines).round(1),
+        "MTTR_hours": rng.gamma(6, 80, machines).round(1),
+        "total_failures": rng.poisson(6, machines),
+        "model": rng.choice(["model1", "model2", "model3", "model4"], machines),
+    })
+    risks = [{"machineID": m, "comp": f"comp{c}", "risk": float(r)}
+             for m in range(1, machines + 1) for c, r in enumerate(rng.beta(1, 200, 4), start=1)]
+    return kpis, risks
+
+def run():
+    for machines in FLEET_SIZES:
+        kpis, risks = synthetic_fleet(machines)
+        full = f"DATOS DEL DATA MART: {str(kpis.drop('model').to_dicts())}"
+
+        start = time.perf_counter()
+        digest = fleet_digest(kpis, risks, settings.AI_CONTEXT_MAX_TOKENS, settings.AI_CONTEXT_TOP_K)
+        elapsed = time.perf_counter() - start
+
+        print(f"⏱ {machines:>6,} máquinas: tabla completa ~{estimate_tokens(full):>9,} tokens | "
+              f"digest ~{estimate_tokens(digest):>4,} tokens (presupuesto {settings.AI_CONTEXT_MAX_TOKENS}) en {elapsed * 1000:6.1f} ms")
+
+if __name__ == "__main__":
+    run()
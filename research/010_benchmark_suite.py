@@ -0,0 +1,146 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Suite de micro-benchmarks sobre datos sintéticos de N máquinas x M años.
+#
+# Todo corre contra un schema desechable: DB_SCHEMA y DATA_PATH se fijan ANTES de importar src,
+# así las funciones reales (ingesta, KPIs, callbacks) se miden sin modificarlas y sin tocar las
+# tablas reales. Los resultados se agregan a un JSONL para comparar corridas en el tiempo.
+BENCH_SCHEMA = "pdm_benchmark"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmarks de ingesta, KPIs y callbacks del dashboard.")
+    parser.add_argument("--machines", type=int, default=100)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--repeat", type=int, default=5, help="Repeticiones de cada benchmark idempotente.")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos de ingest_csv_to_db.")
+    parser.add_argument("--results", type=Path, default=Path(__file__).resolve().parent.parent / "state" / "benchmarks.jsonl")
+    parser.add_argument("--keep", action="store_true", help="No borra el schema ni los CSV al terminar.")
+    return parser.parse_args()
+
+args = parse_args()
+data_dir = Path(tempfile.mkdtemp(prefix="pdm_synthetic_"))
+os.environ["DB_SCHEMA"] = BENCH_SCHEMA
+os.environ["DATA_PATH"] = str(data_dir)
+
+from sqlalchemy import text  # noqa: E402
+
+from src.analysis.reliability_metrics import get_processed_data, update_reliability_table  # noqa: E402
+from src.dashboard.callbacks import register_callbacks  # noqa: E402
+from src.database.session import engine  # noqa: E402
+from src.services.ingestion import create_tables, ingest_csv_to_db  # noqa: E402
+from src.services.query_cache import query_cache  # noqa: E402
+from src.services.synthetic_data import generate_dataset  # noqa: E402
+
+class CallbackRecorder:
+    """Sustituto de la app Dash: guarda las funciones de los callbacks para llamarlas directamente."""
+
+    def __init__(self):
+        self.callbacks = {}
+
+    def callback(self, *args, **kwargs):
+        def register(fn):
+            self.callbacks[fn.__name__] = fn
+            return fn
+        return register
+
+    def clientside_callback(self, *args, **kwargs):
+        pass
+
+def bench(name: str, fn, repeat: int, setup=None) -> dict:
+    """Mejor tiempo y mediana de 'repeat' corridas (setup corre antes de cada una, fuera del tiempo)."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    result = {"min": min(times), "median": statistics.median(times), "runs": repeat}
+    print(f"⏱ {name:<38} min {result['min'] * 1000:10.1f} ms | mediana {result['median'] * 1000:10.1f} ms | n={repeat}")
+    return result
+
+def reset_schema():
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCH_SCHEMA}" CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA "{BENCH_SCHEMA}"'))
+    create_tables()
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "desconocida"
+
+def compare(previous: dict | None, results: dict):
+    if previous is None:
+        return
+    print(f"📊 Contra la corrida anterior ({previous['revision']}, {previous['timestamp']}):")
+    for name, result in results.items():
+        before = previous["results"].get(name)
+        if before:
+            change = result["median"] / before["median"] - 1
+            print(f"   {name:<38} {change:+7.1%} {'🐢' if change > 0.1 else '🚀' if change < -0.1 else ''}")
+
+def run():
+    results = {}
+    print(f"🧪 Generando {args.machines:,} máquinas x {args.years} años en {data_dir}...")
+    start = time.perf_counter()
+    rows = generate_dataset(data_dir, args.machines, args.years)
+    print(f"   {', '.join(f'{k} {v:,}' for k, v in rows.items())} ({time.perf_counter() - start:.1f}s)")
+
+    # Ingesta: una corrida en frío y otra sin cambios (sólo lectura de CSV + marcas de agua)
+    results["ingest_csv_to_db"] = bench("ingest_csv_to_db (frío)", lambda: ingest_csv_to_db(workers=args.workers), 1, setup=reset_schema)
+    results["ingest_csv_to_db_noop"] = bench("ingest_csv_to_db (sin datos nuevos)", lambda: ingest_csv_to_db(workers=args.workers), 1)
+
+    results["get_processed_data"] = bench("get_processed_data", get_processed_data, args.repeat)
+    results["update_reliability_table_full"] = bench("update_reliability_table(full=True)", lambda: update_reliability_table(full=True), args.repeat)
+    results["update_reliability_table"] = bench("update_reliability_table (incremental)", update_reliability_table, args.repeat)
+
+    # Callbacks llamados directamente: en frío (caché vacía) y en caliente
+    app = CallbackRecorder()
+    register_callbacks(app)
+    update_dashboard = app.callbacks["update_dashboard"]
+    update_strategic_view = app.callbacks["update_strategic_view"]
+    machine = max(1, args.machines // 2)
+    results["update_dashboard_cold"] = bench("update_dashboard (frío)", lambda: update_dashboard(machine), args.repeat, setup=query_cache.invalidate)
+    results["update_dashboard_warm"] = bench("update_dashboard (caché)", lambda: update_dashboard(machine), args.repeat)
+    results["update_strategic_view_cold"] = bench("update_strategic_view (frío)", lambda: update_strategic_view(None), args.repeat, setup=query_cache.invalidate)
+    results["update_strategic_view_warm"] = bench("update_strategic_view (caché)", lambda: update_strategic_view(None), args.repeat)
+
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    history = [json.loads(line) for line in args.results.read_text().splitlines()] if args.results.exists() else []
+    previous = next((r for r in reversed(history) if r["machines"] == args.machines and r["years"] == args.years), None)
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "machines": args.machines,
+        "years": args.years,
+        "workers": args.workers,
+        "rows": rows,
+        "results": results,
+    }
+    with args.results.open("a") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"💾 Resultados agregados a {args.results}")
+    compare(previous, results)
+
+if __name__ == "__main__":
+    try:
+        run()
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCH_SCHEMA}" CASCADE'))
+            for path in data_dir.glob("*.csv"):
+                path.unlink()
+            data_dir.rmdir()
@@ -0,0 +1,119 @@
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# PostgreSQL vs lago Parquet (Polars) para las lecturas analíticas del dashboard.
+#
+# Mismos datos sintéticos en ambos motores: se ingestan en un schema desechable y se materializa
+# el lago desde PostgreSQL (y desde los CSV, sin base). Cada lectura se verifica igual en ambos.
+BENCH_SCHEMA = "pdm_benchmark"
+
+parser = argparse.ArgumentParser(description="Benchmark de ANALYTICS_BACKEND=postgres vs parquet.")
+parser.add_argument("--machines", type=int, default=1000)
+parser.add_argument("--years", type=float, default=1.0)
+parser.add_argument("--repeat", type=int, default=5)
+args = parser.parse_args()
+
+work_dir = Path(tempfile.mkdtemp(prefix="pdm_lake_"))
+os.environ["DB_SCHEMA"] = BENCH_SCHEMA
+os.environ["DATA_PATH"] = str(work_dir / "csv")
+os.environ["PARQUET_PATH"] = str(work_dir / "lake")
+
+import polars as pl  # noqa: E402
+from polars.testing import assert_frame_equal  # noqa: E402
+from sqlalchemy import func, select, text  # noqa: E402
+
+from src.analysis.reliability_metrics import get_processed_data  # noqa: E402
+from src.core.config import settings  # noqa: E402
+from src.dashboard.callbacks import load_machine_view, load_telemetry_window  # noqa: E402
+from src.database.session import engine  # noqa: E402
+from src.models.telemetry import Telemetry  # noqa: E402
+from src.services import parquet_lake  # noqa: E402
+from src.services.ingestion import create_tables, ingest_csv_to_db  # noqa: E402
+from src.services.synthetic_data import generate_dataset  # noqa: E402
+
+SENSORS = ["volt", "rotate", "pressure", "vibration"]
+
+def timed(fn, repeat: int):
+    times, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times), result
+
+def fleet_means():
+    """Media histórica de cada sensor por máquina: un scan completo de la telemetría."""
+    if settings.ANALYTICS_BACKEND == "parquet":
+        return (
+            parquet_lake.scan("telemetry").group_by("machineID")
+            .agg(*[pl.col(s).mean() for s in SENSORS]).sort("machineID").collect()
+        )
+    t = Telemetry.__table__
+    with engine.connect() as conn:
+        return pl.read_database(
+            select(t.c.machineID, *[func.avg(t.c[s]).label(s) for s in SENSORS]).group_by(t.c.machineID).order_by(t.c.machineID),
+            connection=conn,
+        )
+
+def same(a, b) -> bool:
+    if isinstance(a, pl.DataFrame):
+        assert_frame_equal(a, b, check_dtypes=False, rel_tol=1e-9)
+    elif isinstance(a, tuple):  # ventana de telemetría: (series, lecturas, fuente)
+        assert a[1:] == b[1:], (a[1:], b[1:])
+        for c, s in a[0].items():
+            assert s["x"] == b[0][c]["x"]
+            assert max((abs(x - y) for x, y in zip(s["y"], b[0][c]["y"], strict=True)), default=0) < 1e-6
+    else:
+        assert a == b
+    return True
+
+def compare(name: str, fn):
+    results = {}
+    for backend in ("postgres", "parquet"):
+        settings.ANALYTICS_BACKEND = backend
+        results[backend] = timed(fn, args.repeat)
+    same(results["postgres"][2], results["parquet"][2])
+    pg, pq = results["postgres"][1], results["parquet"][1]
+    print(f"⏱ {name:<36} postgres {pg * 1000:9.1f} ms | parquet {pq * 1000:9.1f} ms | x{pg / pq:5.1f} ✅")
+
+def run():
+    print(f"🧪 {args.machines:,} máquinas x {args.years} años en {work_dir}...")
+    rows = generate_dataset(work_dir / "csv", args.machines, args.years)
+    print(f"   {', '.join(f'{k} {v:,}' for k, v in rows.items())}")
+
+    with engine.begin() as conn:
+        conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCH_SCHEMA}" CASCADE'))
+        conn.execute(text(f'CREATE SCHEMA "{BENCH_SCHEMA}"'))
+    create_tables()
+    start = time.perf_counter()
+    ingest_csv_to_db()
+    print(f"📥 Ingesta a PostgreSQL (con rollups): {time.perf_counter() - start:.1f}s")
+
+    for source in ("csv", "postgres"):
+        start = time.perf_counter()
+        parquet_lake.materialize(source)
+        print(f"📦 Lago desde {source}: {time.perf_counter() - start:.1f}s")
+    size = sum(f.stat().st_size for f in (work_dir / "lake").rglob("*.parquet")) / 2**20
+    print(f"   {size:.1f} MiB en Parquet (generación anterior incluida)")
+
+    machine = max(1, args.machines // 2)
+    compare("get_processed_data (KPIs flota)", get_processed_data)
+    compare("medias por máquina (scan completo)", fleet_means)
+    compare("load_machine_view", lambda: load_machine_view(machine))
+    compare("telemetría historia completa", lambda: load_telemetry_window(machine))
+    compare("telemetría 6 meses", lambda: load_telemetry_window(machine, datetime(2015, 2, 3), datetime(2015, 8, 1)))
+    compare("telemetría 1 semana (cruda)", lambda: load_telemetry_window(machine, datetime(2015, 3, 2), datetime(2015, 3, 9)))
+
+if __name__ == "__main__":
+    try:
+        run()
+    finally:
+        with engine.begin() as conn:
+            conn.execute(text(f'DROP SCHEMA IF EXISTS "{BENCH_SCHEMA}" CASCADE'))
+        shutil.rmtree(work_dir, ignore_errors=True)
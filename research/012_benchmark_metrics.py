@@ -0,0 +1,53 @@
+import statistics
+import time
+from sqlalchemy import create_engine, text
+
+from src.core.config import settings
+from src.core.metrics import histogram, registry, timed_function
+from src.database.profiling import instrument_engine
+
+# Costo de dejar la instrumentación encendida: por consulta (hooks de SQLAlchemy), por llamada
+# (decorador de los callbacks) y por scrape de /metrics con muchas series.
+QUERIES = 5_000
+CALLS = 200_000
+
+def per_query(engines: dict, n: int, rounds: int = 7) -> dict[str, float]:
+    """Mediana (en µs por consulta) de 'rounds' tandas de n 'SELECT 1', alternando los engines (mismo ruido)."""
+    runs = {name: [] for name in engines}
+    stmt = text("SELECT 1")
+    for _ in range(rounds):
+        for name, engine in engines.items():
+            with engine.connect() as conn:
+                start = time.perf_counter()
+                for _ in range(n):
+                    conn.execute(stmt).scalar()
+                runs[name].append((time.perf_counter() - start) / n * 1e6)
+    return {name: statistics.median(r) for name, r in runs.items()}
+
+def main():
+    plain = create_engine(settings.DATABASE_URL, pool_size=1)
+    instrumented = create_engine(settings.DATABASE_URL, pool_size=1)
+    instrument_engine(instrumented, "benchmark")
+
+    times = per_query({"plain": plain, "hooked": instrumented}, QUERIES)
+    base, hooked = times["plain"], times["hooked"]
+    print(f"🗄  SELECT 1: {base:.1f} µs sin hooks | {hooked:.1f} µs con hooks | +{hooked - base:.1f} µs por consulta")
+
+    metric = histogram("pdm_benchmark_seconds", "Benchmark.", ("callback",))
+    noop = lambda: None  # noqa: E731
+    wrapped = timed_function(metric, callback="noop")(noop)
+    for label, fn in (("sin decorador", noop), ("con decorador", wrapped)):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            fn()
+        print(f"⏱ Llamada {label}: {(time.perf_counter() - start) / CALLS * 1e9:.0f} ns")
+
+    many = histogram("pdm_benchmark_series_seconds", "Benchmark.", ("statement",))
+    for i in range(settings.METRICS_MAX_SERIES):
+        many.observe(0.01, statement=f"SELECT {i} FROM tabla_{i}")
+    start = time.perf_counter()
+    body = registry.render()
+    print(f"📈 Scrape de /metrics con {settings.METRICS_MAX_SERIES} series: {(time.perf_counter() - start) * 1000:.1f} ms, {len(body) / 1024:.0f} KiB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+# Arranque en frío: cuánto tarda 'import src.main' y un proceso uvicorn nuevo en responder /health,
+# más el perfil de importación (-X importtime) agrupado por paquete.
+ROOT = Path(__file__).resolve().parent.parent
+
+def run_python(code: str, *flags: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.run([sys.executable, *flags, "-c", code], capture_output=True, text=True, cwd=ROOT, env=env)
+
+def import_seconds(module: str, runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = run_python(f"import {module}")
+        if result.returncode:
+            raise RuntimeError(result.stderr[-2000:])
+        times.append(time.perf_counter() - start)
+    return times
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def first_health_seconds(runs: int) -> list[float]:
+    """Desde que se lanza uvicorn hasta la primera respuesta 200 de /health."""
+    times = []
+    for _ in range(runs):
+        port = free_port()
+        start = time.perf_counter()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(port), "--log-level", "warning"],
+            cwd=ROOT, env={**os.environ, "PYTHONPATH": str(ROOT)}, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            while True:
+                try:
+                    with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=5) as response:
+                        response.read()
+                    break
+                except OSError:
+                    if server.poll() is not None:
+                        raise RuntimeError("uvicorn terminó antes de responder") from None
+                    time.sleep(0.01)
+            times.append(time.perf_counter() - start)
+        finally:
+            server.terminate()
+            server.wait()
+    return times
+
+def import_profile(module: str, top: int):
+    """Top de paquetes por tiempo propio de importación y de módulos del proyecto por tiempo acumulado."""
+    stderr = run_python(f"import {module}", "-X", "importtime").stderr
+    by_package = defaultdict(int)
+    project = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        by_package[name.split(".")[0]] += int(own)
+        if name.startswith("src."):
+            project.append((int(cumulative), name))
+
+    total = sum(by_package.values())
+    print(f"📦 Importación de {module}: {total / 1000:.0f} ms en total (tiempo propio sumado)")
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"   {package:<32} {us / 1000:8.1f} ms")
+    print("   Módulos del proyecto (acumulado, incluye lo que importan primero):")
+    for us, name in sorted(project, reverse=True)[:top]:
+        print(f"   {name:<32} {us / 1000:8.1f} ms")
+
+def summary(label: str, times: list[float]):
+    print(f"⏱ {label:<34} min {min(times) * 1000:7.0f} ms | mediana {statistics.median(times) * 1000:7.0f} ms | n={len(times)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tiempo de arranque en frío de la app.")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--no-server", action="store_true", help="Sólo mide la importación (no levanta uvicorn).")
+    args = parser.parse_args()
+
+    import_profile("src.main", args.top)
+    summary("python -c 'import src.main'", import_seconds("src.main", args.runs))
+    if not args.no_server:
+        summary("uvicorn hasta el primer /health", first_health_seconds(args.runs))
@@ -0,0 +1,59 @@
+import argparse
+import statistics
+import threading
+import time
+from sqlalchemy import create_engine, text
+
+from src.core.config import settings
+from src.database.session import engine_options
+
+# Pools por rol: un job que satura sus conexiones (consultas largas con pg_sleep) mientras el
+# dashboard hace lecturas cortas. Con un pool compartido las lecturas esperan turno; con pools
+# separados el job sólo agota el suyo. El job usa el doble de hilos que conexiones tiene el pool de
+# lecturas (como una ingesta paralela o un backfill con muchas tandas).
+JOB_THREADS = settings.DB_READ_POOL_SIZE * 2
+READ_THREADS = 4
+
+def hammer(engine, sql: str, stop: threading.Event, latencies: list[float] | None, errors: list[str]):
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text(sql)).all()
+        except Exception as e:
+            errors.append(type(e).__name__)
+            continue
+        if latencies is not None:
+            latencies.append(time.perf_counter() - start)
+
+def scenario(read_engine, job_engine, seconds: float, job_sleep: float) -> tuple[list[float], list[str], list[str]]:
+    stop, latencies, read_errors, job_errors = threading.Event(), [], [], []
+    threads = [threading.Thread(target=hammer, args=(job_engine, f"SELECT pg_sleep({job_sleep})", stop, None, job_errors)) for _ in range(JOB_THREADS)]
+    threads += [threading.Thread(target=hammer, args=(read_engine, "SELECT 1", stop, latencies, read_errors)) for _ in range(READ_THREADS)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    return latencies, read_errors, job_errors
+
+def report(label: str, latencies: list[float], read_errors: list[str], job_errors: list[str]):
+    q = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    print(f"📊 {label:<28} lecturas {len(latencies):6d} | p50 {q[49] * 1000:7.1f} ms | p99 {q[98] * 1000:7.1f} ms | timeouts lectura {len(read_errors)} / job {len(job_errors)}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lecturas del dashboard con un job saturando conexiones.")
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--job-sleep", type=float, default=0.5)
+    args = parser.parse_args()
+
+    # Antes: un único pool (tamaño del pool de lecturas) para todo
+    shared = create_engine(settings.DATABASE_URL, **engine_options("shared", settings.DB_READ_POOL_SIZE, 0))
+    report("pool compartido", *scenario(shared, shared, args.seconds, args.job_sleep))
+    shared.dispose()
+
+    # Ahora: lecturas y jobs con pools propios (mismos tamaños que session.py)
+    reads = create_engine(settings.READ_DATABASE_URL, **engine_options("read", settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW))
+    jobs = create_engine(settings.DATABASE_URL, **engine_options("jobs", settings.DB_JOB_POOL_SIZE, settings.DB_JOB_MAX_OVERFLOW))
+    report("pools read/jobs separados", *scenario(reads, jobs, args.seconds, args.job_sleep))
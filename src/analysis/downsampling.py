@@ -0,0 +1,51 @@
+# src/analysis/downsampling.py
+import polars as pl
+
+# Puntos por serie que vale la pena enviar al navegador (~ ancho en píxeles del gráfico)
+DEFAULT_MAX_POINTS = 1000
+
+def minmax_downsample(
+    df: pl.DataFrame,
+    columns: list[str],
+    max_points: int = DEFAULT_MAX_POINTS,
+    time_col: str = "datetime",
+) -> dict[str, pl.DataFrame]:
+    """
+    Reduce cada serie a como mucho 'max_points' puntos conservando picos (min/max por bucket).
+
+    El rango temporal se divide en max_points/2 buckets de igual duración y de cada uno se
+    conservan el punto mínimo y el máximo de cada sensor, con su timestamp real. Así un pico
+    de vibración de una sola hora sigue visible en un gráfico de un año. Todo es vectorizado
+    en Polars (un group_by por sensor); devuelve un DataFrame (time_col, sensor) por columna.
+    """
+    df = df.sort(time_col)
+    if df.height <= max_points:
+        return {c: df.select(time_col, c).drop_nulls() for c in columns}
+
+    n_buckets = max(max_points // 2, 1)
+    epoch = pl.col(time_col).dt.epoch("us")
+    t0, t1 = df.select(epoch.min().alias("t0"), epoch.max().alias("t1")).row(0)
+    span = max(t1 - t0, 1)
+    bucketed = df.with_columns(((epoch - t0) * n_buckets // (span + 1)).alias("_bucket"))
+
+    series = {}
+    for c in columns:
+        extremes = (
+            bucketed.filter(pl.col(c).is_not_null())
+            .group_by("_bucket")
+            .agg(
+                pl.col(time_col).get(pl.col(c).arg_min()).alias("t_min"),
+                pl.col(c).min().alias("v_min"),
+                pl.col(time_col).get(pl.col(c).arg_max()).alias("t_max"),
+                pl.col(c).max().alias("v_max"),
+            )
+        )
+        series[c] = (
+            pl.concat([
+                extremes.select(pl.col("t_min").alias(time_col), pl.col("v_min").alias(c)),
+                extremes.select(pl.col("t_max").alias(time_col), pl.col("v_max").alias(c)),
+            ])
+            .unique(subset=time_col)
+            .sort(time_col)
+        )
+    return series
@@ -0,0 +1,227 @@
+# src/analysis/features.py
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta
+import polars as pl
+from sqlalchemy import Connection, DateTime, Integer, and_, column, delete, func, select, text, values
+
+from src.core.config import settings
+from src.database.bulk_copy import upsert_frame
+from src.database.session import job_engine
+from src.database.watermarks import advance_consumed, consumed_watermarks, current_watermarks
+from src.models.error import Error
+from src.models.feature import MachineFeature
+from src.models.maintenance import Maintenance
+from src.models.telemetry import Telemetry
+from src.models.watermark import IngestionWatermark
+
+logger = logging.getLogger(__name__)
+
+SENSORS = ["volt", "rotate", "pressure", "vibration"]
+ERROR_IDS = [f"error{i}" for i in range(1, 6)]
+COMPONENTS = [f"comp{i}" for i in range(1, 5)]
+
+# Una fila de features cada 3 horas; la ventana más larga mira 24h hacia atrás
+FEATURE_STEP_HOURS = 3
+LOOKBACK = timedelta(hours=24)
+
+# Fuentes cuyos datos nuevos obligan a recalcular features (nombre en ingestion_watermarks -> modelo)
+FEATURE_SOURCES = {"telemetry": Telemetry, "errors": Error, "maint": Maintenance}
+# Marca de agua de lo ya consumido por las features: 'machine_features.<fuente>' en ingestion_watermarks
+WATERMARK_PREFIX = f"{MachineFeature.__tablename__}."
+# Fecha "desde siempre" para las máquinas que se recalculan completas
+FULL_HISTORY = datetime(1900, 1, 1)
+
+def feature_frame(telemetry: pl.LazyFrame, errors: pl.LazyFrame, maint: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Plan lazy de las features estándar de PdM por máquina, una fila cada FEATURE_STEP_HOURS horas.
+
+    - Media y desviación de cada sensor en ventanas móviles de 3h y 24h.
+    - Conteo de cada errorID en las últimas 24h.
+    - Horas desde el último reemplazo de cada componente (join_asof hacia atrás sobre 'maint').
+
+    Las ventanas de sensores usan los kernels rolling_*_by sobre 'datetime' dentro de cada máquina
+    (.over), que son O(n) y respetan huecos en la serie (ventanas por tiempo, no por número de filas).
+    Los errores se cuentan sobre su propio flujo: acumulado por máquina y diferencia entre el acumulado
+    en t y en t - 24h (dos join_asof), así también cuentan los errores de horas sin lectura de telemetría.
+    """
+    windows = []
+    for s in SENSORS:
+        for size in ("3h", "24h"):
+            windows += [
+                pl.col(s).rolling_mean_by("datetime", window_size=size).over("machineID").alias(f"{s}_mean_{size}"),
+                pl.col(s).rolling_std_by("datetime", window_size=size).over("machineID").alias(f"{s}_sd_{size}"),
+            ]
+
+    # Errores acumulados por máquina hasta cada instante con errores
+    totals = (
+        errors.group_by("machineID", "datetime")
+        .agg([(pl.col("errorID") == e).sum().cast(pl.Int64).alias(e) for e in ERROR_IDS])
+        .sort("machineID", "datetime")
+        .with_columns(pl.col(ERROR_IDS).cum_sum().over("machineID"))
+        .rename({"datetime": "errors_at"})
+        .sort("errors_at")
+    )
+    before = totals.rename({"errors_at": "before_at", **{e: f"{e}_before" for e in ERROR_IDS}})
+
+    features = (
+        telemetry.sort("machineID", "datetime")
+        .select("machineID", "datetime", *windows)
+        .filter(pl.col("datetime").dt.hour() % FEATURE_STEP_HOURS == 0)
+        .sort("datetime")
+        .with_columns((pl.col("datetime") - LOOKBACK).alias("window_start"))
+        # Ventana (t - 24h, t], la misma que rolling_sum_by: acumulado en t menos acumulado en t - 24h
+        .join_asof(totals, left_on="datetime", right_on="errors_at", by="machineID", strategy="backward", check_sortedness=False)
+        .join_asof(before, left_on="window_start", right_on="before_at", by="machineID", strategy="backward", check_sortedness=False)
+        .select(
+            "machineID", "datetime", *[w.meta.output_name() for w in windows],
+            *[(pl.col(e).fill_null(0) - pl.col(f"{e}_before").fill_null(0)).alias(f"{e}_count_24h") for e in ERROR_IDS],
+        )
+    )
+
+    for comp in COMPONENTS:
+        replaced = (
+            maint.filter(pl.col("comp") == comp)
+            .select("machineID", pl.col("datetime").alias(f"{comp}_replaced_at"))
+            .unique()
+            .sort(f"{comp}_replaced_at")
+        )
+        features = (
+            features.join_asof(replaced, left_on="datetime", right_on=f"{comp}_replaced_at", by="machineID", strategy="backward", check_sortedness=False)
+            .with_columns((pl.col("datetime") - pl.col(f"{comp}_replaced_at")).dt.total_hours().cast(pl.Float64).alias(f"{comp}_hours_since_replacement"))
+            .drop(f"{comp}_replaced_at")
+        )
+    return features
+
+def feature_columns() -> list[str]:
+    return [c for c in MachineFeature.__table__.columns.keys() if c not in ("created_at", "updated_at")]
+
+def affected_machines(current: pl.DataFrame, consumed: pl.DataFrame) -> pl.DataFrame:
+    """
+    Máquinas con datos nuevos y desde cuándo recalcular sus features ('since', exclusivo).
+
+    La ingesta sólo agrega filas posteriores a su marca de agua, así que todo lo nuevo de una
+    fuente es posterior a lo ya consumido: basta recalcular las features desde la menor marca
+    consumida entre las fuentes que avanzaron. Sin marca previa, la máquina se recalcula completa.
+    """
+    changed = (
+        current.join(consumed, on=["source", "machineID"], how="left")
+        .filter(pl.col("consumed").is_null() | (pl.col("last_datetime") > pl.col("consumed")))
+    )
+    return (
+        changed.group_by("machineID")
+        .agg(
+            pl.when(pl.col("consumed").is_null().any())
+            .then(pl.lit(FULL_HISTORY, pl.Datetime("us")))
+            .otherwise(pl.col("consumed").min())
+            .alias("since")
+        )
+        .sort("machineID")
+    )
+
+def touched_since(windows: pl.DataFrame, offset: timedelta = timedelta(0)):
+    """Tabla VALUES (machineID, since - offset) de la tanda, para joins contra las fuentes."""
+    return values(column("machineID", Integer), column("since", DateTime), name="touched").data(
+        [(m, max(since - offset, FULL_HISTORY)) for m, since in windows.select("machineID", "since").iter_rows()]
+    )
+
+def pending_range(conn: Connection, windows: pl.DataFrame) -> tuple[datetime | None, datetime | None]:
+    """Primera y última lectura de telemetría posteriores a 'since' entre las máquinas de la tanda."""
+    touched = touched_since(windows)
+    return conn.execute(
+        select(func.min(Telemetry.datetime), func.max(Telemetry.datetime)).select_from(
+            Telemetry.__table__.join(touched, and_(Telemetry.machineID == touched.c.machineID, Telemetry.datetime > touched.c.since))
+        )
+    ).one()
+
+def read_sources(conn: Connection, windows: pl.DataFrame, start: datetime, end: datetime) -> tuple[pl.LazyFrame, pl.LazyFrame]:
+    """Telemetría y errores de [start - 24h, end) posteriores a 'since' - 24h de cada máquina (lo que necesitan las ventanas)."""
+    touched = touched_since(windows, LOOKBACK)
+
+    def since_lookback(model, columns):
+        return (
+            select(*columns)
+            .select_from(model.__table__.join(touched, and_(model.machineID == touched.c.machineID, model.datetime >= touched.c.since)))
+            .where(model.datetime >= start - LOOKBACK, model.datetime < end)
+        )
+
+    telemetry = pl.read_database(
+        since_lookback(Telemetry, [Telemetry.machineID, Telemetry.datetime] + [getattr(Telemetry, s) for s in SENSORS]),
+        connection=conn,
+        schema_overrides={"machineID": pl.Int64, "datetime": pl.Datetime("us"), **{s: pl.Float64 for s in SENSORS}},
+    )
+    errors = pl.read_database(
+        since_lookback(Error, [Error.machineID, Error.datetime, Error.errorID]),
+        connection=conn,
+        schema_overrides={"machineID": pl.Int64, "datetime": pl.Datetime("us"), "errorID": pl.String},
+    )
+    return telemetry.lazy(), errors.lazy()
+
+def read_maint(conn: Connection, windows: pl.DataFrame) -> pl.LazyFrame:
+    """Todos los mantenimientos de las máquinas de la tanda (pocos por máquina: el último reemplazo puede ser viejo)."""
+    return pl.read_database(
+        select(Maintenance.machineID, Maintenance.datetime, Maintenance.comp)
+        .where(Maintenance.machineID.in_(windows["machineID"].to_list())),
+        connection=conn,
+        schema_overrides={"machineID": pl.Int64, "datetime": pl.Datetime("us"), "comp": pl.String},
+    ).lazy()
+
+def refresh_features(full: bool = False, bind=job_engine, batch_machines: int | None = None) -> int:
+    """
+    Mantiene 'machine_features' al día y devuelve cuántas filas de features se escribieron.
+
+    Las máquinas afectadas se procesan por tandas de FEATURE_MACHINE_BATCH, cada una en una
+    transacción. Dentro de la tanda el delta se lee por tramos de FEATURE_CHUNK_DAYS días, cada
+    tramo con las 24h previas de contexto (las ventanas son por tiempo, así que el resultado es el
+    mismo que leyendo todo junto); se ejecuta el plan lazy y se hace upsert de las filas del tramo
+    posteriores a 'since'. La memoria queda acotada por tanda × tramo, no por los años de historia.
+    """
+    batch_machines = batch_machines or settings.FEATURE_MACHINE_BATCH
+    chunk = timedelta(days=settings.FEATURE_CHUNK_DAYS)
+    with bind.begin() as conn:
+        MachineFeature.__table__.create(conn, checkfirst=True)
+        if full:
+            # Sin marcas consumidas todas las máquinas se recalculan; el upsert reemplaza sus filas sin vaciar la tabla
+            conn.execute(delete(IngestionWatermark).where(IngestionWatermark.table_name.startswith(WATERMARK_PREFIX)))
+        current = current_watermarks(conn, FEATURE_SOURCES)
+        affected = affected_machines(current, consumed_watermarks(conn, WATERMARK_PREFIX))
+
+    written = 0
+    for offset in range(0, affected.height, batch_machines):
+        windows = affected.slice(offset, batch_machines)
+        with bind.begin() as conn:
+            # Dos refrescos simultáneos de la misma tanda escribirían lo mismo dos veces
+            conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('machine_features'))"))
+            first, last = pending_range(conn, windows)
+            maint = read_maint(conn, windows) if first is not None else None
+            chunk_start = first
+            while chunk_start is not None and chunk_start <= last:
+                chunk_end = min(chunk_start + chunk, last + timedelta(microseconds=1))
+                telemetry, errors = read_sources(conn, windows, chunk_start, chunk_end)
+                features = (
+                    feature_frame(telemetry, errors, maint)
+                    .join(windows.lazy(), on="machineID")
+                    .filter(pl.col("datetime") > pl.col("since"), pl.col("datetime") >= chunk_start)
+                    .select(feature_columns())
+                    .collect(engine="streaming")
+                )
+                written += upsert_frame(conn, MachineFeature.__table__, features)
+                chunk_start = chunk_end
+            advance_consumed(conn, WATERMARK_PREFIX, current.filter(pl.col("machineID").is_in(windows["machineID"].to_list())))
+        logger.info(f"🧮 Features: {offset + windows.height}/{affected.height} máquinas, {written} filas escritas...")
+    return written
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Pipeline de features de mantenimiento predictivo.")
+    parser.add_argument("--full", action="store_true", help="Recalcula las features de toda la historia.")
+    args = parser.parse_args()
+
+    print("🚀 Calculando features...")
+    start = time.perf_counter()
+    rows = refresh_features(full=args.full)
+    if rows:
+        print(f"✅ Tabla '{MachineFeature.__tablename__}' actualizada: {rows:,} filas en {time.perf_counter() - start:.1f}s.")
+    else:
+        print("✅ Las features ya estaban al día: no hay datos nuevos.")
@@ -1,72 +1,289 @@
 # src/analysis/reliability_metrics.py
+import sys
+from datetime import datetime
 import polars as pl
-from sqlalchemy import select
+from sqlalchemy import Connection, DateTime, Float, Integer, and_, cast, column, delete, func, inspect, literal, select, text, union_all, values
+from sqlalchemy.dialects.postgresql import insert
 from src.core.config import settings  # <--- IMPORTANTE: Añade esta línea
-from src.database.session import SessionLocal, engine
+from src.database.session import job_engine, read_engine
+from src.database.watermarks import advance_consumed, consumed_watermarks, current_watermarks
 from src.models.failure import Failure
 from src.models.maintenance import Maintenance
+from src.models.reliability import ReliabilityStat
+from src.services.query_cache import bump_data_version
 
-def get_processed_data():
-    """Extrae datos de la DB y calcula KPIs de confiabilidad (MTBF y MTTR)."""
-    with SessionLocal() as db:
-        # 1. Traemos fallas y mantenimientos
-        fail_results = db.execute(select(Failure)).scalars().all()
-        maint_results = db.execute(select(Maintenance)).scalars().all()
+# Columnas publicadas en 'reliability_stats' (las que consume el dashboard)
+KPI_COLUMNS = ["machineID", "MTBF_hours", "MTTR_hours", "total_failures"]
+# KPIs + agregados acumulados (todo menos la auditoría created_at/updated_at)
+STATE_COLUMNS = [c for c in ReliabilityStat.__table__.columns.keys() if c not in ("created_at", "updated_at")]
+STATE_SCHEMA = {
+    c: pl.Float64 if c.endswith("hours") else pl.Datetime("us") if c == "last_event_at" else pl.Int64
+    for c in STATE_COLUMNS
+}
+# Fuentes de los KPIs (nombre en ingestion_watermarks -> modelo, tipo de evento) y prefijo de lo ya
+# consumido por el refresco incremental: 'reliability_stats.<fuente>' en ingestion_watermarks
+KPI_SOURCES = {"failures": (Failure, "failure"), "maint": (Maintenance, "maint")}
+WATERMARK_PREFIX = f"{ReliabilityStat.__tablename__}."
+# Cota inferior de las máquinas sin marca consumida (todos sus eventos son nuevos)
+FULL_HISTORY = datetime(1900, 1, 1)
+EVENT_SCHEMA = {"machineID": pl.Int64, "datetime": pl.Datetime("us"), "type": pl.String, "id": pl.Int64}
 
-        if not fail_results:
+def event_union(machine_ids: list[int] | None = None):
+    """Fallas y mantenimientos como una sola secuencia de eventos (machineID, datetime, type, id)."""
+    fail = select(Failure.machineID, Failure.datetime, literal("failure").label("type"), Failure.id)
+    maint = select(Maintenance.machineID, Maintenance.datetime, literal("maint").label("type"), Maintenance.id)
+    if machine_ids is not None:
+        fail = fail.where(Failure.machineID.in_(machine_ids))
+        maint = maint.where(Maintenance.machineID.in_(machine_ids))
+    return union_all(fail, maint).subquery("events")
+
+def kpi_query(machine_ids: list[int] | None = None):
+    """
+    SELECT que calcula MTBF/MTTR por máquina dentro de PostgreSQL.
+
+    Equivale al cálculo anterior en Polars: une fallas y mantenimientos, calcula con LAG()
+    el tiempo desde el evento previo de la misma máquina (horas completas, como dt.total_hours)
+    y agrega por machineID. Sólo viaja a Python una fila por máquina, que incluye también
+    los agregados acumulados que usa el refresco incremental.
+    """
+    events = event_union(machine_ids)
+    previous = func.lag(events.c.datetime).over(
+        partition_by=events.c.machineID, order_by=[events.c.datetime, events.c.type]
+    )
+    gaps = select(
+        events.c.machineID,
+        events.c.datetime,
+        events.c.type,
+        events.c.id,
+        cast(func.trunc(func.extract("epoch", events.c.datetime - previous) / 3600), Float).label("hours"),
+    ).subquery("gaps")
+
+    is_failure = gaps.c.type == "failure"
+    is_maint = gaps.c.type == "maint"
+    return (
+        select(
+            gaps.c.machineID,
+            func.coalesce(func.avg(gaps.c.hours).filter(is_failure), 0).label("MTBF_hours"),
+            func.coalesce(func.avg(gaps.c.hours).filter(is_maint), 0).label("MTTR_hours"),
+            func.count().filter(is_failure).label("total_failures"),
+            func.coalesce(func.sum(gaps.c.hours).filter(is_failure), 0).label("failure_gap_hours"),
+            func.count(gaps.c.hours).filter(is_failure).label("failure_gaps"),
+            func.coalesce(func.sum(gaps.c.hours).filter(is_maint), 0).label("maint_gap_hours"),
+            func.count(gaps.c.hours).filter(is_maint).label("maint_gaps"),
+            func.max(gaps.c.datetime).label("last_event_at"),
+            func.coalesce(func.max(gaps.c.id).filter(is_failure), 0).label("last_failure_id"),
+            func.coalesce(func.max(gaps.c.id).filter(is_maint), 0).label("last_maint_id"),
+        )
+        .group_by(gaps.c.machineID)
+        .order_by(gaps.c.machineID)
+    )
+
+def kpi_frame(failures: pl.LazyFrame, maint: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Mismo cálculo que kpi_query sobre LazyFrames (lago Parquet): eventos ordenados por
+    (machineID, datetime, type), horas completas desde el evento previo y promedio por tipo.
+    """
+    events = pl.concat([
+        failures.select("machineID", "datetime", pl.lit("failure").alias("type")),
+        maint.select("machineID", "datetime", pl.lit("maint").alias("type")),
+    ])
+    is_failure, is_maint = pl.col("type") == "failure", pl.col("type") == "maint"
+    return (
+        events.sort("machineID", "datetime", "type")
+        .with_columns(pl.col("datetime").diff().over("machineID").dt.total_hours().cast(pl.Float64).alias("hours"))
+        .group_by("machineID")
+        .agg(
+            pl.col("hours").filter(is_failure).mean().fill_null(0.0).alias("MTBF_hours"),
+            pl.col("hours").filter(is_maint).mean().fill_null(0.0).alias("MTTR_hours"),
+            is_failure.sum().cast(pl.Int64).alias("total_failures"),
+        )
+        .sort("machineID")
+    )
+
+def get_processed_data(bind=read_engine):
+    """Calcula KPIs de confiabilidad (MTBF y MTTR) con funciones de ventana en SQL (o en Polars sobre el lago Parquet)."""
+    if settings.ANALYTICS_BACKEND == "parquet":
+        from src.services.parquet_lake import scan
+        failures = scan("failures")
+        if failures.select("id").head(1).collect().is_empty():
             print("⚠️ No hay datos de fallas suficientes para calcular métricas.")
             return None
+        return kpi_frame(failures, scan("maint")).collect()
+
+    with bind.connect() as conn:
+        if conn.execute(select(Failure.id).limit(1)).first() is None:
+            print("⚠️ No hay datos de fallas suficientes para calcular métricas.")
+            return None
+
+        return pl.read_database(kpi_query(), connection=conn).select(KPI_COLUMNS)
+
+def ensure_stats_table(conn: Connection) -> bool:
+    """
+    Garantiza que 'reliability_stats' tenga el esquema del modelo (con PK para los upserts).
+
+    La versión anterior la creaba pandas.to_sql sin PK ni agregados: se reemplaza dentro de la
+    transacción en curso. Devuelve True si la tabla es nueva y hay que reconstruirla completa.
+    """
+    table = ReliabilityStat.__table__
+    inspector = inspect(conn)
+    if inspector.has_table(table.name, schema=table.schema):
+        columns = {c["name"] for c in inspector.get_columns(table.name, schema=table.schema)}
+        if set(table.columns.keys()) <= columns:
+            return False
+        table.drop(conn)
+    table.create(conn)
+    return True
+
+def new_events(conn: Connection, current: pl.DataFrame, consumed: pl.DataFrame) -> pl.DataFrame:
+    """
+    Eventos de cada fuente y máquina entre la marca consumida y la marca de ingesta actual.
 
-        # 2. Convertir a Polars
-        df_fail = pl.DataFrame([
-            {"machineID": f.machineID, "datetime": f.datetime, "type": "failure"} 
-            for f in fail_results
-        ])
-        
-        df_maint = pl.DataFrame([
-            {"machineID": m.machineID, "datetime": m.datetime, "type": "maint"} 
-            for m in maint_results
-        ])
-
-        # 3. Unión y cálculo de diferencias de tiempo
-        df_combined = pl.concat([df_fail, df_maint]).sort(["machineID", "datetime"])
-
-        # Calculamos la diferencia de tiempo entre eventos consecutivos por máquina
-        df_combined = df_combined.with_columns(
-            pl.col("datetime").diff().over("machineID").alias("diff")
+    Rango sobre (machineID, datetime): escala con el delta, no con la historia. La ingesta confirma
+    eventos y marca en la misma transacción, así que un lote que se confirma más tarde (aunque sus
+    ids sean menores que otros ya procesados) queda por encima de la marca consumida.
+    """
+    ranges = (
+        current.join(consumed, on=["source", "machineID"], how="left")
+        .filter(pl.col("consumed").is_null() | (pl.col("last_datetime") > pl.col("consumed")))
+        .with_columns(pl.col("consumed").fill_null(pl.lit(FULL_HISTORY, pl.Datetime("us"))))
+    )
+    queries = []
+    for name, (model, kind) in KPI_SOURCES.items():
+        rows = ranges.filter(pl.col("source") == name).select("machineID", "consumed", "last_datetime").rows()
+        if not rows:
+            continue
+        window = values(
+            column("machineID", Integer), column("since", DateTime), column("until", DateTime), name=f"{name}_window"
+        ).data(rows)
+        queries.append(
+            select(model.machineID, model.datetime, literal(kind).label("type"), model.id)
+            .select_from(model.__table__.join(window, and_(
+                model.machineID == window.c.machineID, model.datetime > window.c.since, model.datetime <= window.c.until,
+            )))
         )
+    if not queries:
+        return pl.DataFrame(schema=EVENT_SCHEMA)
+    return pl.read_database(union_all(*queries), connection=conn, schema_overrides=EVENT_SCHEMA)
 
-        # 4. Agregación de KPIs (MTBF y MTTR)
-        metrics = df_combined.group_by("machineID").agg([
-            pl.col("diff").filter(pl.col("type") == "failure").dt.total_hours().mean().alias("MTBF_hours"),
-            pl.col("diff").filter(pl.col("type") == "maint").dt.total_hours().mean().alias("MTTR_hours"),
-            pl.col("type").filter(pl.col("type") == "failure").count().alias("total_failures")
-        ]).fill_null(0)
+def append_events(state: pl.DataFrame, events: pl.DataFrame) -> pl.DataFrame:
+    """
+    Suma a los agregados de cada máquina los eventos nuevos, todos posteriores a su 'last_event_at'.
 
-        return metrics
+    Cada máquina aporta una fila semilla con su último evento conocido, de modo que el primer
+    evento nuevo mide su intervalo contra él igual que lo haría LAG() sobre toda la historia.
+    """
+    seeds = state.filter(pl.col("last_event_at").is_not_null()).select(
+        "machineID", pl.col("last_event_at").alias("datetime"), pl.lit("seed").alias("type"), pl.lit(0, pl.Int64).alias("id")
+    )
+    gaps = (
+        pl.concat([seeds, events.select(seeds.columns)])
+        .sort(["machineID", "datetime", "type"])
+        .with_columns(pl.col("datetime").diff().over("machineID").dt.total_hours().cast(pl.Float64).alias("hours"))
+        .filter(pl.col("type") != "seed")
+    )
+    is_failure, is_maint = pl.col("type") == "failure", pl.col("type") == "maint"
+    delta = gaps.group_by("machineID").agg(
+        pl.col("hours").filter(is_failure).sum().alias("d_failure_gap_hours"),
+        pl.col("hours").filter(is_failure).count().alias("d_failure_gaps"),
+        pl.col("hours").filter(is_maint).sum().alias("d_maint_gap_hours"),
+        pl.col("hours").filter(is_maint).count().alias("d_maint_gaps"),
+        is_failure.sum().alias("d_total_failures"),
+        pl.col("datetime").max().alias("d_last_event_at"),
+        pl.col("id").filter(is_failure).max().alias("d_last_failure_id"),
+        pl.col("id").filter(is_maint).max().alias("d_last_maint_id"),
+    )
 
-def update_reliability_table():
+    merged = delta.join(state, on="machineID", how="left").with_columns(pl.exclude("last_event_at", "d_last_event_at").fill_null(0))
+    merged = merged.with_columns(
+        (pl.col("failure_gap_hours") + pl.col("d_failure_gap_hours")).alias("failure_gap_hours"),
+        (pl.col("failure_gaps") + pl.col("d_failure_gaps")).alias("failure_gaps"),
+        (pl.col("maint_gap_hours") + pl.col("d_maint_gap_hours")).alias("maint_gap_hours"),
+        (pl.col("maint_gaps") + pl.col("d_maint_gaps")).alias("maint_gaps"),
+        (pl.col("total_failures") + pl.col("d_total_failures")).alias("total_failures"),
+        pl.col("d_last_event_at").alias("last_event_at"),
+        pl.max_horizontal("last_failure_id", "d_last_failure_id").alias("last_failure_id"),
+        pl.max_horizontal("last_maint_id", "d_last_maint_id").alias("last_maint_id"),
+    )
+    return merged.with_columns(
+        pl.when(pl.col("failure_gaps") > 0).then(pl.col("failure_gap_hours") / pl.col("failure_gaps")).otherwise(0.0).alias("MTBF_hours"),
+        pl.when(pl.col("maint_gaps") > 0).then(pl.col("maint_gap_hours") / pl.col("maint_gaps")).otherwise(0.0).alias("MTTR_hours"),
+    ).select(STATE_COLUMNS)
+
+def upsert_stats(conn: Connection, rows: list[dict]):
+    if not rows:
+        return
+    stmt = insert(ReliabilityStat.__table__).values(rows)
+    updates = {c: stmt.excluded[c] for c in rows[0] if c != "machineID"}
+    conn.execute(stmt.on_conflict_do_update(index_elements=["machineID"], set_={**updates, "updated_at": func.now()}))
+
+def refresh_reliability_stats(full: bool = False, bind=job_engine) -> int:
+    """
+    Mantiene 'reliability_stats' al día y devuelve cuántas máquinas se actualizaron.
+
+    - Incremental (por defecto): sólo procesa los eventos nuevos según las marcas de ingesta
+      (ver new_events) y toca sólo sus máquinas. Si alguno llegó con fecha anterior al último
+      evento conocido de su máquina, esa máquina (y sólo esa) se recalcula desde su historia con kpi_query.
+    - full=True (o sin marcas consumidas todavía): reconstruye todas las máquinas en SQL.
+
+    Todo ocurre en una transacción (upsert/DELETE con MVCC): los lectores siempre ven la
+    versión anterior completa o la nueva, nunca una tabla ausente o a medias.
+    """
+    with bind.begin() as conn:
+        # Dos refrescos simultáneos sumarían dos veces el mismo delta
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('reliability_stats'))"))
+        current = current_watermarks(conn, {name: model for name, (model, _) in KPI_SOURCES.items()})
+        consumed = consumed_watermarks(conn, WATERMARK_PREFIX)
+        full = ensure_stats_table(conn) or full or consumed.is_empty()
+
+        if full:
+            rows = [dict(r) for r in conn.execute(kpi_query()).mappings()]
+            conn.execute(delete(ReliabilityStat))
+            upsert_stats(conn, rows)
+            advance_consumed(conn, WATERMARK_PREFIX, current)
+            bump_data_version(conn)
+            return len(rows)
+
+        events = new_events(conn, current, consumed)
+        if events.is_empty():
+            return 0
+
+        touched = events["machineID"].unique().to_list()
+        stat = ReliabilityStat.__table__
+        state = pl.read_database(
+            select(*[stat.c[c] for c in STATE_COLUMNS]).where(stat.c.machineID.in_(touched)),
+            connection=conn,
+            schema_overrides=STATE_SCHEMA,
+        )
+
+        # Eventos tardíos (no posteriores al último conocido) obligan a recalcular su máquina
+        first_new = events.group_by("machineID").agg(pl.col("datetime").min().alias("first_new"))
+        late = (
+            first_new.join(state.select("machineID", "last_event_at"), on="machineID")
+            .filter(pl.col("first_new") <= pl.col("last_event_at"))["machineID"].to_list()
+        )
+
+        rows = [dict(r) for r in conn.execute(kpi_query(late)).mappings()] if late else []
+        appended = append_events(
+            state.filter(~pl.col("machineID").is_in(late)),
+            events.filter(~pl.col("machineID").is_in(late)),
+        )
+        upsert_stats(conn, rows + appended.to_dicts())
+        advance_consumed(conn, WATERMARK_PREFIX, current)
+        bump_data_version(conn)
+        return len(touched)
+
+def update_reliability_table(full: bool = False):
     """Calcula las métricas y las guarda en la tabla 'reliability_stats'."""
     print("🚀 Iniciando procesamiento de KPIs estratégicos en Neon...")
-    
-    summary = get_processed_data()
-    
-    if summary is not None:
-        try:
-            # Guardamos con el esquema correcto para evitar que se vaya a 'public'
-            summary.to_pandas().to_sql(
-                "reliability_stats", 
-                con=engine, 
-                schema=settings.DB_SCHEMA, # Forzamos el esquema 'maintenance'
-                if_exists="replace", 
-                index=False
-            )
-            print("✅ Tabla 'reliability_stats' actualizada con éxito en el esquema:", settings.DB_SCHEMA)
-            print(summary.head())
-        except Exception as e:
-            print(f"❌ Error al guardar en la base de datos: {e}")
-    else:
-        print("❌ No se pudo actualizar la tabla por falta de datos origen.")
+
+    try:
+        updated = refresh_reliability_stats(full=full)
+        if updated:
+            print(f"✅ Tabla 'reliability_stats' actualizada ({updated} máquinas) en el esquema:", settings.DB_SCHEMA)
+        else:
+            print("✅ 'reliability_stats' ya estaba al día: no hay eventos nuevos.")
+    except Exception as e:
+        print(f"❌ Error al guardar en la base de datos: {e}")
 
 if __name__ == "__main__":
-    update_reliability_table()
\ No newline at end of file
+    update_reliability_table(full="--full" in sys.argv)
@@ -0,0 +1,192 @@
+# src/analysis/telemetry_rollups.py
+import argparse
+import logging
+import time
+from datetime import datetime
+import polars as pl
+from sqlalchemy import Connection, DateTime, Integer, Table, and_, column, delete, func, inspect, literal_column, select, values
+from sqlalchemy.dialects.postgresql import insert
+
+from src.database.session import job_engine
+from src.models.telemetry import Telemetry
+from src.models.telemetry_rollup import TelemetryDaily, TelemetryWeekly
+from src.services.query_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+SENSORS = ["volt", "rotate", "pressure", "vibration"]
+STATS = ["mean", "min", "max", "std", "count"]
+
+# Grano -> (modelo, unidad de date_trunc). 'week' en PostgreSQL son semanas ISO (lunes)
+ROLLUPS = {
+    "daily": (TelemetryDaily, "day"),
+    "weekly": (TelemetryWeekly, "week"),
+}
+
+def rollup_columns() -> list[str]:
+    return ["machineID", "bucket", "samples"] + [f"{s}_{stat}" for s in SENSORS for stat in STATS]
+
+def rollup_query(grain: str, windows: pl.DataFrame | None = None):
+    """
+    SELECT que agrega la telemetría horaria por máquina y bucket del grano pedido.
+
+    Con 'windows' (machineID, first, last) sólo se recalculan los buckets que contienen ese
+    rango de cada máquina: un rango sobre la PK/índice (machineID, datetime), no un scan completo.
+    """
+    unit = ROLLUPS[grain][1]
+    t = Telemetry.__table__
+    bucket = func.date_trunc(unit, t.c.datetime)
+
+    aggregates = []
+    for s in SENSORS:
+        aggregates += [
+            func.avg(t.c[s]).label(f"{s}_mean"),
+            func.min(t.c[s]).label(f"{s}_min"),
+            func.max(t.c[s]).label(f"{s}_max"),
+            func.stddev_samp(t.c[s]).label(f"{s}_std"),
+            func.count(t.c[s]).label(f"{s}_count"),
+        ]
+    query = select(t.c.machineID, bucket.label("bucket"), func.count().label("samples"), *aggregates)
+
+    if windows is not None:
+        touched = values(
+            column("machineID", Integer), column("first", DateTime), column("last", DateTime), name="touched"
+        ).data(list(windows.select("machineID", "first", "last").iter_rows()))
+        step = literal_column(f"interval '1 {unit}'")
+        query = query.select_from(t.join(touched, and_(
+            t.c.machineID == touched.c.machineID,
+            t.c.datetime >= func.date_trunc(unit, touched.c.first),
+            t.c.datetime < func.date_trunc(unit, touched.c.last) + step,
+        )))
+
+    return query.group_by(t.c.machineID, bucket)
+
+def upsert_rollup(conn: Connection, grain: str, query) -> int:
+    table = ROLLUPS[grain][0].__table__
+    columns = rollup_columns()
+    stmt = insert(table).from_select(columns, query)
+    updates = {c: stmt.excluded[c] for c in columns if c not in ("machineID", "bucket")}
+    result = conn.execute(stmt.on_conflict_do_update(
+        index_elements=["machineID", "bucket"], set_={**updates, "updated_at": func.now()}
+    ))
+    return result.rowcount
+
+def touched_windows(batch: pl.DataFrame) -> pl.DataFrame:
+    """Rango de datetime que aporta un lote a cada máquina (se acumula entre lotes)."""
+    return batch.group_by("machineID").agg(
+        pl.col("datetime").min().alias("first"), pl.col("datetime").max().alias("last")
+    )
+
+def merge_windows(windows: list[pl.DataFrame]) -> pl.DataFrame | None:
+    if not windows:
+        return None
+    return pl.concat(windows).group_by("machineID").agg(pl.col("first").min(), pl.col("last").max())
+
+def refresh_rollups(conn: Connection, windows: pl.DataFrame | None) -> int:
+    """
+    Recalcula, dentro de la transacción de la ingesta, sólo los buckets diarios y semanales
+    afectados por los datos recién cargados. Devuelve cuántas filas de rollup se escribieron.
+    """
+    if windows is None or windows.is_empty():
+        return 0
+    return sum(upsert_rollup(conn, grain, rollup_query(grain, windows)) for grain in ROLLUPS)
+
+def outdated_rollups(conn: Connection) -> list[Table]:
+    """Tablas de rollup que existen con un esquema anterior al del modelo (p.ej. sin los '<sensor>_count')."""
+    inspector = inspect(conn)
+    outdated = []
+    for model, _ in ROLLUPS.values():
+        table = model.__table__
+        if inspector.has_table(table.name, schema=table.schema):
+            columns = {c["name"] for c in inspector.get_columns(table.name, schema=table.schema)}
+            if not set(table.columns.keys()) <= columns:
+                outdated.append(table)
+    return outdated
+
+def ensure_rollups(bind=job_engine) -> bool:
+    """Si alguna tabla de rollup tiene un esquema anterior, reconstruye los rollups. Devuelve True si lo hizo."""
+    with bind.connect() as conn:
+        if not outdated_rollups(conn):
+            return False
+    logger.info("📊 Rollups con un esquema anterior: reconstruyendo desde la telemetría cruda...")
+    rebuild_rollups(bind)
+    return True
+
+def rebuild_rollups(bind=job_engine) -> dict[str, int]:
+    """
+    Reconstruye desde cero todas las tablas de rollup (una transacción: los lectores nunca las ven vacías).
+    Una tabla con un esquema anterior se reemplaza dentro de la misma transacción.
+    """
+    written = {}
+    with bind.begin() as conn:
+        for table in outdated_rollups(conn):
+            table.drop(conn)
+        for grain, (model, _) in ROLLUPS.items():
+            model.__table__.create(conn, checkfirst=True)
+            conn.execute(delete(model))
+            written[grain] = upsert_rollup(conn, grain, rollup_query(grain))
+        bump_data_version(conn)
+    return written
+
+def rollup_series(conn: Connection, machine_id: int, grain: str = "daily",
+                  start: datetime | None = None, end: datetime | None = None) -> pl.DataFrame:
+    """Serie agregada de una máquina en [start, end), ordenada por bucket."""
+    table = ROLLUPS[grain][0].__table__
+    query = select(*[table.c[c] for c in rollup_columns()]).where(table.c.machineID == machine_id)
+    if start is not None:
+        query = query.where(table.c.bucket >= start)
+    if end is not None:
+        query = query.where(table.c.bucket < end)
+    return pl.read_database(query.order_by(table.c.bucket), connection=conn)
+
+def rollup_span(conn: Connection, machine_id: int) -> tuple[datetime | None, datetime | None]:
+    """Primer y último día con telemetría de una máquina (sin tocar la tabla cruda)."""
+    table = TelemetryDaily.__table__
+    return conn.execute(
+        select(func.min(table.c.bucket), func.max(table.c.bucket)).where(table.c.machineID == machine_id)
+    ).one()
+
+def fleet_summary(conn: Connection, grain: str = "weekly",
+                  start: datetime | None = None, end: datetime | None = None) -> pl.DataFrame:
+    """
+    Estadísticos por máquina sobre [start, end) combinando los buckets del rollup.
+
+    La media es la ponderada por las lecturas no nulas de cada sensor ('<sensor>_count', no 'samples')
+    y la desviación estándar la combinada (suma de (n-1)·s² + n·m², menos N·M²), así que coinciden con
+    las de la telemetría cruda aunque haya lecturas con sensores vacíos.
+    """
+    table = ROLLUPS[grain][0].__table__
+    query = select(*[table.c[c] for c in rollup_columns()])
+    if start is not None:
+        query = query.where(table.c.bucket >= start)
+    if end is not None:
+        query = query.where(table.c.bucket < end)
+    df = pl.read_database(query, connection=conn)
+
+    aggregates = [pl.col("samples").sum()]
+    for s in SENSORS:
+        n, mean, std = pl.col(f"{s}_count"), pl.col(f"{s}_mean"), pl.col(f"{s}_std").fill_null(0)
+        total = (n * mean).sum() / n.sum()
+        squares = ((n - 1) * std.pow(2) + n * mean.pow(2)).sum()
+        aggregates += [
+            total.alias(f"{s}_mean"),
+            pl.col(f"{s}_min").min(),
+            pl.col(f"{s}_max").max(),
+            ((squares - n.sum() * total.pow(2)) / (n.sum() - 1)).clip(lower_bound=0).sqrt().alias(f"{s}_std"),
+        ]
+    return df.group_by("machineID").agg(aggregates).sort("machineID")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Rollups diarios y semanales de la telemetría.")
+    parser.add_argument("--rebuild", action="store_true", help="Reconstruye los rollups desde la telemetría cruda.")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        print("🚀 Reconstruyendo rollups de telemetría...")
+        start = time.perf_counter()
+        written = rebuild_rollups()
+        print(f"✅ Rollups reconstruidos en {time.perf_counter() - start:.1f}s: "
+              + ", ".join(f"{grain}={rows:,}" for grain, rows in written.items()))
+    else:
+        parser.print_help()
@@ -0,0 +1,207 @@
+# src/analysis/weibull.py
+import argparse
+import logging
+import math
+import time
+import numpy as np
+import polars as pl
+from sqlalchemy import Connection, delete, select, text
+
+from src.core.config import settings
+from src.database.bulk_copy import copy_frame
+from src.database.session import job_engine
+from src.models.failure import Failure
+from src.models.maintenance import Maintenance
+from src.models.reliability import ReliabilityWeibull
+from src.models.telemetry import Telemetry
+from src.models.watermark import IngestionWatermark
+from src.services.query_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+# Intervalo de búsqueda de la forma k y corte del Newton (cambio relativo de k)
+SHAPE_MIN, SHAPE_MAX = 0.05, 50.0
+MAX_ITERATIONS = 100
+TOLERANCE = 1e-9
+# Fracción de falla que define la vida B10
+B10_FRACTION = 0.10
+
+OUTPUT_COLUMNS = [c for c in ReliabilityWeibull.__table__.columns.keys() if c not in ("created_at", "updated_at")]
+
+def lifetimes_frame(failures: pl.LazyFrame, maint: pl.LazyFrame, observed_until: pl.LazyFrame) -> pl.LazyFrame:
+    """
+    Vidas de cada componente por máquina: de un reemplazo al siguiente o al fin de la observación.
+
+    - Reemplazos = mantenimientos ('comp') y fallas ('failure'); una falla y su mantenimiento
+      correctivo en el mismo instante cuentan una sola vez, como falla.
+    - La vida termina en falla (event=1) o queda censurada (event=0) si el componente se cambió
+      preventivamente o si llegó 'observed_until' (por máquina) sin fallar.
+    - La vida previa al primer reemplazo no tiene inicio conocido y se descarta.
+    """
+    replacements = pl.concat([
+        failures.select("machineID", "datetime", pl.col("failure").alias("comp"), pl.lit(1, pl.Int8).alias("event")),
+        maint.select("machineID", "datetime", "comp", pl.lit(0, pl.Int8).alias("event")),
+    ])
+    # A igual instante la falla queda primero: la vida anterior termina en ella y el tramo de 0 horas
+    # hasta su mantenimiento correctivo se descarta con el filtro final (sin deduplicar aparte)
+    same_series = (pl.col("machineID").shift(-1) == pl.col("machineID")) & (pl.col("comp").shift(-1) == pl.col("comp"))
+    return (
+        replacements.sort("machineID", "comp", "datetime", "event", descending=[False, False, False, True])
+        # El siguiente reemplazo se toma antes del join: el join no conserva el orden de las filas
+        .with_columns(
+            pl.when(same_series).then(pl.col("datetime").shift(-1)).alias("end"),
+            pl.when(same_series).then(pl.col("event").shift(-1)).otherwise(0).alias("event"),
+        )
+        .join(observed_until, on="machineID", how="left")
+        .with_columns(pl.coalesce("end", "observed_until").alias("end"))
+        .select(
+            "machineID", "comp", "end", "event",
+            ((pl.col("end") - pl.col("datetime")).dt.total_seconds() / 3600).alias("hours"),
+        )
+        .filter(pl.col("hours") > 0)
+    )
+
+def fit_weibull(hours: np.ndarray, events: np.ndarray, starts: np.ndarray, min_failures: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    MLE de Weibull con censura por la derecha para todas las series a la vez.
+
+    'hours'/'events' traen las vidas ordenadas por serie y 'starts' el índice de la primera vida
+    de cada serie. Para una forma k la escala óptima es cerrada (λ^k = Σ t^k / r, con r fallas),
+    así que basta resolver en k la ecuación del perfil de verosimilitud
+
+        g(k) = Σ t^k ln t / Σ t^k - 1/k - Σ_fallas ln t / r = 0,
+
+    creciente en k (raíz única). Se resuelve con Newton acotado por bisección sobre un vector
+    con una k por serie: cada iteración es un exp y tres sumas por tramo (np.add.reduceat) sobre
+    todas las vidas de la flota, sin bucles de Python por serie. Los tiempos se dividen por el
+    máximo de su serie: t^k no desborda con k grande y la forma no cambia (la escala se reescala).
+
+    Devuelve (forma, escala en horas) por serie; NaN si tiene menos de 'min_failures' fallas
+    o si la raíz cae fuera de [SHAPE_MIN, SHAPE_MAX] (p.ej. todas las fallas en la vida más larga).
+    """
+    sizes = np.diff(np.append(starts, len(hours)))
+    series = np.repeat(np.arange(len(starts)), sizes)
+    failures = np.add.reduceat(events, starts)
+    t_max = np.maximum.reduceat(hours, starts)
+    log_x = np.log(hours / t_max[series])
+    mean_log_failure = np.add.reduceat(events * log_x, starts) / np.maximum(failures, 1)
+
+    def profile(k: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        # x <= 1 y la vida más larga de cada serie aporta x^k = 1: s0 >= 1, sin divisiones por cero
+        x_k = np.exp(k[series] * log_x)
+        s0 = np.add.reduceat(x_k, starts)
+        s1 = np.add.reduceat(x_k * log_x, starts)
+        s2 = np.add.reduceat(x_k * log_x * log_x, starts)
+        mean = s1 / s0
+        return mean - 1 / k - mean_log_failure, s2 / s0 - mean * mean + 1 / (k * k), s0
+
+    lo, hi = np.full(len(starts), SHAPE_MIN), np.full(len(starts), SHAPE_MAX)
+    active = (failures >= max(min_failures, 1)) & (profile(lo)[0] < 0) & (profile(hi)[0] > 0)
+    k = np.ones(len(starts))
+    pending = active.copy()
+    for _ in range(MAX_ITERATIONS):
+        if not pending.any():
+            break
+        g, dg, _ = profile(k)
+        lo = np.where(g < 0, k, lo)
+        hi = np.where(g > 0, k, hi)
+        newton = k - g / dg
+        # Si Newton sale del intervalo que encierra la raíz, se bisecciona (en escala log)
+        step = np.where((newton > lo) & (newton < hi), newton, np.sqrt(lo * hi))
+        done = np.abs(step - k) <= TOLERANCE * k
+        k = np.where(pending, step, k)
+        pending &= ~done
+    if pending.any():
+        logger.warning(f"⚠️ Weibull: {int(pending.sum())} series no convergieron en {MAX_ITERATIONS} iteraciones")
+
+    s0 = profile(k)[2]
+    scale = t_max * (s0 / np.maximum(failures, 1)) ** (1 / k)
+    fitted = active & ~pending
+    return np.where(fitted, k, np.nan), np.where(fitted, scale, np.nan)
+
+def weibull_frame(lives: pl.DataFrame, min_failures: int | None = None) -> pl.DataFrame:
+    """Una fila por máquina×componente con el ajuste, B10, vida media y los conteos de vidas."""
+    min_failures = settings.WEIBULL_MIN_FAILURES if min_failures is None else min_failures
+    ordered = lives.sort("machineID", "comp")
+    summary = (
+        ordered.with_row_index("row")
+        .group_by("machineID", "comp", maintain_order=True)
+        .agg(
+            pl.col("row").first().alias("start"),
+            pl.col("event").sum().cast(pl.Int64).alias("failures"),
+            (pl.len() - pl.col("event").sum()).cast(pl.Int64).alias("censored"),
+            pl.col("hours").sum().alias("exposure_hours"),
+            pl.col("end").max().alias("observed_until"),
+        )
+    )
+    shape, scale = fit_weibull(
+        ordered["hours"].to_numpy(),
+        ordered["event"].cast(pl.Float64).to_numpy(),
+        summary["start"].to_numpy(),
+        min_failures,
+    )
+    # Γ(1 + 1/k) sólo donde hubo ajuste (numpy no trae gamma)
+    mean_factor = np.full(len(shape), np.nan)
+    fitted = ~np.isnan(shape)
+    mean_factor[fitted] = [math.gamma(1 + 1 / k) for k in shape[fitted]]
+    with np.errstate(invalid="ignore"):
+        b10 = scale * (-math.log(1 - B10_FRACTION)) ** (1 / shape)
+
+    return summary.with_columns(
+        pl.Series("shape", shape).fill_nan(None),
+        pl.Series("scale_hours", scale).fill_nan(None),
+        pl.Series("b10_hours", b10).fill_nan(None),
+        pl.Series("mean_life_hours", scale * mean_factor).fill_nan(None),
+    ).select(OUTPUT_COLUMNS)
+
+def read_lifetimes(conn: Connection) -> pl.DataFrame:
+    """Vidas desde PostgreSQL; la observación de cada máquina llega hasta su marca de agua de telemetría."""
+    event_schema = {"machineID": pl.Int64, "datetime": pl.Datetime("us"), "comp": pl.String, "failure": pl.String}
+    failures = pl.read_database(select(Failure.machineID, Failure.datetime, Failure.failure), connection=conn, schema_overrides=event_schema)
+    maint = pl.read_database(select(Maintenance.machineID, Maintenance.datetime, Maintenance.comp), connection=conn, schema_overrides=event_schema)
+    wm = IngestionWatermark.__table__
+    observed = pl.read_database(
+        select(wm.c.machineID, wm.c.last_datetime.label("observed_until")).where(wm.c.table_name == Telemetry.__tablename__),
+        connection=conn,
+        schema_overrides={"machineID": pl.Int64, "observed_until": pl.Datetime("us")},
+    )
+    return lifetimes_frame(failures.lazy(), maint.lazy(), observed.lazy()).collect()
+
+def refresh_weibull(bind=job_engine, min_failures: int | None = None) -> pl.DataFrame:
+    """
+    Reajusta toda la flota y reemplaza 'reliability_weibull' en una transacción (los lectores ven
+    el ajuste anterior completo o el nuevo). Devuelve el frame escrito.
+    """
+    with bind.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('reliability_weibull'))"))
+        ReliabilityWeibull.__table__.create(conn, checkfirst=True)
+
+        start = time.perf_counter()
+        lives = read_lifetimes(conn)
+        read_at = time.perf_counter()
+        fits = weibull_frame(lives, min_failures)
+        fit_at = time.perf_counter()
+
+        conn.execute(delete(ReliabilityWeibull))
+        copy_frame(conn, ReliabilityWeibull.__table__, fits)
+        bump_data_version(conn)
+        logger.info(
+            f"📐 Weibull: {lives.height:,} vidas leídas en {read_at - start:.2f}s, {fits.height:,} series "
+            f"ajustadas en {fit_at - read_at:.2f}s, escritas en {time.perf_counter() - fit_at:.2f}s"
+        )
+    return fits
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Ajuste Weibull por máquina y componente (con censura).")
+    parser.add_argument("--min-failures", type=int, default=None, help="Fallas mínimas por serie (por defecto WEIBULL_MIN_FAILURES).")
+    args = parser.parse_args()
+
+    print("🚀 Ajustando Weibull por máquina y componente...")
+    fits = refresh_weibull(min_failures=args.min_failures)
+    fitted = fits.filter(pl.col("shape").is_not_null())
+    print(f"✅ Tabla '{ReliabilityWeibull.__tablename__}' actualizada: {fits.height:,} series, {fitted.height:,} con ajuste.")
+    if not fitted.is_empty():
+        print(fitted.group_by("comp").agg(
+            pl.len().alias("series"), pl.col("shape").median().alias("forma_mediana"), pl.col("b10_hours").median().alias("b10_mediana_h"),
+        ).sort("comp"))
@@ -0,0 +1,50 @@
+# src/api/middleware.py
+import time
+
+from src.core.metrics import histogram
+
+REQUEST_SECONDS = histogram(
+    "pdm_http_request_seconds",
+    "Tiempo hasta el inicio de la respuesta por método, ruta (plantilla) y código HTTP.",
+    ("method", "route", "status"),
+)
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI (puro, no envuelve el cuerpo) que mide cada request HTTP hasta que sale la
+    cabecera de la respuesta: en los streams (NDJSON, Arrow, SSE) eso es la latencia que ve el
+    cliente, no la duración de la descarga.
+
+    La ruta es la plantilla de FastAPI ('/api/v1/machines/{machine_id}'), así la cardinalidad no
+    crece con los IDs; lo montado (Dash) se agrupa por su prefijo.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        observed = False
+
+        def observe(status):
+            nonlocal observed
+            observed = True
+            route = scope.get("route")
+            label = getattr(route, "path", None) or scope.get("root_path") or "unmatched"
+            REQUEST_SECONDS.observe(time.perf_counter() - start, method=scope["method"], route=label, status=status)
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start" and not observed:
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        except Exception:
+            if not observed:
+                observe(500)
+            raise
@@ -0,0 +1,255 @@
+# src/api/v1/router.py
+import math
+from datetime import datetime
+from typing import Annotated, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.api.v1.streaming import NDJSON_MEDIA_TYPE, SSE_MEDIA_TYPE, ndjson_response, sse_events, sse_response
+from src.database.async_session import get_async_db
+from src.models.error import Error
+from src.models.failure import Failure
+from src.models.machine import Machine
+from src.models.maintenance import Maintenance
+from src.models.reliability import ReliabilityStat
+from src.models.telemetry import Telemetry
+from src.schemas.events import ErrorRead, FailureRead, MaintenanceRead
+from src.schemas.machine import MachineRead
+from src.schemas.prediction import FailurePredictionRead
+from src.schemas.reliability import ReliabilityKPI
+from src.schemas.telemetry import PushIngestStats, TelemetryPushAccepted
+from src.services.columnar_export import EXPORT_FORMATS, EXPORT_TABLES, export_stream
+from src.services.live_feed import live_feed
+from src.services.push_ingestion import ARROW_MEDIA_TYPE, parse_readings, telemetry_buffer
+from src.services.predictions import cached_predictions
+
+router = APIRouter(prefix="/api/v1", tags=["v1"])
+
+# Tope para los listados JSON (la telemetría no tiene tope: se envía por streaming)
+MAX_EVENTS = 10_000
+
+def time_range(
+    start: Annotated[datetime | None, Query(description="Desde (incluido), ISO 8601")] = None,
+    end: Annotated[datetime | None, Query(description="Hasta (excluido), ISO 8601")] = None,
+) -> tuple[datetime | None, datetime | None]:
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(status_code=422, detail="'start' debe ser anterior a 'end'.")
+    return start, end
+
+# Parámetros comunes de los endpoints (Annotated: sin llamadas en los valores por defecto)
+Db = Annotated[AsyncSession, Depends(get_async_db)]
+TimeWindow = Annotated[tuple, Depends(time_range)]
+EventLimit = Annotated[int, Query(ge=1, le=MAX_EVENTS)]
+
+def machine_range_query(model, machine_id: int, window: tuple[datetime | None, datetime | None], columns):
+    """SELECT de una máquina en [start, end) ordenado por datetime: rango sobre el índice (machineID, datetime)."""
+    start, end = window
+    query = select(*columns).where(model.machineID == machine_id)
+    if start is not None:
+        query = query.where(model.datetime >= start)
+    if end is not None:
+        query = query.where(model.datetime < end)
+    return query.order_by(model.datetime)
+
+# ==============================
+# 🏭 Máquinas
+# ==============================
+@router.get("/machines", response_model=list[MachineRead])
+async def list_machines(db: Db):
+    result = await db.execute(select(Machine.machineID, Machine.model, Machine.age).order_by(Machine.machineID))
+    return result.mappings().all()
+
+# ==============================
+# 📈 Telemetría (NDJSON por streaming)
+# ==============================
+@router.get(
+    "/machines/{machine_id}/telemetry",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "Una lectura (TelemetryRead) por línea."}},
+)
+async def machine_telemetry(
+    machine_id: int,
+    window: TimeWindow,
+    limit: Annotated[int | None, Query(ge=1, description="Máximo de lecturas (sin tope por defecto)")] = None,
+):
+    """Lecturas horarias de una máquina en [start, end), en orden cronológico y en NDJSON."""
+    t = Telemetry.__table__
+    query = machine_range_query(Telemetry, machine_id, window, [t.c.datetime, t.c.machineID, t.c.volt, t.c.rotate, t.c.pressure, t.c.vibration])
+    if limit is not None:
+        query = query.limit(limit)
+    return ndjson_response(query)
+
+# ==============================
+# 🔴 Novedades en vivo (Server-Sent Events)
+# ==============================
+@router.get(
+    "/machines/{machine_id}/live",
+    response_class=StreamingResponse,
+    responses={200: {"content": {SSE_MEDIA_TYPE: {}}, "description": "Un evento JSON por novedad: telemetry (columnas), errors, failures."}},
+)
+async def machine_live(machine_id: int):
+    """Empuja la telemetría y los eventos nuevos de una máquina a medida que se ingieren."""
+    async def events():
+        queue = await live_feed.subscribe(machine_id)
+        try:
+            async for event in sse_events(queue):
+                yield event
+        finally:
+            live_feed.unsubscribe(machine_id, queue)
+    return sse_response(events())
+
+@router.get("/live/stats")
+async def live_stats():
+    return live_feed.stats()
+
+# ==============================
+# 📥 Ingesta push de telemetría (gateways de borde)
+# ==============================
+@router.post(
+    "/ingest/telemetry",
+    status_code=202,
+    response_model=TelemetryPushAccepted,
+    openapi_extra={"requestBody": {"content": {"application/json": {}, ARROW_MEDIA_TYPE: {}}}},
+    responses={
+        429: {"description": "Buffer lleno: reintentar tras 'Retry-After' segundos."},
+        503: {"description": "La escritura a la base de datos está fallando y el buffer se llenó: reintentar tras 'Retry-After' segundos."},
+    },
+)
+async def push_telemetry(request: Request):
+    """
+    Recibe un lote de lecturas (JSON: lista de TelemetryRead; o stream Arrow IPC) y lo encola.
+
+    Las lecturas se escriben en el próximo micro-lote del buffer (ver src/services/push_ingestion.py).
+    """
+    try:
+        readings = parse_readings(await request.body(), request.headers.get("content-type", "application/json"))
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Lote de telemetría inválido: {e}") from e
+
+    telemetry_buffer.start()
+    if not telemetry_buffer.offer(readings):
+        if telemetry_buffer.retrying:
+            # Lo pendiente no baja hasta que la DB vuelva: no es un pico de carga sino una caída
+            raise HTTPException(
+                status_code=503,
+                detail="La escritura de telemetría está fallando, reintente más tarde.",
+                headers={"Retry-After": str(max(1, math.ceil(telemetry_buffer.retry_in)))},
+            )
+        raise HTTPException(
+            status_code=429,
+            detail="Buffer de ingesta lleno, reintente más tarde.",
+            headers={"Retry-After": str(max(1, round(telemetry_buffer.flush_seconds)))},
+        )
+    return {"accepted": readings.height, "queued": telemetry_buffer.queued}
+
+@router.get("/ingest/stats", response_model=PushIngestStats)
+async def push_stats():
+    return telemetry_buffer.stats()
+
+# ==============================
+# 🚨 Eventos
+# ==============================
+async def machine_events(db: AsyncSession, model, detail, machine_id: int, window, limit: int):
+    """Eventos de una máquina en [start, end) con sus columnas básicas más 'detail' (errorID, failure o comp)."""
+    query = machine_range_query(model, machine_id, window, [model.id, model.datetime, model.machineID, detail])
+    result = await db.execute(query.limit(limit))
+    return result.mappings().all()
+
+@router.get("/machines/{machine_id}/errors", response_model=list[ErrorRead])
+async def machine_errors(
+    machine_id: int,
+    window: TimeWindow,
+    db: Db,
+    limit: EventLimit = 1_000,
+):
+    return await machine_events(db, Error, Error.errorID, machine_id, window, limit)
+
+@router.get("/machines/{machine_id}/failures", response_model=list[FailureRead])
+async def machine_failures(
+    machine_id: int,
+    window: TimeWindow,
+    db: Db,
+    limit: EventLimit = 1_000,
+):
+    return await machine_events(db, Failure, Failure.failure, machine_id, window, limit)
+
+@router.get("/machines/{machine_id}/maint", response_model=list[MaintenanceRead])
+async def machine_maintenance(
+    machine_id: int,
+    window: TimeWindow,
+    db: Db,
+    limit: EventLimit = 1_000,
+):
+    return await machine_events(db, Maintenance, Maintenance.comp, machine_id, window, limit)
+
+# ==============================
+# 📊 KPIs de confiabilidad
+# ==============================
+def kpi_select():
+    return select(ReliabilityStat.machineID, ReliabilityStat.MTBF_hours, ReliabilityStat.MTTR_hours, ReliabilityStat.total_failures)
+
+@router.get("/kpis", response_model=list[ReliabilityKPI])
+async def list_kpis(db: Db):
+    result = await db.execute(kpi_select().order_by(ReliabilityStat.machineID))
+    return result.mappings().all()
+
+@router.get("/machines/{machine_id}/kpis", response_model=ReliabilityKPI)
+async def machine_kpis(machine_id: int, db: Db):
+    row = (await db.execute(kpi_select().where(ReliabilityStat.machineID == machine_id))).mappings().one_or_none()
+    if row is None:
+        raise HTTPException(status_code=404, detail=f"Sin KPIs para la máquina {machine_id}.")
+    return row
+
+# ==============================
+# 🔮 Riesgo de falla (precalculado por src/services/scoring.py)
+# ==============================
+# Endpoints sync a propósito: leen un dict en memoria (caché invalidada por versión de datos)
+# y FastAPI los corre en su threadpool, así la recarga ocasional desde la DB no bloquea el event loop.
+@router.get("/predictions", response_model=list[FailurePredictionRead])
+def list_predictions(min_risk: Annotated[float, Query(ge=0, le=1, description="Sólo riesgos >= min_risk")] = 0.0):
+    return [p for rows in cached_predictions().values() for p in rows if p["risk"] >= min_risk]
+
+@router.get("/machines/{machine_id}/predictions", response_model=list[FailurePredictionRead])
+def machine_predictions(machine_id: int):
+    rows = cached_predictions().get(machine_id)
+    if rows is None:
+        raise HTTPException(status_code=404, detail=f"Sin predicciones para la máquina {machine_id}.")
+    return rows
+
+# ==============================
+# 📦 Exportación columnar (Arrow IPC / Parquet)
+# ==============================
+@router.get(
+    "/export/{table}",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media: {} for media, _ in EXPORT_FORMATS.values()}, "description": "Stream Arrow IPC o archivo Parquet."}},
+)
+async def export_table(
+    table: Literal["telemetry", "errors", "failures", "maint"],
+    window: TimeWindow,
+    format: Literal["arrow", "parquet"] = "arrow",
+    columns: Annotated[str | None, Query(description="Columnas separadas por coma (por defecto todas)")] = None,
+    machine_ids: Annotated[list[int] | None, Query(alias="machine_id", description="Repetible: ?machine_id=1&machine_id=2")] = None,
+):
+    """
+    Extracto columnar de una tabla con proyección y filtros por máquina y tiempo.
+
+    Los datos salen de PostgreSQL con COPY y viajan como columnas Arrow (sin JSON ni dicts
+    por fila); la respuesta se envía por lotes a medida que se leen.
+    """
+    try:
+        body = export_stream(
+            table, format,
+            columns=[c.strip() for c in columns.split(",") if c.strip()] if columns else None,
+            machine_ids=machine_ids, start=window[0], end=window[1],
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from e
+
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        body, media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{EXPORT_TABLES[table].__tablename__}.{extension}"'},
+    )
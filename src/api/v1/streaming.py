@@ -0,0 +1,62 @@
+# src/api/v1/streaming.py
+import asyncio
+from typing import AsyncIterator
+import polars as pl
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from src.core.config import settings
+from src.database.async_session import async_engine
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+SSE_MEDIA_TYPE = "text/event-stream"
+# Mismo formato ISO 8601 que los endpoints JSON (pydantic); la telemetría es horaria
+NDJSON_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+async def stream_batches(query: Select, chunk_rows: int | None = None) -> AsyncIterator[pl.DataFrame]:
+    """
+    Ejecuta 'query' con un cursor de servidor y entrega el resultado en DataFrames de 'chunk_rows' filas.
+
+    Sólo un lote vive en memoria a la vez, sea cual sea el tamaño del resultado. La conexión
+    se mantiene abierta mientras dura la respuesta y se devuelve al pool al terminar o si
+    el cliente se desconecta.
+    """
+    chunk_rows = chunk_rows or settings.API_STREAM_CHUNK_ROWS
+    async with async_engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_rows))
+        columns = list(result.keys())
+        async for rows in result.partitions(chunk_rows):
+            yield pl.DataFrame(rows, schema=columns, orient="row")
+
+async def ndjson_lines(query: Select, chunk_rows: int | None = None) -> AsyncIterator[str]:
+    async for batch in stream_batches(query, chunk_rows):
+        # Serialización vectorizada de todo el lote (sin json.dumps fila a fila)
+        yield batch.with_columns(pl.col(pl.Datetime).dt.strftime(NDJSON_DATETIME_FORMAT)).write_ndjson()
+
+def ndjson_response(query: Select, chunk_rows: int | None = None) -> StreamingResponse:
+    """Respuesta NDJSON (una fila JSON por línea) enviada por partes a medida que llega de la DB."""
+    return StreamingResponse(ndjson_lines(query, chunk_rows), media_type=NDJSON_MEDIA_TYPE)
+
+async def sse_events(messages: asyncio.Queue, keepalive: float | None = None) -> AsyncIterator[str]:
+    """
+    Mensajes JSON de la cola como Server-Sent Events hasta recibir None.
+
+    Si no hay novedades en 'keepalive' segundos se envía un comentario, para que proxies y
+    balanceadores no cierren la conexión por inactividad.
+    """
+    keepalive = keepalive or settings.LIVE_KEEPALIVE_SECONDS
+    while True:
+        try:
+            message = await asyncio.wait_for(messages.get(), timeout=keepalive)
+        except asyncio.TimeoutError:
+            yield ": keepalive\n\n"
+            continue
+        if message is None:
+            return
+        yield f"data: {message}\n\n"
+
+def sse_response(events: AsyncIterator[str]) -> StreamingResponse:
+    # X-Accel-Buffering: evita que nginx acumule el stream antes de enviarlo
+    return StreamingResponse(
+        events, media_type=SSE_MEDIA_TYPE, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
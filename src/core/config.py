@@ -16,6 +16,73 @@ class Settings(BaseSettings):
 
     DATA_PATH: Path = BASE_DIR / "Data"
 
+    # Procesos de la ingesta paralela (1 = secuencial)
+    INGEST_WORKERS: int = 1
+
+    # Particionado mensual de 'telemetry' por rango de datetime (sólo aplica al crear la tabla)
+    TELEMETRY_PARTITIONING: bool = False
+    # Meses futuros que la ingesta deja creados por adelantado
+    TELEMETRY_PREMAKE_MONTHS: int = 2
+
+    # Caché de consultas del dashboard (LRU + TTL, invalidada por versión de datos)
+    CACHE_MAX_ENTRIES: int = 512
+    CACHE_TTL_SECONDS: float = 300
+    # Cada cuánto se consulta en la DB si la versión de datos cambió
+    CACHE_VERSION_POLL_SECONDS: float = 5
+
+    # Ventanas de telemetría más largas que esto se grafican desde los rollups diarios/semanales
+    TELEMETRY_RAW_MAX_DAYS: int = 31
+
+    # Máquinas por tanda del pipeline de features (acota la memoria del cálculo)
+    FEATURE_MACHINE_BATCH: int = 25
+    # Días de historia que se leen de una vez dentro de cada tanda (un recálculo completo avanza por tramos)
+    FEATURE_CHUNK_DAYS: int = 30
+
+    # Estado online de features: snapshot en disco y horas de arranque en caliente
+    ONLINE_SNAPSHOT_PATH: Path = BASE_DIR / "state" / "online_features.npz"
+    ONLINE_WARMUP_HOURS: int = 48
+
+    # Modelo de riesgo de falla: archivo del modelo entrenado, horizonte de predicción y frecuencia del scoring
+    FAILURE_MODEL_PATH: Path = BASE_DIR / "state" / "failure_model.npz"
+    FAILURE_HORIZON_HOURS: int = 24
+    SCORING_INTERVAL_SECONDS: float = 3600
+
+    # Ajuste Weibull por máquina×componente: fallas mínimas de una serie para estimar forma y escala
+    WEIBULL_MIN_FAILURES: int = 2
+
+    # API v1: filas por lote del cursor de servidor en las respuestas NDJSON
+    API_STREAM_CHUNK_ROWS: int = 5_000
+
+    # Motor de las lecturas analíticas del dashboard (KPIs, historia de telemetría, eventos):
+    # 'postgres' o 'parquet' (Polars sobre el lago Parquet de PARQUET_PATH, sin necesidad de PostgreSQL)
+    ANALYTICS_BACKEND: str = "postgres"
+    PARQUET_PATH: Path = BASE_DIR / "state" / "parquet"
+
+    # Ingesta push de telemetría: se vacía al juntar N filas o cada X segundos; con más filas pendientes responde 429
+    TELEMETRY_PUSH_FLUSH_ROWS: int = 5_000
+    TELEMETRY_PUSH_FLUSH_SECONDS: float = 1.0
+    TELEMETRY_PUSH_MAX_QUEUED_ROWS: int = 100_000
+    # Un vaciado fallido vuelve al frente de la cola y se reintenta con backoff exponencial (base, tope);
+    # tras agotar los intentos el lote se descarta
+    TELEMETRY_PUSH_RETRY_ATTEMPTS: int = 5
+    TELEMETRY_PUSH_RETRY_BASE_SECONDS: float = 0.5
+    TELEMETRY_PUSH_RETRY_MAX_SECONDS: float = 10.0
+
+    # Canal en vivo (SSE): frecuencia del sondeo de la versión de datos, keepalive y mensajes en cola por cliente
+    LIVE_POLL_SECONDS: float = 2.0
+    LIVE_KEEPALIVE_SECONDS: float = 15.0
+    LIVE_QUEUE_SIZE: int = 100
+
+    # Métricas Prometheus (/metrics): hooks de SQL, callbacks y rutas; series máximas por métrica (acota la
+    # cardinalidad) y umbral del log de consultas lentas en ms (0 = apagado)
+    METRICS_ENABLED: bool = True
+    METRICS_MAX_SERIES: int = 500
+    SLOW_QUERY_LOG_MS: float = 500
+
+    # /health: cuánto se reutiliza el último chequeo de dependencias y tiempo máximo de cada chequeo
+    HEALTH_CACHE_SECONDS: float = 5
+    HEALTH_TIMEOUT_SECONDS: float = 2
+
     # El entorno se lee del .env o de Railway. Si no existe, lanza error (o usa dev)
     ENVIRONMENT: str 
     PROJECT_NAME: str
@@ -34,7 +101,37 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_SCHEMA: str = "maintenance"
 
-    GEMINI_API_KEY: str
+    # Pools separados por rol (una carga pesada agota el suyo, no el del dashboard):
+    # - read: lecturas interactivas del dashboard y la API (van a la réplica si hay DB_READ_REPLICA_URL)
+    # - write: ingesta (CSV y push) y escrituras puntuales
+    # - jobs: tareas en segundo plano (features, scoring, rollups, KPIs, exportación al lago)
+    DB_READ_POOL_SIZE: int = 10
+    DB_READ_MAX_OVERFLOW: int = 10
+    DB_WRITE_POOL_SIZE: int = 4
+    DB_WRITE_MAX_OVERFLOW: int = 4
+    DB_JOB_POOL_SIZE: int = 2
+    DB_JOB_MAX_OVERFLOW: int = 2
+    # Espera máxima por una conexión libre, reciclado de conexiones viejas y ping al sacarlas del pool
+    DB_POOL_TIMEOUT_SECONDS: float = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # PgBouncer en modo transacción (pooler de Neon): desactiva los prepared statements cacheados de asyncpg
+    DB_PGBOUNCER: bool = False
+    # Réplica de lectura opcional (URL postgresql://...); vacía = las lecturas van al primario
+    DB_READ_REPLICA_URL: Optional[str] = None
+
+    # Analista IA: backend ('gemini' o 'stub' determinista para pruebas/benchmarks), límites y caché de respuestas
+    AI_BACKEND: str = "gemini"
+    AI_MODEL_NAME: str = "gemini-2.0-flash"
+    GEMINI_API_KEY: Optional[str] = None
+    AI_TIMEOUT_SECONDS: float = 30
+    AI_MAX_CONCURRENCY: int = 4
+    AI_CACHE_MAX_ENTRIES: int = 256
+    AI_CACHE_TTL_SECONDS: float = 3600
+    AI_STUB_LATENCY_SECONDS: float = 0
+    # Contexto de los prompts: presupuesto aproximado de tokens y máquinas listadas en cada ranking
+    AI_CONTEXT_MAX_TOKENS: int = 600
+    AI_CONTEXT_TOP_K: int = 5
 
     @property
     def DATABASE_URL(self) -> str:
@@ -42,4 +139,21 @@ class Settings(BaseSettings):
         ssl_mode = "?sslmode=require" if self.ENVIRONMENT == "production" else ""
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}{ssl_mode}"
 
+    @property
+    def ASYNC_DATABASE_URL(self) -> str:
+        # asyncpg no entiende 'sslmode' en la URL: el SSL se pasa en connect_args (ver async_session.py)
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_NAME}"
+
+    @property
+    def READ_DATABASE_URL(self) -> str:
+        return self.DB_READ_REPLICA_URL or self.DATABASE_URL
+
+    @property
+    def ASYNC_READ_DATABASE_URL(self) -> str:
+        if not self.DB_READ_REPLICA_URL:
+            return self.ASYNC_DATABASE_URL
+        # Misma réplica por asyncpg: se cambia el driver y se quitan los parámetros (sslmode) de la URL
+        location = self.DB_READ_REPLICA_URL.split("://", 1)[1].split("?", 1)[0]
+        return f"postgresql+asyncpg://{location}"
+
 settings = Settings()
\ No newline at end of file
@@ -1,6 +1,9 @@
 # src/core/init_db.py
 from src.database.session import engine
 from src.database.base import Base # Asegúrate de importar tu Base con todos los modelos registrados
+from src.analysis.telemetry_rollups import ensure_rollups
+from src.database.indexes import ensure_indexes
+# Importar cualquier modelo carga src.models, que registra todos en Base.metadata
 from src.models.machine import Machine
 from src.models.telemetry import Telemetry
 from src.models.error import Error
@@ -15,7 +18,11 @@ def init_database():
     try:
         # Esto creará todas las tablas que hereden de Base en el esquema especificado
         Base.metadata.create_all(bind=engine)
-        logger.info("✅ Tablas creadas exitosamente.")
+        # Índices de acceso añadidos después de crear las tablas (idempotente)
+        ensure_indexes(engine)
+        # Rollups creados con un esquema anterior se reconstruyen (p.ej. sin las lecturas por sensor)
+        ensure_rollups(engine)
+        logger.info("✅ Tablas e índices creados exitosamente.")
     except Exception as e:
         logger.error(f"❌ Error al crear las tablas: {e}")
 
@@ -0,0 +1,165 @@
+# src/core/metrics.py
+import functools
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable
+from src.core.config import settings
+
+# Límites (segundos) de los buckets de latencia: de 1 ms a 30 s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Etiqueta que reemplaza a las combinaciones nuevas cuando una métrica llega a METRICS_MAX_SERIES
+OVERFLOW_LABEL = "__other__"
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Metric:
+    """Base de las métricas: series por combinación de etiquetas, con tope de cardinalidad."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self._series: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        # Se guardan los valores tal cual (p.ej. el código HTTP como int): se pasan a texto al exportar
+        key = tuple(map(labels.__getitem__, self.labels))
+        # Pasado el tope, las combinaciones nuevas se suman a una serie común (la memoria queda acotada)
+        if key not in self._series and len(self._series) >= settings.METRICS_MAX_SERIES:
+            key = (OVERFLOW_LABEL,) * len(self.labels)
+        return key
+
+    def _label_text(self, key: tuple, extra: str = "") -> str:
+        pairs = [f'{name}="{escape_label(str(value))}"' for name, value in zip(self.labels, key, strict=True)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self._series.items())
+        for key, value in sorted(series, key=lambda item: tuple(map(str, item[0]))):
+            lines += self._render_series(key, value)
+        return lines
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        with self._lock:
+            key = self._key(labels)
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def _render_series(self, key, value) -> list[str]:
+        return [f"{self.name}{self._label_text(key)} {value}"]
+
+class Gauge(Metric):
+    """Valor instantáneo (conexiones en uso, tamaño de cola): se sobrescribe en cada set()."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def _render_series(self, key, value) -> list[str]:
+        return [f"{self.name}{self._label_text(key)} {value}"]
+
+class Histogram(Metric):
+    """Histograma acumulativo al estilo Prometheus (conteo por bucket, suma y total)."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            key = self._key(labels)
+            series = self._series.get(key)
+            if series is None:
+                # [conteos por bucket (el último es +Inf), suma]
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def _render_series(self, key, value) -> list[str]:
+        counts, total = value
+        lines, cumulative = [], 0
+        for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            bucket = 'le="' + le + '"'
+            lines.append(f"{self.name}_bucket{self._label_text(key, bucket)} {cumulative}")
+        lines.append(f"{self.name}_sum{self._label_text(key)} {total}")
+        lines.append(f"{self.name}_count{self._label_text(key)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+        self._collectors: list[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            # Idempotente: re-importar un módulo no duplica la métrica
+            return self._metrics.setdefault(metric.name, metric)
+
+    def add_collector(self, collector: Callable[[], None]):
+        """'collector' se llama antes de cada render para actualizar gauges leídos del estado vivo."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus (text/plain; version=0.0.4)."""
+        for collector in list(self._collectors):
+            collector()
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines += metric.render()
+        return "\n".join(lines) + "\n"
+
+# Registro por proceso (cada worker de uvicorn expone el suyo)
+registry = Registry()
+METRICS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def histogram(name: str, documentation: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labels, buckets))
+
+def counter(name: str, documentation: str, labels: tuple[str, ...] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labels))
+
+def gauge(name: str, documentation: str, labels: tuple[str, ...] = ()) -> Gauge:
+    return registry.register(Gauge(name, documentation, labels))
+
+@contextmanager
+def timed(metric: Histogram, **labels):
+    """Mide la duración del bloque en 'metric' (también si termina con excepción)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric.observe(time.perf_counter() - start, **labels)
+
+def timed_function(metric: Histogram, **labels):
+    """Decorador: mide cada llamada en 'metric' con 'labels' (conserva nombre y firma de la función)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metric.observe(time.perf_counter() - start, **labels)
+        return wrapper
+    return decorate
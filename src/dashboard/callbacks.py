@@ -1,34 +1,160 @@
 # src/dashboard/callbacks.py
-from dash import Output, Input, State
+import json
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from dash import Output, Input, State, ctx, no_update
 import plotly.graph_objects as go
 import polars as pl
 from sqlalchemy import select
-from src.database.session import SessionLocal, engine
+from src.database.session import ReadSessionLocal, read_engine
 from src.models.machine import Machine
 from src.models.telemetry import Telemetry
 from src.models.error import Error
 from src.models.failure import Failure
-from src.services.ai_analyst import AIAnalyst
+from src.models.reliability import ReliabilityStat
+from src.analysis.reliability_metrics import KPI_COLUMNS, get_processed_data
+from src.analysis.downsampling import DEFAULT_MAX_POINTS, minmax_downsample
+from src.analysis.telemetry_rollups import rollup_series, rollup_span
+from src.dashboard.profiling import timed_callbacks
+from src.core.config import settings
+from src.services.query_cache import TELEMETRY_SCOPE, query_cache
+from src.services.predictions import cached_predictions
+
+# --- Lecturas a la DB (resultados cacheados por query_cache) ---
+def use_lake() -> bool:
+    return settings.ANALYTICS_BACKEND == "parquet"
+
+def load_machine_options():
+    if use_lake():
+        from src.services import parquet_lake
+        machines = parquet_lake.machine_ids_and_models().iter_rows(named=True)
+    else:
+        with ReadSessionLocal() as db:
+            machines = [m._asdict() for m in db.execute(select(Machine.machineID, Machine.model)).all()]
+    return [
+        {'label': f"Máquina {m['machineID']} (Mod: {m['model']})", 'value': m['machineID']}
+        for m in machines
+    ]
+
+def load_machine_view(machine_id):
+    """Info, errores y fallas recientes de una máquina como dicts (None si no existe)."""
+    if use_lake():
+        from src.services import parquet_lake
+        m_info = parquet_lake.machine_info(machine_id)
+        if not m_info:
+            return None
+        return {
+            "info": m_info,
+            "errors": parquet_lake.latest_events("errors", machine_id, ["errorID"]),
+            "failures": parquet_lake.latest_events("failures", machine_id, ["failure", "id"]),
+        }
+
+    with ReadSessionLocal() as db:
+        m_info = db.execute(select(Machine.model, Machine.age).filter(Machine.machineID == machine_id)).one_or_none()
+        if not m_info:
+            return None
+
+        return {
+            "info": m_info._asdict(),
+            "errors": [r._asdict() for r in db.execute(select(Error.datetime, Error.errorID).filter(Error.machineID == machine_id).order_by(Error.datetime.desc()).limit(10))],
+            "failures": [r._asdict() for r in db.execute(select(Failure.datetime, Failure.failure, Failure.id).filter(Failure.machineID == machine_id).order_by(Failure.datetime.desc()).limit(10))],
+        }
+
+SENSORS = {'volt': 'Volt', 'rotate': 'Rotate', 'pressure': 'Pressure', 'vibration': 'Vibration'}
+SENSOR_COLORS = {'volt': '#636EFA', 'rotate': '#EF553B', 'pressure': '#00CC96', 'vibration': '#AB63FA'}
+
+def load_telemetry_window(machine_id, start=None, end=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    Telemetría de [start, end) lista para graficar: ({sensor: {x, y[, low, high]}}, lecturas cubiertas, fuente).
+
+    Ventanas de más de TELEMETRY_RAW_MAX_DAYS (o la historia completa) se leen de los rollups:
+    media por día (o semana) con su banda min/max, sin tocar la tabla cruda. Las ventanas cortas
+    se leen crudas y se reducen a max_points por sensor (min/max por bucket, conserva picos).
+    Con ANALYTICS_BACKEND=parquet los mismos agregados se calculan al vuelo sobre el lago.
+    """
+    lake = use_lake()
+    if lake:
+        from src.services import parquet_lake
+    with nullcontext() if lake else read_engine.connect() as conn:
+        first, last = parquet_lake.telemetry_span(machine_id) if lake else rollup_span(conn, machine_id)
+        if first is not None:
+            lo, hi = start or first, end or last + timedelta(days=1)
+            days = (hi - lo).days
+            if days > settings.TELEMETRY_RAW_MAX_DAYS:
+                grain = "daily" if days <= max_points else "weekly"
+                if lake:
+                    rollup = parquet_lake.telemetry_buckets(machine_id, grain, start, end)
+                else:
+                    rollup = rollup_series(conn, machine_id, grain, start, end)
+                if not rollup.is_empty():
+                    x = rollup["bucket"].to_list()
+                    series = {
+                        c: {"x": x, "y": rollup[f"{c}_mean"].to_list(),
+                            "low": rollup[f"{c}_min"].to_list(), "high": rollup[f"{c}_max"].to_list()}
+                        for c in SENSORS
+                    }
+                    return series, rollup["samples"].sum(), grain
+
+        if lake:
+            df = parquet_lake.machine_telemetry(machine_id, start, end).collect()
+        else:
+            # Rango sobre el índice (machineID, datetime) -> con particiones sólo se leen los meses visibles
+            query = select(Telemetry.datetime, *[getattr(Telemetry, c) for c in SENSORS]).filter(Telemetry.machineID == machine_id)
+            if start is not None:
+                query = query.filter(Telemetry.datetime >= start)
+            if end is not None:
+                query = query.filter(Telemetry.datetime < end)
+            df = pl.read_database(query, connection=conn)
+
+    if df.is_empty():
+        return {}, 0, "raw"
+
+    series = minmax_downsample(df, list(SENSORS), max_points=max_points)
+    return {c: {"x": s["datetime"].to_list(), "y": s[c].to_list()} for c, s in series.items()}, df.height, "raw"
+
+def parse_picker_range(start_date, end_date):
+    """Fechas del DatePickerRange ('YYYY-MM-DD') como [inicio, fin) con el día final incluido."""
+    start = datetime.fromisoformat(start_date) if start_date else None
+    end = datetime.fromisoformat(end_date) + timedelta(days=1) if end_date else None
+    return start, end
+
+def zoom_window(relayout):
+    """Ventana visible tras un zoom en el gráfico; 'reset' si se volvió al autorango; None si no cambió el eje X."""
+    if not relayout:
+        return None
+    if relayout.get('xaxis.autorange'):
+        return "reset"
+    if 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+        return tuple(datetime.fromisoformat(str(relayout[f'xaxis.range[{i}]'])[:26]) for i in (0, 1))
+    return None
+
+def load_kpis():
+    if use_lake():
+        # Sin tabla publicada: los KPIs se calculan directo sobre el lago (misma fórmula que kpi_query)
+        df = get_processed_data()
+        return df if df is not None else pl.DataFrame(schema={c: pl.Float64 for c in KPI_COLUMNS})
+
+    # Usamos una conexión directa para Polars
+    with read_engine.connect() as conn:
+        # Sólo los KPIs publicados (la tabla también guarda los agregados del refresco incremental)
+        kpi_query = select(*[ReliabilityStat.__table__.c[c] for c in KPI_COLUMNS]).order_by(ReliabilityStat.machineID)
+        return pl.read_database(kpi_query, connection=conn)
 
 def register_callbacks(app):
-    
+    # Cada callback de servidor queda medido en /metrics (pdm_dash_callback_seconds)
+    app = timed_callbacks(app)
+
     # --- Callback 1: Poblar el Dropdown ---
     @app.callback(
         Output('machine-selector', 'options'),
         Input('machine-selector', 'id')
     )
     def populate_dropdown(_):
-        with SessionLocal() as db:
-            machines = db.execute(select(Machine.machineID, Machine.model)).all()
-            return [
-                {'label': f"Máquina {m.machineID} (Mod: {m.model})", 'value': m.machineID} 
-                for m in machines
-            ]
+        return query_cache.get_or_load(("machine_options",), load_machine_options)
 
     # --- Callback 2: Actualizar Dashboard Operacional ---
     @app.callback(
-        [Output('telemetry-graph', 'figure'),
-         Output('error-table', 'data'),
+        [Output('error-table', 'data'),
          Output('machine-stats', 'children')],
         [Input('machine-selector', 'value')]
     )
@@ -36,70 +162,177 @@ def register_callbacks(app):
         # 1. FORZAMOS EL VALOR 1 si Dash envía None al inicio
         machine_to_query = selected_machine if selected_machine is not None else 1
 
-        with SessionLocal() as db:
-            # 2. Info de la Máquina (Usando machine_to_query)
-            m_info = db.execute(select(Machine).filter(Machine.machineID == machine_to_query)).scalar_one_or_none()
-            
-            if not m_info:
-                return go.Figure(), [], "Máquina no encontrada en DB."
-
-            stats_text = f"Modelo: {m_info.model} | Edad: {m_info.age} años"
-
-            # 3. Telemetría (Usando machine_to_query)
-            tel_query = (
-                select(Telemetry)
-                .filter(Telemetry.machineID == machine_to_query)
-                .order_by(Telemetry.datetime.desc())
-                .limit(200)
-            )
-            tel_results = db.execute(tel_query).scalars().all()
-            
-            fig = go.Figure()
-            if tel_results:
-                d_time = [r.datetime for r in tel_results][::-1]
-                d_volt = [r.volt for r in tel_results][::-1]
-                d_rotate = [r.rotate for r in tel_results][::-1]
-                d_pressure = [r.pressure for r in tel_results][::-1]
-                d_vibration = [r.vibration for r in tel_results][::-1]
-
-                for name, data in zip(['Volt', 'Rotate', 'Pressure', 'Vibration'], 
-                                     [d_volt, d_rotate, d_pressure, d_vibration]):
-                    fig.add_trace(go.Scatter(x=d_time, y=data, mode='lines', name=name))
-                
-                    fig.update_layout(
-                    # Usamos <b> para negrita y aumentamos un poco el tamaño con span si quisieras
-                    title=dict(
-                        text=f"<b>Telemetría en Tiempo Real - Máquina {machine_to_query}</b>",
-                        font=dict(size=20) # Opcional: para que destaque más
-                    ),
-                    paper_bgcolor='white', 
-                    plot_bgcolor='white',
-                    xaxis=dict(showgrid=True, gridcolor='lightgrey'),
-                    yaxis=dict(showgrid=True, gridcolor='lightgrey'),
-                    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-                )
-            else:
-                fig.update_layout(title="Sin datos de telemetría")
-
-            # 4. Errores y Fallas (¡IMPORTANTE! Cambiado a machine_to_query aquí también)
-            err_res = db.execute(select(Error).filter(Error.machineID == machine_to_query).order_by(Error.datetime.desc()).limit(10)).scalars().all()
-            fail_res = db.execute(select(Failure).filter(Failure.machineID == machine_to_query).order_by(Failure.datetime.desc()).limit(10)).scalars().all()
-
-            table_data = []
-            for e in err_res:
-                table_data.append({
-                    "datetime": e.datetime.strftime("%Y-%m-%d %H:%M"), 
-                    "type": "⚠️ ERROR", 
-                    "errorID": getattr(e, 'errorID', 'N/A')
-                })
-            for f in fail_res:
-                table_data.append({
-                    "datetime": f.datetime.strftime("%Y-%m-%d %H:%M"), 
-                    "type": f"🚨 FALLA ({f.failure})", 
-                    "errorID": f.id
-                })
-
-            return fig, sorted(table_data, key=lambda x: x['datetime'], reverse=True), stats_text
+        # 2. Info y eventos (desde caché si la máquina se consultó hace poco)
+        view = query_cache.get_or_load(("machine_view", machine_to_query), lambda: load_machine_view(machine_to_query))
+
+        if view is None:
+            return [], "Máquina no encontrada en DB."
+
+        m_info = view["info"]
+        stats_text = f"Modelo: {m_info['model']} | Edad: {m_info['age']} años"
+
+        # Riesgo precalculado por el scoring de la flota (lectura en memoria, sin inferencia; vive en PostgreSQL)
+        risks = None if use_lake() else cached_predictions().get(machine_to_query)
+        if risks:
+            stats_text += " | Riesgo de falla: " + ", ".join(f"{r['comp']} {r['risk']:.1%}" for r in risks)
+
+        # 3. Errores y Fallas
+        err_res = view["errors"]
+        fail_res = view["failures"]
+
+        table_data = []
+        for e in err_res:
+            table_data.append({
+                "datetime": e["datetime"].strftime("%Y-%m-%d %H:%M"), 
+                "type": "⚠️ ERROR", 
+                "errorID": e.get('errorID', 'N/A')
+            })
+        for f in fail_res:
+            table_data.append({
+                "datetime": f["datetime"].strftime("%Y-%m-%d %H:%M"), 
+                "type": f"🚨 FALLA ({f['failure']})", 
+                "errorID": f["id"]
+            })
+
+        return sorted(table_data, key=lambda x: x['datetime'], reverse=True), stats_text
+
+    # --- Callback 2b: Gráfico de Telemetría (historia completa reducida + zoom) ---
+    @app.callback(
+        Output('telemetry-graph', 'figure'),
+        [Input('machine-selector', 'value'),
+         Input('telemetry-range', 'start_date'),
+         Input('telemetry-range', 'end_date'),
+         Input('telemetry-graph', 'relayoutData')]
+    )
+    def update_telemetry_graph(selected_machine, start_date, end_date, relayout):
+        machine_to_query = selected_machine if selected_machine is not None else 1
+        start, end = parse_picker_range(start_date, end_date)
+
+        # Un zoom pide de nuevo sólo la ventana visible, con más resolución
+        zoom = None
+        if ctx.triggered_id == 'telemetry-graph':
+            zoom = zoom_window(relayout)
+            if zoom is None:
+                return no_update
+            if zoom != "reset":
+                start, end = zoom
+
+        series, raw_points, source = query_cache.get_or_load(
+            ("telemetry_window", machine_to_query, start, end),
+            lambda: load_telemetry_window(machine_to_query, start, end),
+            scope=TELEMETRY_SCOPE,
+        )
+
+        fig = go.Figure()
+        if not series:
+            fig.update_layout(title="Sin datos de telemetría")
+            return fig
+
+        for column, name in SENSORS.items():
+            s = series[column]
+            color = SENSOR_COLORS[column]
+            if "low" in s:
+                # Banda min/max del rollup: los picos siguen visibles aunque la línea sea la media
+                fig.add_trace(go.Scatter(
+                    x=s["x"] + s["x"][::-1], y=s["high"] + s["low"][::-1],
+                    fill='toself', fillcolor=color, opacity=0.15, line=dict(width=0),
+                    legendgroup=column, showlegend=False, hoverinfo='skip',
+                ))
+            fig.add_trace(go.Scatter(x=s["x"], y=s["y"], mode='lines', name=name, legendgroup=column, line=dict(color=color)))
+
+        shown = max(len(s["x"]) for s in series.values())
+        detail = {"raw": "puntos por sensor", "daily": "días (media y min/max)", "weekly": "semanas (media y min/max)"}[source]
+        fig.update_layout(
+            # Usamos <b> para negrita y aumentamos un poco el tamaño con span si quisieras
+            title=dict(
+                text=f"<b>Telemetría - Máquina {machine_to_query}</b>"
+                     f"<br><sup>{raw_points:,} lecturas, {shown:,} {detail}</sup>",
+                font=dict(size=20) # Opcional: para que destaque más
+            ),
+            paper_bgcolor='white', 
+            plot_bgcolor='white',
+            xaxis=dict(showgrid=True, gridcolor='lightgrey'),
+            yaxis=dict(showgrid=True, gridcolor='lightgrey'),
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+            # Mantiene el zoom del usuario mientras no cambie la máquina o el rango elegido
+            uirevision=f"{machine_to_query}-{start_date}-{end_date}",
+            # Grano del gráfico ('raw', 'daily' o 'weekly'): el canal en vivo sólo extiende la vista cruda
+            meta={"source": source},
+        )
+        if zoom not in (None, "reset"):
+            fig.update_xaxes(range=[start, end])
+        return fig
+
+    # --- Callback 2c: Novedades en vivo (SSE) sin volver a consultar la DB ---
+    # El navegador abre un EventSource por máquina; cada mensaje llega a 'live-feed' y de ahí
+    # se agrega al gráfico (extendData) y a la tabla de eventos, todo del lado del cliente.
+    app.clientside_callback(
+        """
+        function(machineId) {
+            if (window.pdmLiveSource) { window.pdmLiveSource.close(); }
+            if (!window.EventSource) { return ""; }
+            const source = new EventSource(`/api/v1/machines/${machineId ?? 1}/live`);
+            source.onopen = () => dash_clientside.set_props("live-status", {children: "🟢 En vivo"});
+            source.onerror = () => dash_clientside.set_props("live-status", {children: "⚪ Reconectando..."});
+            source.onmessage = (e) => dash_clientside.set_props("live-feed", {data: JSON.parse(e.data)});
+            window.pdmLiveSource = source;
+            return "⚪ Conectando...";
+        }
+        """,
+        Output('live-status', 'children'),
+        Input('machine-selector', 'value'),
+    )
+
+    # Sólo se agrega al final de la historia: con una fecha 'Hasta' elegida el gráfico no cambia. Las lecturas
+    # son horarias: una vista de rollups diarios/semanales no se extiende (se actualiza al recargarla)
+    app.clientside_callback(
+        """
+        function(feed, figure, endDate, machineId) {
+            const noUpdate = window.dash_clientside.no_update;
+            if (!feed || !feed.telemetry || !figure || endDate || feed.machineID !== (machineId ?? 1)) { return noUpdate; }
+            if (((figure.layout || {}).meta || {}).source !== "raw") { return noUpdate; }
+            const sensors = %s;
+            const update = {x: [], y: []}, indices = [];
+            figure.data.forEach((trace, i) => {
+                const column = sensors[trace.name];
+                if (column && trace.mode === "lines") {
+                    indices.push(i);
+                    update.x.push(feed.telemetry.datetime);
+                    update.y.push(feed.telemetry[column]);
+                }
+            });
+            return indices.length ? [update, indices] : noUpdate;
+        }
+        """ % json.dumps({name: column for column, name in SENSORS.items()}),
+        Output('telemetry-graph', 'extendData'),
+        Input('live-feed', 'data'),
+        State('telemetry-graph', 'figure'),
+        State('telemetry-range', 'end_date'),
+        State('machine-selector', 'value'),
+        prevent_initial_call=True,
+    )
+
+    # Mismo formato de filas que update_dashboard
+    app.clientside_callback(
+        """
+        function(feed, rows, machineId) {
+            if (!feed || (!feed.errors && !feed.failures) || feed.machineID !== (machineId ?? 1)) {
+                return window.dash_clientside.no_update;
+            }
+            const fmt = (d) => d.slice(0, 16).replace("T", " ");
+            const fresh = [
+                ...(feed.errors || []).map(e => ({datetime: fmt(e.datetime), type: "⚠️ ERROR", errorID: e.errorID})),
+                ...(feed.failures || []).map(f => ({datetime: fmt(f.datetime), type: `🚨 FALLA (${f.failure})`, errorID: f.id})),
+            ];
+            return fresh.concat(rows || []).sort((a, b) => b.datetime.localeCompare(a.datetime));
+        }
+        """,
+        Output('error-table', 'data', allow_duplicate=True),
+        Input('live-feed', 'data'),
+        State('error-table', 'data'),
+        State('machine-selector', 'value'),
+        prevent_initial_call=True,
+    )
 
     # --- Callback 3: Vista Estratégica ---
     @app.callback(
@@ -109,39 +342,38 @@ def register_callbacks(app):
         Input('machine-selector', 'id')
     )
     def update_strategic_view(_):
-        with SessionLocal() as db:
-            # Usamos una conexión directa para Polars
-            with engine.connect() as conn:
-                # Busca esta línea (aproximadamente línea 115):
-                df = pl.read_database("SELECT * FROM maintenance.reliability_stats", connection=conn)
-            
-            fig = go.Figure(data=[
-                go.Bar(name='MTBF (Horas)', x=df['machineID'].to_list(), y=df['MTBF_hours'].to_list()),
-                go.Bar(name='MTTR (Horas)', x=df['machineID'].to_list(), y=df['MTTR_hours'].to_list())
-            ])
-            
-            fig.update_layout(
-                title="Comparativa MTBF vs MTTR por Máquina",
-                barmode='group', paper_bgcolor='white', plot_bgcolor='white'
-            )
-            
-            columns = [{"name": i, "id": i} for i in df.columns]
-            return fig, df.to_dicts(), columns
+        df = query_cache.get_or_load(("kpis",), load_kpis)
+        
+        fig = go.Figure(data=[
+            go.Bar(name='MTBF (Horas)', x=df['machineID'].to_list(), y=df['MTBF_hours'].to_list()),
+            go.Bar(name='MTTR (Horas)', x=df['machineID'].to_list(), y=df['MTTR_hours'].to_list())
+        ])
+        
+        fig.update_layout(
+            title="Comparativa MTBF vs MTTR por Máquina",
+            barmode='group', paper_bgcolor='white', plot_bgcolor='white'
+        )
+        
+        columns = [{"name": i, "id": i} for i in df.columns]
+        return fig, df.to_dicts(), columns
 
     # --- Callback 4: IA Estratégica ---
     @app.callback(
         Output("ai-output", "children"),
         Input("ask-ai-btn", "n_clicks"),
         State("ai-input", "value"),
-        State("kpi-table", "data"),
         prevent_initial_call=True
     )
-    def get_ai_insight(n_clicks, user_question, kpi_data):
+    def get_ai_insight(n_clicks, user_question):
         if not n_clicks or not user_question:
             return "Por favor, ingrese una pregunta para el analista."
-        analyst = AIAnalyst()
-        context = f"DATOS DEL DATA MART: {str(kpi_data)}"
-        return analyst.ask_llm(context, user_question)
+
+        # El cliente LLM y el armado de contexto se cargan con la primera pregunta, no al arrancar
+        from src.services.ai_analyst import get_analyst
+        from src.services.llm_context import fleet_context
+        analyst = get_analyst()
+        # Resumen de tamaño fijo (rankings y percentiles), no la tabla completa de KPIs
+        return analyst.ask_llm(fleet_context(), user_question)
 
     # --- Callback 5: IA Operacional ---
     @app.callback(
@@ -149,19 +381,18 @@ def register_callbacks(app):
         Input("ask-ai-btn-ops", "n_clicks"),
         State("ai-input-ops", "value"),
         State("machine-selector", "value"),
-        State("error-table", "data"),
         prevent_initial_call=True
     )
-    def get_operational_ai_insight(n_clicks, user_question, machine_id, table_data):
+    def get_operational_ai_insight(n_clicks, user_question, machine_id):
         # Aquí también protegemos el machine_id
         m_id = machine_id if machine_id is not None else 1
         
         if not n_clicks or not user_question:
             return "Por favor, ingrese una pregunta."
 
-        analyst = AIAnalyst()
-        with SessionLocal() as db:
-            tel = db.execute(select(Telemetry).filter(Telemetry.machineID == m_id).order_by(Telemetry.datetime.desc()).limit(10)).scalars().all()
-            telemetry_summary = str([{"volt": r.volt, "rotate": r.rotate} for r in tel])
-
-        return analyst.ask_llm_operational(str(m_id), telemetry_summary, str(table_data[:5]), user_question)
\ No newline at end of file
+        from src.services.ai_analyst import get_analyst
+        from src.services.llm_context import machine_context
+        analyst = get_analyst()
+        # Digest estadístico precalculado (features, z-scores vs. histórico, conteos de eventos)
+        telemetry_summary, events_summary = machine_context(m_id)
+        return analyst.ask_llm_operational(str(m_id), telemetry_summary, events_summary, user_question)
\ No newline at end of file
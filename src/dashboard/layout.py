@@ -44,7 +44,21 @@ def create_layout():
                             dbc.CardBody([
                                 html.Label("Seleccionar Máquina:", className="fw-bold mb-2"),
                                 dcc.Dropdown(id='machine-selector', placeholder="Busque por ID...", className="mb-3", clearable=False, value=1, persistence=True),
-                                html.Div(id="machine-stats", className="small text-info p-2 bg-light border rounded mb-3")
+                                html.Label("Rango de Telemetría:", className="fw-bold mb-2"),
+                                dcc.DatePickerRange(
+                                    id='telemetry-range',
+                                    display_format='YYYY-MM-DD',
+                                    start_date_placeholder_text="Desde",
+                                    end_date_placeholder_text="Hasta",
+                                    clearable=True,
+                                    className="mb-2"
+                                ),
+                                html.P("Sin rango se muestra toda la historia. Haga zoom en el gráfico para ver más detalle.",
+                                       className="small text-muted mb-3"),
+                                html.Div(id="machine-stats", className="small text-info p-2 bg-light border rounded mb-3"),
+                                # Novedades empujadas por /api/v1/machines/{id}/live (SSE)
+                                html.Div(id="live-status", className="small text-muted"),
+                                dcc.Store(id="live-feed")
                             ])
                         ], className="shadow-sm mb-3"),
 
@@ -0,0 +1,24 @@
+# src/dashboard/profiling.py
+from src.core.config import settings
+from src.core.metrics import histogram, timed_function
+
+CALLBACK_SECONDS = histogram("pdm_dash_callback_seconds", "Duración de cada callback de Dash (servidor).", ("callback",))
+
+class TimedCallbacks:
+    """
+    Envuelve la app de Dash para que cada @app.callback registrado mida su duración en
+    CALLBACK_SECONDS (etiqueta = nombre de la función). El resto de la app pasa sin cambios.
+    """
+
+    def __init__(self, app):
+        self._app = app
+
+    def callback(self, *args, **kwargs):
+        register = self._app.callback(*args, **kwargs)
+        return lambda fn: register(timed_function(CALLBACK_SECONDS, callback=fn.__name__)(fn))
+
+    def __getattr__(self, name):
+        return getattr(self._app, name)
+
+def timed_callbacks(app):
+    return TimedCallbacks(app) if settings.METRICS_ENABLED else app
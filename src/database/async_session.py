@@ -0,0 +1,39 @@
+# src/database/async_session.py
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from src.core.config import settings
+from src.database.profiling import instrument_engine, instrument_pool
+from src.database.session import engine_options
+
+def asyncpg_connect_args() -> dict:
+    args = {"server_settings": {"application_name": "pdm-api"}}
+    if settings.ENVIRONMENT == "production":
+        args["ssl"] = "require"
+    if settings.DB_PGBOUNCER:
+        # En modo transacción cada sentencia puede caer en otra conexión del servidor: sin prepared
+        # statements cacheados y con nombres únicos para que no choquen entre clientes
+        args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid4()}__",
+        )
+    return args
+
+# Engine async (asyncpg) para la API v1: las consultas no bloquean el event loop de FastAPI.
+# Sólo lee (la ingesta push escribe por el engine sync), así que va a la réplica si está configurada.
+# Los engines sync de session.py sirven a Dash (WSGI), la ingesta, los jobs y los scripts.
+async_engine = create_async_engine(
+    settings.ASYNC_READ_DATABASE_URL,
+    connect_args=asyncpg_connect_args(),
+    **engine_options("api", settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW, is_async=True),
+)
+if settings.METRICS_ENABLED:
+    instrument_engine(async_engine.sync_engine, "api")
+    instrument_pool(async_engine.sync_engine, "api")
+
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+async def get_async_db():
+    """Dependency para FastAPI que provee una sesión async de base de datos."""
+    async with AsyncSessionLocal() as db:
+        yield db
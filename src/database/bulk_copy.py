@@ -0,0 +1,97 @@
+# src/database/bulk_copy.py
+import io
+import polars as pl
+from sqlalchemy import Connection, Table, column, func, select, table as table_clause, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+
+# Formato de fecha que PostgreSQL interpreta sin ambigüedad en COPY
+COPY_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def qualified_table_name(table: Table, schema: str | None = None) -> str:
+    """Nombre 'schema.tabla' con comillas, listo para usarse en SQL crudo."""
+    return f'"{schema or table.schema}"."{table.name}"'
+
+def resolve_table_name(conn: Connection, table: Table) -> str:
+    """Nombre cualificado respetando el 'schema_translate_map' de la conexión (si lo hay)."""
+    translate = conn.get_execution_options().get("schema_translate_map") or {}
+    return qualified_table_name(table, translate.get(table.schema, table.schema))
+
+def copy_frame(conn: Connection, table: Table, df: pl.DataFrame, target: str | None = None) -> int:
+    """
+    Envía un DataFrame de Polars a PostgreSQL con COPY FROM STDIN (formato CSV).
+
+    El CSV se serializa en Rust directamente desde los buffers Arrow del frame,
+    por lo que no se crea ningún objeto Python por fila. Las columnas del frame
+    deben existir en la tabla destino; el resto (id, created_at...) usa sus defaults.
+    Se ejecuta dentro de la transacción abierta en 'conn'.
+    """
+    if df.is_empty():
+        return 0
+
+    buffer = io.BytesIO()
+    df.write_csv(buffer, include_header=False, datetime_format=COPY_DATETIME_FORMAT)
+    buffer.seek(0)
+
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    sql = f"COPY {target or resolve_table_name(conn, table)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    with conn.connection.cursor() as cur:
+        cur.copy_expert(sql, buffer)
+    return df.height
+
+def natural_key(table: Table, columns: list[str]) -> list[str] | None:
+    """
+    Clave natural para el upsert: la PK si viene completa en el origen (p.ej. Telemetry) o, si la PK
+    es sintética, un índice único cuyas columnas vengan todas (eventos: máquina, instante y tipo).
+    None si no hay ninguna.
+    """
+    keys = [[c.name for c in table.primary_key.columns]]
+    keys += [[c.name for c in index.columns] for index in table.indexes if index.unique]
+    return next((key for key in keys if set(key) <= set(columns)), None)
+
+def upsert_statement(conn: Connection, table: Table, df: pl.DataFrame):
+    """
+    COPY a una tabla temporal de staging + INSERT ... ON CONFLICT sobre la clave natural.
+
+    Las filas que ya existen se actualizan sólo si cambió algún valor (si todas las columnas son
+    clave, como en los eventos, se ignoran) y las repetidas dentro del lote se deduplican antes
+    (ON CONFLICT no admite tocar la misma fila dos veces).
+    """
+    key = natural_key(table, df.columns)
+    if key is None:
+        raise ValueError(f"La tabla {table.name} no tiene una clave natural para hacer upsert.")
+
+    df = df.unique(subset=key, keep="last")
+    staging = f"_staging_{table.name}"
+    columns = ", ".join(f'"{c}"' for c in df.columns)
+    conn.execute(text(
+        f'CREATE TEMP TABLE IF NOT EXISTS "{staging}" ON COMMIT DROP AS '
+        f"SELECT {columns} FROM {resolve_table_name(conn, table)} WITH NO DATA"
+    ))
+    conn.execute(text(f'TRUNCATE "{staging}"'))
+    copy_frame(conn, table, df, target=f'"{staging}"')
+
+    source = table_clause(staging, *[column(c) for c in df.columns])
+    stmt = insert(table).from_select(df.columns, select(*source.c))
+    values = [c for c in df.columns if c not in key]
+    updates = {c: stmt.excluded[c] for c in values}
+    if "updated_at" in table.c:
+        updates["updated_at"] = func.now()
+
+    if values:
+        changed = tuple_(*[table.c[c] for c in values]).is_distinct_from(tuple_(*[stmt.excluded[c] for c in values]))
+        return stmt.on_conflict_do_update(index_elements=key, set_=updates, where=changed)
+    return stmt.on_conflict_do_nothing(index_elements=key)
+
+def upsert_frame(conn: Connection, table: Table, df: pl.DataFrame) -> int:
+    """Upsert del frame (ver upsert_statement). Devuelve las filas insertadas o modificadas: una recarga idéntica devuelve 0."""
+    if df.is_empty():
+        return 0
+    return conn.execute(upsert_statement(conn, table, df)).rowcount
+
+def upsert_changes(conn: Connection, table: Table, df: pl.DataFrame, columns: list[str]) -> pl.DataFrame:
+    """Como upsert_frame, pero devuelve 'columns' de las filas insertadas o modificadas (RETURNING)."""
+    schema = {c: df.schema[c] for c in columns}
+    if df.is_empty():
+        return pl.DataFrame(schema=schema)
+    rows = conn.execute(upsert_statement(conn, table, df).returning(*[table.c[c] for c in columns])).all()
+    return pl.DataFrame(rows, schema=schema, orient="row")
@@ -0,0 +1,27 @@
+# src/database/indexes.py
+import logging
+from sqlalchemy import Engine, inspect
+from src.database.base import Base
+
+logger = logging.getLogger(__name__)
+
+def ensure_indexes(bind: Engine) -> list[str]:
+    """
+    Crea los índices declarados en los modelos que todavía no existen en la base de datos.
+
+    'create_all' sólo crea índices junto con tablas nuevas; en una base ya poblada los
+    índices añadidos después nunca se crearían. Es idempotente: se puede llamar en cada arranque.
+    """
+    created = []
+    with bind.begin() as conn:
+        inspector = inspect(conn)
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name, schema=table.schema):
+                continue
+            existing = {ix["name"] for ix in inspector.get_indexes(table.name, schema=table.schema)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    logger.info(f"🗂 Creando índice {index.name} en {table.name}...")
+                    index.create(conn)
+                    created.append(index.name)
+    return created
@@ -0,0 +1,139 @@
+# src/database/partitions.py
+import argparse
+import logging
+import re
+from datetime import date, datetime
+from sqlalchemy import Connection, Engine, text
+
+from src.core.config import settings
+from src.database.bulk_copy import resolve_table_name
+from src.database.session import engine
+from src.models.telemetry import Telemetry
+
+logger = logging.getLogger(__name__)
+
+# Nombre de cada partición mensual: telemetry_y2015m01
+PARTITION_PATTERN = re.compile(r"_y(\d{4})m(\d{2})$")
+
+# Particiones que este proceso ya sabe que existen (evita DDL repetido en cada lote)
+_known_partitions: set[date] = set()
+
+def month_start(value: date | datetime) -> date:
+    return date(value.year, value.month, 1)
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + month.month - 1 + n
+    return date(index // 12, index % 12 + 1, 1)
+
+def partition_name(month: date) -> str:
+    return f"{Telemetry.__tablename__}_y{month.year}m{month.month:02d}"
+
+def is_partitioned(conn: Connection) -> bool:
+    """True si la tabla 'telemetry' existente fue creada con PARTITION BY."""
+    return bool(conn.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t))"),
+        {"t": resolve_table_name(conn, Telemetry.__table__)},
+    ).scalar())
+
+def ensure_partitions(months: set[date], bind: Engine = engine, premake: int | None = None) -> list[str]:
+    """
+    Crea (si faltan) las particiones mensuales de 'months' y 'premake' meses posteriores al último,
+    cada una con su índice BRIN sobre datetime. Los índices declarados en el modelo (PK y
+    machineID/datetime) se heredan del padre automáticamente.
+
+    Corre en su propia transacción corta para no retener el lock del padre durante la carga.
+    """
+    if not months:
+        return []
+    premake = settings.TELEMETRY_PREMAKE_MONTHS if premake is None else premake
+    last = max(months)
+    wanted = set(months) | {add_months(last, i) for i in range(1, premake + 1)}
+    missing = sorted(wanted - _known_partitions)
+    if not missing:
+        return []
+
+    created = []
+    with bind.begin() as conn:
+        if not is_partitioned(conn):
+            return []
+        # Serializa la creación entre workers paralelos
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('telemetry_partitions'))"))
+        parent = resolve_table_name(conn, Telemetry.__table__)
+        schema = parent.split(".")[0]
+        for month in missing:
+            name = partition_name(month)
+            exists = conn.execute(text("SELECT to_regclass(:t)"), {"t": f'{schema}."{name}"'}).scalar()
+            if not exists:
+                conn.execute(text(
+                    f'CREATE TABLE {schema}."{name}" PARTITION OF {parent} '
+                    f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+                ))
+                conn.execute(text(f'CREATE INDEX "{name}_datetime_brin" ON {schema}."{name}" USING brin (datetime)'))
+                created.append(name)
+                logger.info(f"🧩 Partición {name} creada.")
+    _known_partitions.update(missing)
+    return created
+
+def list_partitions(bind: Engine = engine) -> dict[str, date]:
+    """Particiones mensuales existentes de 'telemetry' con su mes de inicio."""
+    with bind.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:t)"
+        ), {"t": resolve_table_name(conn, Telemetry.__table__)}).scalars().all()
+
+    partitions = {}
+    for name in rows:
+        match = PARTITION_PATTERN.search(name)
+        if match:
+            partitions[name] = date(int(match.group(1)), int(match.group(2)), 1)
+    return dict(sorted(partitions.items(), key=lambda item: item[1]))
+
+def retire_partitions_before(cutoff: date, drop: bool = False, bind: Engine = engine) -> list[str]:
+    """
+    Separa (DETACH) o borra (DROP) las particiones cuyos datos son anteriores a 'cutoff'.
+
+    Es una operación de catálogo O(1) por partición, en lugar de un DELETE masivo con VACUUM posterior.
+    Las tablas separadas quedan como tablas normales para archivarlas o consultarlas aparte.
+    """
+    retired = []
+    with bind.begin() as conn:
+        parent = resolve_table_name(conn, Telemetry.__table__)
+        schema = parent.split(".")[0]
+        for name, month in list_partitions(bind).items():
+            if add_months(month, 1) > cutoff:
+                continue
+            conn.execute(text(f'ALTER TABLE {parent} DETACH PARTITION {schema}."{name}"'))
+            if drop:
+                conn.execute(text(f'DROP TABLE {schema}."{name}"'))
+            retired.append(name)
+            logger.info(f"🗑 Partición {name} {'eliminada' if drop else 'separada'}.")
+            _known_partitions.discard(month)
+    return retired
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Gestión de particiones mensuales de telemetry.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Lista las particiones existentes.")
+    create = sub.add_parser("create", help="Crea las particiones de un rango de meses (YYYY-MM).")
+    create.add_argument("start")
+    create.add_argument("end")
+    retire = sub.add_parser("retire", help="Separa las particiones anteriores a un mes (YYYY-MM).")
+    retire.add_argument("before")
+    retire.add_argument("--drop", action="store_true", help="Borra las particiones en lugar de separarlas.")
+    args = parser.parse_args()
+
+    parse_month = lambda value: datetime.strptime(value, "%Y-%m").date()
+    if args.command == "list":
+        for name, month in list_partitions().items():
+            print(f"{name}  {month:%Y-%m}")
+    elif args.command == "create":
+        start, end = parse_month(args.start), parse_month(args.end)
+        months, month = set(), start
+        while month <= end:
+            months.add(month)
+            month = add_months(month, 1)
+        ensure_partitions(months, premake=0)
+    elif args.command == "retire":
+        retire_partitions_before(parse_month(args.before), drop=args.drop)
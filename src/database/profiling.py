@@ -0,0 +1,112 @@
+# src/database/profiling.py
+import logging
+import re
+import time
+from functools import lru_cache
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from src.core.config import settings
+from src.core.metrics import counter, gauge, histogram, registry
+
+logger = logging.getLogger(__name__)
+
+QUERY_SECONDS = histogram("pdm_db_query_seconds", "Latencia de cada sentencia SQL por engine y sentencia normalizada.", ("engine", "statement"))
+QUERY_ROWS = counter("pdm_db_query_rows_total", "Filas devueltas o afectadas por sentencia (cuando el driver las informa).", ("engine", "statement"))
+POOL_CHECKOUT_SECONDS = histogram("pdm_db_pool_checkout_seconds", "Tiempo hasta obtener una conexión del pool (espera por una libre, conexión nueva y pre-ping).", ("pool",))
+POOL_TIMEOUTS = counter("pdm_db_pool_timeouts_total", "Checkouts que agotaron DB_POOL_TIMEOUT_SECONDS sin conexión libre.", ("pool",))
+POOL_OVERFLOW_OPENED = counter("pdm_db_pool_overflow_opened_total", "Conexiones abiertas por encima de pool_size.", ("pool",))
+POOL_CONNECTIONS = gauge("pdm_db_pool_connections", "Conexiones del pool por estado (in_use, idle, overflow) y su pool_size (size).", ("pool", "state"))
+
+# Largo máximo de la sentencia usada como etiqueta
+STATEMENT_LABEL_CHARS = 300
+
+_PLACEHOLDERS = [
+    (re.compile(rf'"?{re.escape(settings.DB_SCHEMA)}"?\.'), ""),  # prefijo del schema (se repite en cada columna)
+    (re.compile(r"%\(\w+\)s|\$\d+|'(?:[^']|'')*'"), "?"),  # parámetros (psycopg2 y asyncpg) y literales de texto
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # literales numéricos (no toca identificadores como telemetry_y2015m01)
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?)"),  # IN (?, ?, ...) y filas de VALUES
+    (re.compile(r"\(\?\)(?:\s*,\s*\(\?\))+"), "(?)"),  # VALUES (?), (?), ...
+    (re.compile(r"\s+"), " "),
+]
+
+@lru_cache(maxsize=2048)
+def normalize_statement(statement: str) -> str:
+    """Sentencia sin valores: las variantes de una misma consulta (largo de IN, VALUES) comparten serie."""
+    for pattern, replacement in _PLACEHOLDERS:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()[:STATEMENT_LABEL_CHARS]
+
+def instrument_engine(engine: Engine, name: str):
+    """
+    Mide cada sentencia ejecutada por 'engine' (para el async, su .sync_engine): latencia y filas
+    por sentencia normalizada, y registra en el log las que superan SLOW_QUERY_LOG_MS.
+    El costo es un perf_counter y una búsqueda en caché por consulta.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        sql = normalize_statement(statement)
+        QUERY_SECONDS.observe(elapsed, engine=name, statement=sql)
+        rows = cursor.rowcount
+        if rows is not None and rows >= 0:
+            QUERY_ROWS.inc(rows, engine=name, statement=sql)
+        if settings.SLOW_QUERY_LOG_MS and elapsed * 1000 >= settings.SLOW_QUERY_LOG_MS:
+            logger.warning(f"🐢 Consulta lenta en '{name}' ({elapsed * 1000:.0f} ms, {rows} filas): {sql}")
+
+    @event.listens_for(engine, "handle_error")
+    def handle_error(context):
+        # La sentencia falló: se descarta su marca de inicio para no desalinear la pila
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+class TimedPool:
+    """
+    Mixin de pool: mide cada checkout y cuenta los que agotan el timeout. El nombre del pool
+    es su logging_name (pool_logging_name en create_engine), que se conserva tras dispose().
+    """
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(pool=self._orig_logging_name)
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, pool=self._orig_logging_name)
+
+class TimedQueuePool(TimedPool, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedPool, AsyncAdaptedQueuePool):
+    pass
+
+# Engines cuyos pools se publican en /metrics (para el async, su .sync_engine)
+_pools: dict[str, Engine] = {}
+
+def collect_pools():
+    """Lee el estado vivo de cada pool antes de un scrape (engine.pool cambia tras dispose())."""
+    for name, engine in list(_pools.items()):
+        pool = engine.pool
+        POOL_CONNECTIONS.set(pool.checkedout(), pool=name, state="in_use")
+        POOL_CONNECTIONS.set(pool.checkedin(), pool=name, state="idle")
+        POOL_CONNECTIONS.set(max(pool.overflow(), 0), pool=name, state="overflow")
+        POOL_CONNECTIONS.set(pool.size(), pool=name, state="size")
+
+registry.add_collector(collect_pools)
+
+def instrument_pool(engine: Engine, name: str):
+    """Publica el pool de 'engine' en /metrics: conexiones por estado y aperturas en overflow."""
+    _pools[name] = engine
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection, connection_record):
+        # QueuePool sube el contador de overflow antes de abrir: > 0 es una conexión extra
+        if engine.pool.overflow() > 0:
+            POOL_OVERFLOW_OPENED.inc(pool=name)
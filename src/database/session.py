@@ -1,18 +1,46 @@
 # src/database/session.py
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
 from sqlalchemy.orm import sessionmaker
 from src.core.config import settings
+from src.database.profiling import TimedAsyncQueuePool, TimedQueuePool, instrument_engine, instrument_pool
 
-# Engine configurado para alta disponibilidad
-# Eliminamos connect_args para compatibilidad con Neon/PgBouncer Pooler
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_size=10,
-    max_overflow=20
-)
+def engine_options(role: str, pool_size: int, max_overflow: int, is_async: bool = False) -> dict:
+    """
+    kwargs de create_engine comunes a todos los pools: tamaño propio del rol, timeout de checkout,
+    reciclado y pre-ping (Neon cierra las conexiones ociosas) y el rol como application_name
+    (visible en pg_stat_activity). Sin opciones propias de la sesión de PostgreSQL: apto para PgBouncer.
+    """
+    options = dict(
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_logging_name=role,
+    )
+    if settings.METRICS_ENABLED:
+        options["poolclass"] = TimedAsyncQueuePool if is_async else TimedQueuePool
+    return options
+
+def make_engine(role: str, url: str, pool_size: int, max_overflow: int) -> Engine:
+    # Sin 'options' de arranque (search_path, etc.): el pooler de Neon/PgBouncer las rechaza; application_name sí pasa
+    engine = create_engine(url, connect_args={"application_name": f"pdm-{role}"}, **engine_options(role, pool_size, max_overflow))
+    if settings.METRICS_ENABLED:
+        instrument_engine(engine, role)
+        instrument_pool(engine, role)
+    return engine
+
+# Un pool por rol: la ingesta o un job pesado agotan el suyo y el dashboard sigue teniendo conexiones.
+# 'engine' (primario) es el de escritura y el de scripts/DDL; los jobs también van al primario
+# porque leen lo que acaban de escribir.
+engine = make_engine("write", settings.DATABASE_URL, settings.DB_WRITE_POOL_SIZE, settings.DB_WRITE_MAX_OVERFLOW)
+read_engine = make_engine("read", settings.READ_DATABASE_URL, settings.DB_READ_POOL_SIZE, settings.DB_READ_MAX_OVERFLOW)
+job_engine = make_engine("jobs", settings.DATABASE_URL, settings.DB_JOB_POOL_SIZE, settings.DB_JOB_MAX_OVERFLOW)
 
 # El esquema se manejará automáticamente a través de Base.metadata
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sesiones de sólo lectura del dashboard (réplica si está configurada)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 def get_db():
     """Dependency para FastAPI que provee una sesión de base de datos."""
@@ -20,4 +48,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -0,0 +1,83 @@
+# src/database/watermarks.py
+import polars as pl
+from sqlalchemy import Connection, Table, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.models.watermark import IngestionWatermark
+
+# Marcas de agua por máquina de cada tabla (ingestion_watermarks): las usan la ingesta por CSV y la push.
+# Los procesos derivados (features, KPIs) guardan en la misma tabla, como '<prefijo><tabla>', hasta dónde
+# consumieron cada fuente: como la ingesta confirma datos y marca juntos, lo nuevo es lo que está
+# entre la marca consumida y la actual, sin depender del orden en que se confirman los ids.
+
+def load_watermarks(conn: Connection, table: Table) -> pl.DataFrame:
+    """Marca de agua por máquina. Si la tabla ya tenía datos sin marcas, las siembra una sola vez."""
+    wm = IngestionWatermark.__table__
+    query = select(wm.c.machineID, wm.c.last_datetime).where(wm.c.table_name == table.name)
+    rows = conn.execute(query).all()
+
+    if not rows:
+        # ON CONFLICT: en modo paralelo varios workers pueden sembrar la misma tabla a la vez
+        conn.execute(insert(wm).from_select(
+            ["table_name", "machineID", "last_datetime"],
+            select(literal(table.name), table.c.machineID, func.max(table.c.datetime)).group_by(table.c.machineID),
+        ).on_conflict_do_nothing())
+        rows = conn.execute(query).all()
+
+    return pl.DataFrame(
+        rows, schema={"machineID": pl.Int64, "last_datetime": pl.Datetime("us")}, orient="row"
+    )
+
+def advance_watermarks(conn: Connection, table_name: str, batch: pl.DataFrame):
+    """Sube la marca de agua de cada máquina presente en el lote (nunca la retrocede)."""
+    latest = batch.group_by("machineID").agg(pl.col("datetime").max().alias("last_datetime"))
+    stmt = insert(IngestionWatermark.__table__).values(
+        [{"table_name": table_name, **row} for row in latest.to_dicts()]
+    )
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=["table_name", "machineID"],
+        set_={
+            "last_datetime": func.greatest(IngestionWatermark.__table__.c.last_datetime, stmt.excluded.last_datetime),
+            "updated_at": func.now(),
+        },
+    ))
+
+def current_watermarks(conn: Connection, sources: dict) -> pl.DataFrame:
+    """Último 'datetime' ingerido por fuente y máquina (de ingestion_watermarks, o de la tabla si aún no hay marcas)."""
+    wm = IngestionWatermark.__table__
+    rows = conn.execute(
+        select(wm.c.table_name, wm.c.machineID, wm.c.last_datetime).where(wm.c.table_name.in_(list(sources)))
+    ).all()
+    seeded = {r.table_name for r in rows}
+    for name, model in sources.items():
+        if name not in seeded:
+            rows += conn.execute(
+                select(literal(name), model.machineID, func.max(model.datetime)).group_by(model.machineID)
+            ).all()
+    return pl.DataFrame(
+        rows, schema={"source": pl.String, "machineID": pl.Int64, "last_datetime": pl.Datetime("us")}, orient="row"
+    )
+
+def consumed_watermarks(conn: Connection, prefix: str) -> pl.DataFrame:
+    wm = IngestionWatermark.__table__
+    rows = conn.execute(
+        select(func.substr(wm.c.table_name, len(prefix) + 1), wm.c.machineID, wm.c.last_datetime)
+        .where(wm.c.table_name.startswith(prefix))
+    ).all()
+    return pl.DataFrame(
+        rows, schema={"source": pl.String, "machineID": pl.Int64, "consumed": pl.Datetime("us")}, orient="row"
+    )
+
+def advance_consumed(conn: Connection, prefix: str, current: pl.DataFrame):
+    """Registra como consumidas las marcas de ingesta con las que se calculó el proceso derivado."""
+    rows = [
+        {"table_name": f"{prefix}{r['source']}", "machineID": r["machineID"], "last_datetime": r["last_datetime"]}
+        for r in current.to_dicts()
+    ]
+    if not rows:
+        return
+    stmt = insert(IngestionWatermark.__table__).values(rows)
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=["table_name", "machineID"],
+        set_={"last_datetime": stmt.excluded.last_datetime, "updated_at": func.now()},
+    ))
@@ -1,13 +1,23 @@
+import asyncio
 import logging
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.wsgi import WSGIMiddleware
 from dash import Dash
 import dash_bootstrap_components as dbc
 
+from src.api.middleware import MetricsMiddleware
+from src.api.v1.router import router as api_v1_router
 from src.core.config import settings
+from src.core.metrics import METRICS_MEDIA_TYPE, registry
 from src.dashboard.layout import layout
 from src.dashboard.callbacks import register_callbacks
+from src.database.async_session import async_engine
+from src.services.health import health_monitor
+from src.services.live_feed import live_feed
+from src.services.push_ingestion import telemetry_buffer
+from src.services.query_cache import query_cache
 
 # ==============================
 # 🪵 Logging Configuration
@@ -38,6 +48,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Latencia por ruta para /metrics (middleware ASGI puro: no bufferiza los streams)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 # ==============================
 # 📊 Dash App Configuration
@@ -66,17 +79,29 @@ app.mount("/dashboard", WSGIMiddleware(dash_app.server))
 # ==============================
 # 🧭 FastAPI Routes (API)
 # ==============================
+app.include_router(api_v1_router)
+
 @app.get("/")
 async def root():
     return {"message": "Predictive Maintenance API. Go to /dashboard/ for the UI", "health": "/health"}
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Aciertos/fallos de la caché de consultas del dashboard (por proceso)."""
+    return query_cache.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Histogramas de SQL, callbacks de Dash y rutas HTTP en formato Prometheus (por proceso)."""
+    return PlainTextResponse(registry.render(), media_type=METRICS_MEDIA_TYPE)
+
 @app.get("/health")
-async def health_check():
-    return {
-        "status": "online",
-        "environment": settings.ENVIRONMENT,
-        "database": "connected"
-    }
+async def health_check(response: Response):
+    """Chequeo real (cacheado unos segundos) de la DB y de la caché; 503 si falta una dependencia requerida."""
+    report = await health_monitor.check()
+    if report["status"] != "online":
+        response.status_code = 503
+    return {**report, "environment": settings.ENVIRONMENT}
 
 # ==============================
 # ⏯ Startup & Shutdown
@@ -84,6 +109,20 @@ async def health_check():
 @app.on_event("startup")
 async def startup_event():
     logger.info(f"🚀 Starting {settings.PROJECT_NAME} in {settings.ENVIRONMENT} mode")
+    # Vaciado periódico del buffer de ingesta push
+    telemetry_buffer.start()
+    # Abre la primera conexión del pool y lee la versión de datos en segundo plano: el primer
+    # request (o sondeo de /health) ya no paga ese costo, y el arranque no espera a la DB
+    app.state.health_warmup = asyncio.create_task(health_monitor.check())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Escribe las lecturas empujadas que sigan en memoria antes de cerrar
+    await telemetry_buffer.stop()
+    # Cierra los streams SSE abiertos para que el apagado no espere a los clientes
+    live_feed.close()
+    # Cierra las conexiones asyncpg del pool de la API
+    await async_engine.dispose()
 
 if __name__ == "__main__":
     import uvicorn
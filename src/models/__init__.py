@@ -3,4 +3,15 @@ from .machine import Machine
 from .telemetry import Telemetry
 from .error import Error
 from .failure import Failure
-from .maintenance import Maintenance
\ No newline at end of file
+from .maintenance import Maintenance
+from .watermark import IngestionWatermark
+from .reliability import ReliabilityStat, ReliabilityWeibull
+from .data_version import DataVersion
+from .telemetry_rollup import TelemetryDaily, TelemetryWeekly
+from .feature import MachineFeature
+from .prediction import FailurePrediction
+
+__all__ = [
+    "Machine", "Telemetry", "Error", "Failure", "Maintenance", "IngestionWatermark", "ReliabilityStat",
+    "ReliabilityWeibull", "DataVersion", "TelemetryDaily", "TelemetryWeekly", "MachineFeature", "FailurePrediction",
+]
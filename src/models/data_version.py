@@ -0,0 +1,14 @@
+# src/models/data_version.py
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.base import Base
+
+class DataVersion(Base):
+    __tablename__ = "data_versions"
+
+    # Contador por alcance que suben los procesos que escriben datos (ingesta, KPIs); invalida las cachés de lectura
+    scope: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<DataVersion(scope='{self.scope}', version={self.version})>"
@@ -1,5 +1,5 @@
 from datetime import datetime as dt_type
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database.base import Base
 
@@ -15,4 +15,23 @@ class Error(Base):
     machine: Mapped["Machine"] = relationship()
 
     def __repr__(self):
-        return f"<Error(machine={self.machineID}, type='{self.errorID}')>"
\ No newline at end of file
+        return f"<Error(machine={self.machineID}, type='{self.errorID}')>"
+
+# Índice de acceso para "últimos N eventos de una máquina" (filter machineID + order by datetime desc + limit).
+# INCLUDE lo hace cubriente, permitiendo index-only scans. Lo gestiona src/database/indexes.py.
+Index(
+    "ix_errors_machine_datetime",
+    Error.machineID,
+    Error.datetime.desc(),
+    postgresql_include=["errorID"],
+)
+
+# Clave natural del evento (máquina, instante y tipo): la ingesta reenvía la hora de la marca de agua
+# y ON CONFLICT DO NOTHING descarta lo ya cargado. Sobre una base existente lo crea ensure_indexes.
+Index(
+    "uq_errors_machine_datetime_error",
+    Error.machineID,
+    Error.datetime,
+    Error.errorID,
+    unique=True,
+)
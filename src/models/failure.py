@@ -1,6 +1,6 @@
 # src/models/failure.py
 from datetime import datetime as dt_type
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database.base import Base
 
@@ -15,4 +15,23 @@ class Failure(Base):
     machine: Mapped["Machine"] = relationship()
 
     def __repr__(self):
-        return f"<Failure(machine={self.machineID}, component='{self.failure}')>"
\ No newline at end of file
+        return f"<Failure(machine={self.machineID}, component='{self.failure}')>"
+
+# Índice de acceso para "últimos N eventos de una máquina" (filter machineID + order by datetime desc + limit).
+# INCLUDE lo hace cubriente, permitiendo index-only scans. Lo gestiona src/database/indexes.py.
+Index(
+    "ix_failures_machine_datetime",
+    Failure.machineID,
+    Failure.datetime.desc(),
+    postgresql_include=["failure", "id"],
+)
+
+# Clave natural del evento (máquina, instante y tipo): la ingesta reenvía la hora de la marca de agua
+# y ON CONFLICT DO NOTHING descarta lo ya cargado. Sobre una base existente lo crea ensure_indexes.
+Index(
+    "uq_failures_machine_datetime_failure",
+    Failure.machineID,
+    Failure.datetime,
+    Failure.failure,
+    unique=True,
+)
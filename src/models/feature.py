@@ -0,0 +1,50 @@
+# src/models/feature.py
+from datetime import datetime as dt_type
+from sqlalchemy import PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.base import Base
+
+class MachineFeature(Base):
+    __tablename__ = "machine_features"
+
+    # Una fila cada 3 horas por máquina (las columnas las genera src/analysis/features.py)
+    machineID: Mapped[int] = mapped_column(nullable=False)
+    datetime: Mapped[dt_type] = mapped_column(nullable=False)
+
+    # Ventanas móviles de la telemetría: media y desviación de las últimas 3h y 24h
+    volt_mean_3h: Mapped[float] = mapped_column(nullable=True)
+    volt_sd_3h: Mapped[float] = mapped_column(nullable=True)
+    volt_mean_24h: Mapped[float] = mapped_column(nullable=True)
+    volt_sd_24h: Mapped[float] = mapped_column(nullable=True)
+    rotate_mean_3h: Mapped[float] = mapped_column(nullable=True)
+    rotate_sd_3h: Mapped[float] = mapped_column(nullable=True)
+    rotate_mean_24h: Mapped[float] = mapped_column(nullable=True)
+    rotate_sd_24h: Mapped[float] = mapped_column(nullable=True)
+    pressure_mean_3h: Mapped[float] = mapped_column(nullable=True)
+    pressure_sd_3h: Mapped[float] = mapped_column(nullable=True)
+    pressure_mean_24h: Mapped[float] = mapped_column(nullable=True)
+    pressure_sd_24h: Mapped[float] = mapped_column(nullable=True)
+    vibration_mean_3h: Mapped[float] = mapped_column(nullable=True)
+    vibration_sd_3h: Mapped[float] = mapped_column(nullable=True)
+    vibration_mean_24h: Mapped[float] = mapped_column(nullable=True)
+    vibration_sd_24h: Mapped[float] = mapped_column(nullable=True)
+
+    # Errores de cada tipo en las últimas 24h
+    error1_count_24h: Mapped[int] = mapped_column(nullable=False, default=0)
+    error2_count_24h: Mapped[int] = mapped_column(nullable=False, default=0)
+    error3_count_24h: Mapped[int] = mapped_column(nullable=False, default=0)
+    error4_count_24h: Mapped[int] = mapped_column(nullable=False, default=0)
+    error5_count_24h: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    # Horas desde el último reemplazo de cada componente (NULL si nunca se reemplazó)
+    comp1_hours_since_replacement: Mapped[float] = mapped_column(nullable=True)
+    comp2_hours_since_replacement: Mapped[float] = mapped_column(nullable=True)
+    comp3_hours_since_replacement: Mapped[float] = mapped_column(nullable=True)
+    comp4_hours_since_replacement: Mapped[float] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("machineID", "datetime"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<MachineFeature(machine={self.machineID}, time={self.datetime})>"
@@ -1,5 +1,5 @@
 from datetime import datetime as dt_type
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database.base import Base
 
@@ -14,4 +14,23 @@ class Maintenance(Base):
     machine: Mapped["Machine"] = relationship()
 
     def __repr__(self):
-        return f"<Maint(machine={self.machineID}, replaced='{self.comp}')>"
\ No newline at end of file
+        return f"<Maint(machine={self.machineID}, replaced='{self.comp}')>"
+
+# Índice de acceso para "últimos N eventos de una máquina" (filter machineID + order by datetime desc + limit).
+# INCLUDE lo hace cubriente, permitiendo index-only scans. Lo gestiona src/database/indexes.py.
+Index(
+    "ix_maint_machine_datetime",
+    Maintenance.machineID,
+    Maintenance.datetime.desc(),
+    postgresql_include=["comp"],
+)
+
+# Clave natural del evento (máquina, instante y tipo): la ingesta reenvía la hora de la marca de agua
+# y ON CONFLICT DO NOTHING descarta lo ya cargado. Sobre una base existente lo crea ensure_indexes.
+Index(
+    "uq_maint_machine_datetime_comp",
+    Maintenance.machineID,
+    Maintenance.datetime,
+    Maintenance.comp,
+    unique=True,
+)
@@ -0,0 +1,23 @@
+# src/models/prediction.py
+from datetime import datetime as dt_type
+from sqlalchemy import PrimaryKeyConstraint, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.base import Base
+
+class FailurePrediction(Base):
+    __tablename__ = "failure_predictions"
+
+    # Último riesgo calculado por máquina y componente (lo reescribe cada corrida del scoring)
+    machineID: Mapped[int] = mapped_column(nullable=False)
+    comp: Mapped[str] = mapped_column(String(50), nullable=False)
+    risk: Mapped[float] = mapped_column(nullable=False)
+    # Instante de las features con que se calculó y versión del modelo que lo produjo
+    features_at: Mapped[dt_type] = mapped_column(nullable=False)
+    model_version: Mapped[str] = mapped_column(String(64), nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("machineID", "comp"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<FailurePrediction(machine={self.machineID}, comp='{self.comp}', risk={self.risk:.3f})>"
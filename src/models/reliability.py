@@ -0,0 +1,52 @@
+# src/models/reliability.py
+from datetime import datetime as dt_type
+from sqlalchemy import BigInteger, PrimaryKeyConstraint, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.base import Base
+
+class ReliabilityStat(Base):
+    __tablename__ = "reliability_stats"
+
+    # KPIs publicados (los que lee el dashboard)
+    machineID: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    MTBF_hours: Mapped[float] = mapped_column(nullable=False, default=0)
+    MTTR_hours: Mapped[float] = mapped_column(nullable=False, default=0)
+    total_failures: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    # Agregados acumulados para el refresco incremental (MTBF = failure_gap_hours / failure_gaps)
+    failure_gap_hours: Mapped[float] = mapped_column(nullable=False, default=0)
+    failure_gaps: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    maint_gap_hours: Mapped[float] = mapped_column(nullable=False, default=0)
+    maint_gaps: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    last_event_at: Mapped[dt_type] = mapped_column(nullable=True)
+    last_failure_id: Mapped[int] = mapped_column(nullable=False, default=0)
+    last_maint_id: Mapped[int] = mapped_column(nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<ReliabilityStat(machine={self.machineID}, MTBF={self.MTBF_hours}, MTTR={self.MTTR_hours})>"
+
+class ReliabilityWeibull(Base):
+    __tablename__ = "reliability_weibull"
+
+    # Ajuste Weibull de las vidas de cada componente por máquina (lo reescribe src/analysis/weibull.py)
+    machineID: Mapped[int] = mapped_column(nullable=False)
+    comp: Mapped[str] = mapped_column(String(50), nullable=False)
+    # Forma (k < 1 mortalidad infantil, ~1 fallas al azar, > 1 desgaste) y escala en horas;
+    # NULL si la serie no alcanza WEIBULL_MIN_FAILURES o no tiene estimador finito
+    shape: Mapped[float] = mapped_column(nullable=True)
+    scale_hours: Mapped[float] = mapped_column(nullable=True)
+    # Vida B10 (horas hasta que falla el 10%) y vida media del ajuste
+    b10_hours: Mapped[float] = mapped_column(nullable=True)
+    mean_life_hours: Mapped[float] = mapped_column(nullable=True)
+    # Vidas que terminaron en falla, vidas censuradas (reemplazo preventivo o fin de la observación) y horas observadas
+    failures: Mapped[int] = mapped_column(nullable=False, default=0)
+    censored: Mapped[int] = mapped_column(nullable=False, default=0)
+    exposure_hours: Mapped[float] = mapped_column(nullable=False, default=0)
+    observed_until: Mapped[dt_type] = mapped_column(nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("machineID", "comp"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ReliabilityWeibull(machine={self.machineID}, comp='{self.comp}', shape={self.shape}, scale={self.scale_hours})>"
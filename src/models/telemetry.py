@@ -1,7 +1,8 @@
 # src/models/telemetry.py
 from datetime import datetime as dt_type
-from sqlalchemy import ForeignKey, PrimaryKeyConstraint
+from sqlalchemy import ForeignKey, Index, PrimaryKeyConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
+from src.core.config import settings
 from src.database.base import Base
 
 class Telemetry(Base):
@@ -15,12 +16,24 @@ class Telemetry(Base):
     vibration: Mapped[float] = mapped_column(nullable=True)
 
     # Clave primaria compuesta (importante para series temporales)
+    # Con TELEMETRY_PARTITIONING la tabla se crea particionada por mes (ver src/database/partitions.py);
+    # la PK incluye 'datetime', requisito de PostgreSQL para índices únicos en tablas particionadas.
     __table_args__ = (
         PrimaryKeyConstraint("datetime", "machineID"),
+        {"postgresql_partition_by": "RANGE (datetime)"} if settings.TELEMETRY_PARTITIONING else {},
     )
 
     # Relación con el padre
     machine: Mapped["Machine"] = relationship(back_populates="telemetries")
 
     def __repr__(self) -> str:
-        return f"<Telemetry(machine={self.machineID}, time={self.datetime})>"
\ No newline at end of file
+        return f"<Telemetry(machine={self.machineID}, time={self.datetime})>"
+
+# Índice de acceso para "últimos N eventos de una máquina" (filter machineID + order by datetime desc + limit).
+# INCLUDE lo hace cubriente, permitiendo index-only scans. Lo gestiona src/database/indexes.py.
+Index(
+    "ix_telemetry_machine_datetime",
+    Telemetry.machineID,
+    Telemetry.datetime.desc(),
+    postgresql_include=["volt", "rotate", "pressure", "vibration"],
+)
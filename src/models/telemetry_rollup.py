@@ -0,0 +1,49 @@
+# src/models/telemetry_rollup.py
+from datetime import datetime as dt_type
+from sqlalchemy import BigInteger, PrimaryKeyConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.base import Base
+
+class TelemetryRollupMixin:
+    """Agregados de la telemetría horaria por máquina y bucket (día o semana ISO, inicio del periodo)."""
+
+    machineID: Mapped[int] = mapped_column(nullable=False)
+    bucket: Mapped[dt_type] = mapped_column(nullable=False)
+    samples: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    # Por sensor: media, mínimo, máximo, desviación y lecturas no nulas ('count', el peso de su media y
+    # varianza al combinar buckets; puede ser menor que 'samples' si llegan lecturas con sensores vacíos)
+    volt_mean: Mapped[float] = mapped_column(nullable=True)
+    volt_min: Mapped[float] = mapped_column(nullable=True)
+    volt_max: Mapped[float] = mapped_column(nullable=True)
+    volt_std: Mapped[float] = mapped_column(nullable=True)
+    volt_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    rotate_mean: Mapped[float] = mapped_column(nullable=True)
+    rotate_min: Mapped[float] = mapped_column(nullable=True)
+    rotate_max: Mapped[float] = mapped_column(nullable=True)
+    rotate_std: Mapped[float] = mapped_column(nullable=True)
+    rotate_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    pressure_mean: Mapped[float] = mapped_column(nullable=True)
+    pressure_min: Mapped[float] = mapped_column(nullable=True)
+    pressure_max: Mapped[float] = mapped_column(nullable=True)
+    pressure_std: Mapped[float] = mapped_column(nullable=True)
+    pressure_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    vibration_mean: Mapped[float] = mapped_column(nullable=True)
+    vibration_min: Mapped[float] = mapped_column(nullable=True)
+    vibration_max: Mapped[float] = mapped_column(nullable=True)
+    vibration_std: Mapped[float] = mapped_column(nullable=True)
+    vibration_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    # (machineID, bucket) sirve tanto para la serie de una máquina como para el upsert de la ingesta
+    __table_args__ = (
+        PrimaryKeyConstraint("machineID", "bucket"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__}(machine={self.machineID}, bucket={self.bucket}, samples={self.samples})>"
+
+class TelemetryDaily(TelemetryRollupMixin, Base):
+    __tablename__ = "telemetry_daily"
+
+class TelemetryWeekly(TelemetryRollupMixin, Base):
+    __tablename__ = "telemetry_weekly"
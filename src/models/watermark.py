@@ -0,0 +1,20 @@
+# src/models/watermark.py
+from datetime import datetime as dt_type
+from sqlalchemy import PrimaryKeyConstraint, String
+from sqlalchemy.orm import Mapped, mapped_column
+from src.database.base import Base
+
+class IngestionWatermark(Base):
+    __tablename__ = "ingestion_watermarks"
+
+    # Último 'datetime' cargado por tabla y máquina (marca de agua de la ingesta incremental)
+    table_name: Mapped[str] = mapped_column(String(64), nullable=False)
+    machineID: Mapped[int] = mapped_column(nullable=False)
+    last_datetime: Mapped[dt_type] = mapped_column(nullable=False)
+
+    __table_args__ = (
+        PrimaryKeyConstraint("table_name", "machineID"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<IngestionWatermark(table='{self.table_name}', machine={self.machineID}, last={self.last_datetime})>"
@@ -0,0 +1,19 @@
+# src/schemas/events.py
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+class EventRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    datetime: datetime
+    machineID: int
+
+class ErrorRead(EventRead):
+    errorID: str
+
+class FailureRead(EventRead):
+    failure: str
+
+class MaintenanceRead(EventRead):
+    comp: str
@@ -0,0 +1,9 @@
+# src/schemas/machine.py
+from pydantic import BaseModel, ConfigDict
+
+class MachineRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    machineID: int
+    model: str
+    age: int
@@ -0,0 +1,12 @@
+# src/schemas/prediction.py
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+class FailurePredictionRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    machineID: int
+    comp: str
+    risk: float
+    features_at: datetime
+    model_version: str
@@ -0,0 +1,10 @@
+# src/schemas/reliability.py
+from pydantic import BaseModel, ConfigDict
+
+class ReliabilityKPI(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    machineID: int
+    MTBF_hours: float
+    MTTR_hours: float
+    total_failures: int
@@ -0,0 +1,32 @@
+# src/schemas/telemetry.py
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+
+class TelemetryRead(BaseModel):
+    """Una lectura horaria (cada línea de la respuesta NDJSON de /api/v1/.../telemetry)."""
+    model_config = ConfigDict(from_attributes=True)
+
+    datetime: datetime
+    machineID: int
+    volt: float | None
+    rotate: float | None
+    pressure: float | None
+    vibration: float | None
+
+class TelemetryPushAccepted(BaseModel):
+    """Respuesta 202 de POST /api/v1/ingest/telemetry: las lecturas quedan en el buffer hasta el próximo vaciado."""
+    accepted: int
+    queued: int
+
+class PushIngestStats(BaseModel):
+    """Contadores del buffer de ingesta push (por proceso)."""
+    queued: int
+    accepted: int
+    flushed: int
+    dropped: int
+    rejected: int
+    failed: int
+    retries: int
+    flushes: int
+    last_flush_ms: float
+    max_queued: int
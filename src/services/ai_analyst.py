@@ -1,22 +1,117 @@
-import google.generativeai as genai
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from src.core.config import settings
+from src.services.query_cache import QueryCache, read_data_versions
+
+logger = logging.getLogger(__name__)
+
+# --- Backends de LLM (intercambiables con AI_BACKEND) ---
+class GeminiBackend:
+    """Gemini vía google-generativeai: se configura y se crea el modelo una sola vez por proceso."""
 
-class AIAnalyst:
     def __init__(self):
-        # Configuramos Gemini con la key de settings
+        import google.generativeai as genai
+
+        if not settings.GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY no está configurada (o use AI_BACKEND=stub).")
         genai.configure(api_key=settings.GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        self.model = genai.GenerativeModel(settings.AI_MODEL_NAME)
+
+    async def generate(self, prompt: str) -> str:
+        response = await self.model.generate_content_async(prompt)
+        return response.text
+
+class StubBackend:
+    """
+    Backend local determinista para pruebas y benchmarks de carga: misma pregunta, misma respuesta,
+    sin red ni API key. AI_STUB_LATENCY_SECONDS simula la demora de un LLM real.
+    """
+
+    async def generate(self, prompt: str) -> str:
+        if settings.AI_STUB_LATENCY_SECONDS:
+            await asyncio.sleep(settings.AI_STUB_LATENCY_SECONDS)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:12]
+        question = prompt.strip().splitlines()[-1].strip()
+        return f"🧪 Respuesta simulada {digest} ({len(prompt):,} caracteres de prompt). {question}"
+
+BACKENDS = {"gemini": GeminiBackend, "stub": StubBackend}
+
+class AIAnalyst:
+    """
+    Analista IA compartido por todo el proceso (usar get_analyst()).
+
+    - Las llamadas al LLM corren en un event loop propio en un hilo de fondo: los callbacks de Dash
+      (WSGI, síncronos) sólo esperan el resultado, acotado por AI_TIMEOUT_SECONDS.
+    - Un semáforo limita a AI_MAX_CONCURRENCY las llamadas simultáneas al proveedor; las demás
+      esperan turno dentro del mismo timeout.
+    - Las respuestas se cachean por hash del prompt y versión de datos: la misma pregunta sobre los
+      mismos KPIs responde al instante, y cualquier ingesta (bump_data_version) la invalida.
+      Los errores y timeouts no se cachean; preguntas idénticas simultáneas comparten una llamada.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or BACKENDS[settings.AI_BACKEND]()
+        self.timeout = settings.AI_TIMEOUT_SECONDS
+        self.cache = QueryCache(
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+            ttl=settings.AI_CACHE_TTL_SECONDS,
+            version_poll=settings.CACHE_VERSION_POLL_SECONDS,
+            version_reader=read_data_versions,
+        )
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = asyncio.Semaphore(settings.AI_MAX_CONCURRENCY)
+        threading.Thread(target=self._loop.run_forever, name="ai-analyst", daemon=True).start()
+
+    async def _generate(self, prompt: str) -> str:
+        async with asyncio.timeout(self.timeout):
+            async with self._semaphore:
+                return await self.backend.generate(prompt)
+
+    def complete(self, prompt: str, error_label: str = "Error en el análisis de IA") -> str:
+        """Respuesta del LLM para 'prompt' (desde la caché si ya se preguntó con los mismos datos)."""
+        key = (hashlib.sha256(prompt.encode()).hexdigest(), self.cache.data_version)
+        hit, answer = self.cache.get(key)
+        if hit:
+            return answer
+
+        # La misma pregunta en vuelo (p.ej. varios usuarios a la vez) comparte una sola llamada al LLM
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            started = future is None
+            if started:
+                future = asyncio.run_coroutine_threadsafe(self._generate(prompt), self._loop)
+                self._inflight[key] = future
+        if started:
+            # Fuera del lock: si la llamada ya terminó, el callback corre aquí mismo y _forget toma el lock
+            future.add_done_callback(lambda _: self._forget(key))
+        try:
+            answer = future.result(timeout=self.timeout + 1)
+        except (TimeoutError, FutureTimeoutError):
+            return f"⏱ {error_label}: el modelo no respondió en {self.timeout:.0f}s, intente nuevamente."
+        except Exception as e:
+            return f"❌ {error_label}: {str(e)}"
+        self.cache.put(key, answer)
+        return answer
+
+    def _forget(self, key):
+        with self._inflight_lock:
+            self._inflight.pop(key, None)
 
     def ask_llm(self, data_context: str, question: str) -> str:
         prompt = f"""
         ROL: Eres el Consultor Senior de Confiabilidad para una empersa importante en Chile.
         CONTEXTO: Analizando el Data Mart de KPIs de la flota.
-        
+
         DATOS (JSON):
         {data_context}
-        
+
         TAREA: Responder la pregunta del usuario utilizando un enfoque de ingeniería de mantenimiento (RCM).
-        
+
         REGLAS DE RESPUESTA:
         1. Si ves un MTBF (Mean Time Between Failures) bajo, relaciónalo con la confiabilidad del activo.
         2. Si ves un MTTR (Mean Time To Repair) alto, relaciónalo con ineficiencia en el proceso de reparación o falta de repuestos.
@@ -25,26 +120,21 @@ class AIAnalyst:
 
         PREGUNTA: {question}
         """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error en el análisis de IA: {str(e)}"
+        return self.complete(prompt, "Error en el análisis de IA")
 
     def ask_llm_operational(self, machine_id: str, telemetry_context: str, events_context: str, question: str) -> str:
         prompt = f"""
         ROL: Ingeniero de Confiabilidad de Terreno para una empresa importante en Chile.
         ACTIVO: Máquina ID {machine_id}
-        
+
         CONTEXTO OPERACIONAL (Última Telemetría):
         {telemetry_context}
-        
+
         HISTORIAL RECIENTE (Errores y Fallas):
         {events_context}
-        
+
         TAREA: Analizar los signos vitales de la máquina y responder la consulta técnica.
-        
+
         REGLAS:
         1. Analiza tendencias en Voltaje, Rotación, Presión y Vibración.
         2. Relaciona los errores recientes con los datos de telemetría.
@@ -53,8 +143,17 @@ class AIAnalyst:
 
         PREGUNTA DEL OPERADOR: {question}
         """
-        try:
-            response = self.model.generate_content(prompt)
-            return response.text
-        except Exception as e:
-            return f"❌ Error en el análisis operativo: {str(e)}"
\ No newline at end of file
+        return self.complete(prompt, "Error en el análisis operativo")
+
+# --- Un analista por proceso ---
+_analyst: AIAnalyst | None = None
+_analyst_lock = threading.Lock()
+
+def get_analyst() -> AIAnalyst:
+    global _analyst
+    if _analyst is None:
+        with _analyst_lock:
+            if _analyst is None:
+                _analyst = AIAnalyst()
+                logger.info(f"🤖 Analista IA listo (backend '{settings.AI_BACKEND}').")
+    return _analyst
@@ -0,0 +1,176 @@
+# src/services/columnar_export.py
+import asyncio
+import io
+from datetime import datetime
+from typing import AsyncIterator
+import polars as pl
+from sqlalchemy import DateTime, Float, Integer, Select, String, select
+
+from src.database.async_session import async_engine
+from src.models.error import Error
+from src.models.failure import Failure
+from src.models.maintenance import Maintenance
+from src.models.telemetry import Telemetry
+
+# Tablas exportables (nombre en la URL -> modelo)
+EXPORT_TABLES = {
+    "telemetry": Telemetry,
+    "errors": Error,
+    "failures": Failure,
+    "maint": Maintenance,
+}
+
+EXPORT_FORMATS = {
+    "arrow": ("application/vnd.apache.arrow.stream", "arrows"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+# Bytes de CSV que se acumulan antes de convertirlos en un lote Arrow (~100k filas de telemetría)
+EXPORT_CHUNK_BYTES = 8 * 1024 * 1024
+# Trozos de COPY pendientes de procesar: si el cliente lee lento, COPY se detiene (memoria acotada)
+EXPORT_QUEUE_CHUNKS = 64
+
+def export_columns(model, columns: list[str] | None = None) -> list[str]:
+    """Columnas pedidas (en el orden de la tabla si no se especifican); las de auditoría no se exportan."""
+    available = [c for c in model.__table__.columns.keys() if c not in ("created_at", "updated_at")]
+    if not columns:
+        return available
+    unknown = [c for c in columns if c not in available]
+    if unknown:
+        raise ValueError(f"Columnas desconocidas en {model.__tablename__}: {', '.join(unknown)}")
+    return columns
+
+def polars_schema(model, columns: list[str]) -> dict[str, pl.DataType]:
+    """Tipos Polars de las columnas a partir de los tipos SQLAlchemy del modelo."""
+    schema = {}
+    for name in columns:
+        sql_type = model.__table__.c[name].type
+        if isinstance(sql_type, DateTime):
+            schema[name] = pl.Datetime("us")
+        elif isinstance(sql_type, Float):
+            schema[name] = pl.Float64
+        elif isinstance(sql_type, Integer):
+            schema[name] = pl.Int64
+        elif isinstance(sql_type, String):
+            schema[name] = pl.String
+        else:
+            raise TypeError(f"Tipo no exportable: {name} ({sql_type})")
+    return schema
+
+def export_query(model, columns: list[str], machine_ids: list[int] | None = None,
+                 start: datetime | None = None, end: datetime | None = None) -> Select:
+    """SELECT proyectado y filtrado por máquinas y [start, end), ordenado por (machineID, datetime)."""
+    query = select(*[model.__table__.c[c] for c in columns])
+    if machine_ids:
+        query = query.where(model.machineID.in_(machine_ids))
+    if start is not None:
+        query = query.where(model.datetime >= start)
+    if end is not None:
+        query = query.where(model.datetime < end)
+    return query.order_by(model.machineID, model.datetime)
+
+async def copy_batches(query: Select, schema: dict[str, pl.DataType],
+                       chunk_bytes: int = EXPORT_CHUNK_BYTES) -> AsyncIterator[pl.DataFrame]:
+    """
+    Ejecuta 'query' con COPY (...) TO STDOUT y entrega el resultado como DataFrames de Polars.
+
+    PostgreSQL envía CSV y Polars lo parsea en Rust directamente a columnas Arrow: no se crea
+    ningún objeto Python por fila. COPY corre en una tarea aparte que llena una cola acotada,
+    así que si el cliente consume despacio la lectura de la DB se pausa.
+    """
+    # Los parámetros son enteros y fechas ya validados por la API: se pueden renderizar literales
+    sql = str(query.compile(dialect=async_engine.dialect, compile_kwargs={"literal_binds": True, "render_postcompile": True}))
+    queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=EXPORT_QUEUE_CHUNKS)
+
+    async with async_engine.connect() as conn:
+        raw = (await conn.get_raw_connection()).driver_connection
+
+        async def produce():
+            try:
+                await raw.copy_from_query(sql, output=queue.put, format="csv")
+            finally:
+                await queue.put(None)
+
+        producer = asyncio.create_task(produce())
+        parts: list[bytes] = []
+        size = 0
+        try:
+            while True:
+                chunk = await queue.get()
+                if chunk is not None:
+                    parts.append(chunk)
+                    size += len(chunk)
+                    if size < chunk_bytes:
+                        continue
+                    # Se corta en el último salto de línea: el resto pasa al siguiente lote
+                    pending = b"".join(parts)
+                    cut = pending.rfind(b"\n") + 1
+                    data, parts = pending[:cut], [pending[cut:]]
+                    size = len(parts[0])
+                else:
+                    data = b"".join(parts)
+
+                if data:
+                    yield pl.read_csv(io.BytesIO(data), has_header=False, new_columns=list(schema), schema=schema)
+                if chunk is None:
+                    break
+            await producer  # propaga los errores de COPY
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+class StreamSink(io.RawIOBase):
+    """Destino 'file-like' que acumula lo escrito por pyarrow hasta que el generador lo entrega."""
+
+    def __init__(self):
+        self._parts: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # Parquet guarda offsets absolutos en el footer: la posición no se reinicia al vaciar
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._parts = b"".join(self._parts), []
+        return data
+
+async def encode_batches(batches: AsyncIterator[pl.DataFrame], schema: dict[str, pl.DataType],
+                         fmt: str) -> AsyncIterator[bytes]:
+    """Serializa los lotes como stream Arrow IPC o Parquet (un row group por lote), entregando bytes a medida que se escriben."""
+    # pyarrow (y con él numpy) se carga con la primera exportación, no al arrancar la API
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = StreamSink()
+    arrow_schema = pl.DataFrame(schema=schema).to_arrow().schema
+    if fmt == "arrow":
+        writer = pa.ipc.new_stream(sink, arrow_schema)
+    else:
+        writer = pq.ParquetWriter(sink, arrow_schema, compression="zstd")
+
+    async for batch in batches:
+        writer.write_table(batch.to_arrow().cast(arrow_schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def export_stream(table: str, fmt: str, columns: list[str] | None = None, machine_ids: list[int] | None = None,
+                  start: datetime | None = None, end: datetime | None = None) -> AsyncIterator[bytes]:
+    """
+    Exportación columnar de 'table' en 'fmt' ('arrow' o 'parquet') como un iterador async de bytes.
+
+    Valida tabla y columnas antes de tocar la DB (ValueError), para poder responder 422 de inmediato.
+    """
+    model = EXPORT_TABLES[table]
+    columns = export_columns(model, columns)
+    schema = polars_schema(model, columns)
+    query = export_query(model, columns, machine_ids, start, end)
+    return encode_batches(copy_batches(query, schema), schema, fmt)
@@ -0,0 +1,35 @@
+# src/services/csv_sources.py
+from pathlib import Path
+import polars as pl
+
+from src.models.error import Error
+from src.models.failure import Failure
+from src.models.machine import Machine
+from src.models.maintenance import Maintenance
+from src.models.telemetry import Telemetry
+
+# Lectura de los CSV de origen, sin conexiones ni logging: la usan la ingesta y el lago Parquet
+
+# Orden de carga: Machines primero para respetar las Foreign Keys.
+# Los patrones admiten nuevas entregas (p.ej. PdM_telemetry_2016_01.csv) junto al archivo original.
+CSV_SOURCES = {
+    "PdM_machines*.csv": (Machine, "Máquinas"),
+    "PdM_telemetry*.csv": (Telemetry, "Telemetría"),
+    "PdM_errors*.csv": (Error, "Errores"),
+    "PdM_failures*.csv": (Failure, "Fallas"),
+    "PdM_maint*.csv": (Maintenance, "Mantenimiento"),
+}
+
+def scan_source(paths: Path | list[Path], model) -> pl.LazyFrame:
+    """LazyFrame de uno o varios CSV con sólo las columnas que existen en la tabla del modelo."""
+    paths = paths if isinstance(paths, list) else [paths]
+    table_columns = list(model.__table__.columns.keys())
+
+    # Cada entrega se proyecta por separado: así da igual el orden de columnas de cada archivo
+    frames = [pl.scan_csv(path) for path in paths]
+    columns = [c for c in table_columns if c in frames[0].collect_schema().names()]
+    lf = pl.concat([frame.select(columns) for frame in frames])
+
+    if "datetime" in columns:
+        lf = lf.with_columns(pl.col("datetime").str.to_datetime("%Y-%m-%d %H:%M:%S"))
+    return lf
@@ -0,0 +1,85 @@
+# src/services/health.py
+import asyncio
+import logging
+import time
+from datetime import datetime
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.database.async_session import async_engine
+from src.services.query_cache import DATA_SCOPE, query_cache, read_data_versions
+
+logger = logging.getLogger(__name__)
+
+class HealthMonitor:
+    """
+    Estado real de las dependencias para /health.
+
+    - database: SELECT 1 por el pool async de la API, acotado por HEALTH_TIMEOUT_SECONDS.
+    - cache: la caché del dashboard puede leer la versión de datos (tabla en PostgreSQL o, con
+      ANALYTICS_BACKEND=parquet, una generación publicada del lago); sin eso no sabría invalidarse.
+
+    El resultado se reutiliza HEALTH_CACHE_SECONDS: los sondeos del orquestador (varios por segundo
+    entre réplicas y balanceadores) no suman carga a la DB, y los simultáneos comparten un chequeo.
+    """
+
+    def __init__(self, ttl: float, timeout: float):
+        self.ttl = ttl
+        self.timeout = timeout
+        self._report: dict | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> bool:
+        return self._report is not None and time.monotonic() - self._checked_at < self.ttl
+
+    async def check(self) -> dict:
+        if self._fresh():
+            return self._report
+        async with self._lock:
+            if not self._fresh():
+                self._report = await self._run_checks()
+                self._checked_at = time.monotonic()
+        return self._report
+
+    async def _run_checks(self) -> dict:
+        database, cache = await asyncio.gather(self._database(), self._cache())
+        # Con el lago Parquet el dashboard funciona sin PostgreSQL: la DB caída sólo degrada la API
+        required = [cache] if settings.ANALYTICS_BACKEND == "parquet" else [database, cache]
+        status = "online" if all(c["ok"] for c in required) else "degraded"
+        if status != "online":
+            logger.warning(f"⚠️ Health degradado: database={database}, cache={cache}")
+        return {
+            "status": status,
+            "database": "connected" if database["ok"] else "unreachable",
+            "checks": {"database": database, "cache": cache},
+            "checked_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    async def _database(self) -> dict:
+        start = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.timeout):
+                async with async_engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+        except Exception as e:
+            return {"ok": False, "error": str(e).splitlines()[0] if str(e) else type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+
+    async def _cache(self) -> dict:
+        try:
+            # Lectura directa, sin pasar por query_cache.data_version: ésta devuelve la última versión
+            # memorizada (hasta CACHE_VERSION_POLL_SECONDS) y 0 si no hay ninguna, así que nunca falla.
+            # Usa el engine sync (lo mismo que los callbacks): va al threadpool
+            versions = await asyncio.wait_for(asyncio.to_thread(read_data_versions), self.timeout)
+        except Exception as e:
+            return {"ok": False, "error": str(e).splitlines()[0] if str(e) else type(e).__name__}
+        if not versions:
+            # Sin tabla de versiones (o vacía) la caché no tiene con qué invalidarse
+            return {"ok": False, "backend": settings.ANALYTICS_BACKEND, "error": "sin versión de datos"}
+        version = versions.get(DATA_SCOPE, 0)
+        ready = settings.ANALYTICS_BACKEND != "parquet" or version > 0
+        return {"ok": ready, "backend": settings.ANALYTICS_BACKEND, "data_version": version, "entries": query_cache.stats()["entries"]}
+
+# Uno por proceso (cada worker responde por sí mismo)
+health_monitor = HealthMonitor(ttl=settings.HEALTH_CACHE_SECONDS, timeout=settings.HEALTH_TIMEOUT_SECONDS)
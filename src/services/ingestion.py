@@ -1,81 +1,196 @@
 # src/services/ingestion.py
+import argparse
 import logging
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
 import polars as pl
-from sqlalchemy.orm import Session
+from sqlalchemy import Engine, select
 
+from src.analysis.telemetry_rollups import ensure_rollups, merge_windows, refresh_rollups, touched_windows
 from src.core.config import settings
-from src.database.session import engine, SessionLocal
+from src.database.session import engine
 from src.database.base import Base
+from src.database.bulk_copy import copy_frame, natural_key, upsert_changes, upsert_frame
+from src.database.indexes import ensure_indexes
+from src.database.partitions import ensure_partitions, month_start
+from src.database.watermarks import advance_watermarks, load_watermarks
 from src.models.machine import Machine
 from src.models.telemetry import Telemetry
-from src.models.error import Error
-from src.models.failure import Failure
-from src.models.maintenance import Maintenance
+from src.services.csv_sources import CSV_SOURCES, scan_source
+from src.services.query_cache import bump_data_version
 
-# Configuración de logging para ver qué pasa en la terminal
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Filas por lote enviadas a COPY (acota la RAM usada por el lector)
+COPY_BATCH_SIZE = 100_000
+
+def configure_logging():
+    """Logging de la CLI (y de cada worker 'spawn', que no ejecuta el bloque __main__)."""
+    logging.basicConfig(level=logging.INFO)
+
 def create_tables():
     """Crea las tablas en la base de datos si no existen."""
     logger.info(f"🛠 Conectando a {settings.DB_HOST} para crear tablas...")
     Base.metadata.create_all(bind=engine)
-    logger.info("✅ Tablas verificadas/creadas con éxito.")
+    ensure_indexes(engine)
+    ensure_rollups(engine)
+    logger.info("✅ Tablas e índices verificados/creados con éxito.")
+
+def only_new_rows(lf: pl.LazyFrame, watermarks: pl.DataFrame) -> pl.LazyFrame:
+    """
+    Descarta las filas anteriores a la marca de agua de su máquina. La hora de la marca se conserva:
+    puede traer eventos nuevos de esa misma hora y los ya cargados los descarta ON CONFLICT.
+    """
+    return (
+        lf.with_columns(pl.col("machineID").cast(pl.Int64))
+        .join(watermarks.lazy(), on="machineID", how="left")
+        .filter(pl.col("last_datetime").is_null() | (pl.col("datetime") >= pl.col("last_datetime")))
+        .drop("last_datetime")
+    )
+
+def stream_csv_to_table(
+    paths: Path | list[Path],
+    model,
+    batch_size: int = COPY_BATCH_SIZE,
+    bind: Engine = engine,
+    machines: tuple[int, int] | None = None,
+    label: str | None = None,
+) -> int:
+    """
+    Carga incremental de uno o varios CSV en la tabla del modelo, por lotes y con COPY.
+
+    - Todo pasa por COPY a staging + ON CONFLICT sobre la clave natural (PK o índice único); una
+      tabla sin clave natural va con COPY directo.
+    - Eventos (errores, fallas, mantenimientos; todas sus columnas son clave): sólo se envían filas
+      desde la marca de agua de su máquina (inclusive) y las ya cargadas se ignoran.
+    - Telemetry no se filtra por la marca: una lectura tardía o corregida se inserta o actualiza
+      (sólo si cambió algún valor).
+    - Marcas de agua, rollups y conteo usan sólo las filas insertadas o modificadas.
+
+    'machines' limita la carga a un rango de machineID (partición de un worker paralelo).
+    Con TELEMETRY_PARTITIONING se crean antes las particiones mensuales que el archivo necesita.
+    En Telemetry se recalculan al final los rollups diarios/semanales de los buckets tocados.
+    Datos y marcas de agua se confirman en una sola transacción: si un lote falla no queda nada a medias.
+    """
+    table = model.__table__
+    label = label or table.name
+    total = 0
+    windows = []
+
+    lf = scan_source(paths, model)
+    if machines is not None:
+        lf = lf.filter(pl.col("machineID").is_between(*machines))
+
+    if model is Telemetry and settings.TELEMETRY_PARTITIONING:
+        # Las particiones se crean antes (y fuera) de la transacción de carga
+        months = lf.select(pl.col("datetime").dt.truncate("1mo").unique()).collect()["datetime"]
+        ensure_partitions({month_start(m) for m in months}, bind=bind)
+
+    with bind.begin() as conn:
+        names = lf.collect_schema().names()
+        key = natural_key(table, names)
+        incremental = "datetime" in names
+        # Sólo los eventos se recortan por marca de agua: no tienen columnas fuera de la clave que actualizar
+        if incremental and key is not None and set(names) <= set(key):
+            lf = only_new_rows(lf, load_watermarks(conn, table))
+
+        for batch in lf.collect_batches(chunk_size=batch_size):
+            if batch.is_empty():
+                continue
+            if incremental and key is not None:
+                written = upsert_changes(conn, table, batch, ["machineID", "datetime"])
+                total += written.height
+            else:
+                written = batch
+                total += upsert_frame(conn, table, batch) if key is not None else copy_frame(conn, table, batch)
+            if incremental and not written.is_empty():
+                advance_watermarks(conn, table.name, written)
+                if model is Telemetry:
+                    windows.append(touched_windows(written))
+            logger.info(f"📦 [{label}] {total} registros enviados...")
+
+        if windows:
+            # Mismo COMMIT que los datos: los rollups nunca quedan desfasados de la telemetría
+            rollup_rows = refresh_rollups(conn, merge_windows(windows))
+            logger.info(f"📊 [{label}] {rollup_rows} buckets de rollup actualizados.")
+
+        if total:
+            # Invalida las cachés del dashboard al confirmar la carga
+            bump_data_version(conn)
+
+    return total
+
+def machine_ranges(parts: int) -> list[tuple[int, int]]:
+    """Divide los machineID existentes en 'parts' rangos contiguos de tamaño similar."""
+    with engine.connect() as conn:
+        ids = conn.execute(select(Machine.machineID).order_by(Machine.machineID)).scalars().all()
+    if not ids:
+        return []
+    size = math.ceil(len(ids) / parts)
+    return [(ids[i], ids[min(i + size, len(ids)) - 1]) for i in range(0, len(ids), size)]
+
+def ingest_source(pattern: str, machines: tuple[int, int] | None = None) -> tuple[str, int, float]:
+    """Carga una fuente de CSV_SOURCES (opcionalmente sólo un rango de máquinas). Es la unidad de trabajo de cada worker."""
+    model, display_name = CSV_SOURCES[pattern]
+    label = display_name if machines is None else f"{display_name} {machines[0]}-{machines[1]}"
+
+    paths = sorted(settings.DATA_PATH.glob(pattern))
+    if not paths:
+        logger.warning(f"⚠️ No se encontraron archivos para {display_name} ({pattern}).")
+        return label, 0, 0.0
+
+    logger.info(f"🚀 Cargando {label} ({len(paths)} archivo/s)...")
+    start = time.perf_counter()
+    rows = stream_csv_to_table(paths, model, machines=machines, label=label)
+    return label, rows, time.perf_counter() - start
+
+def log_result(label: str, rows: int, elapsed: float):
+    logger.info(f"✅ {label}: {rows} registros nuevos en {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} filas/s).")
+
+def ingest_csv_to_db(workers: int | None = None):
+    """
+    Ingesta incremental por streaming (CSV por lotes -> COPY FROM STDIN); cada corrida carga sólo el delta.
+
+    Con workers > 1, Machines se confirma primero (Foreign Keys) y después las demás tablas se cargan
+    en paralelo en un pool de procesos, con la telemetría repartida por rangos de machineID.
+    Cada proceso abre su propio engine, por lo que cada carga usa su propia conexión.
+    """
+    workers = workers or settings.INGEST_WORKERS
+    start = time.perf_counter()
 
-def ingest_csv_to_db():
-    """Proceso de ingesta optimizado."""
-    db: Session = SessionLocal()
-    
     try:
-        # 1. Machines (Maestra)
-        if not db.query(Machine).first():
-            logger.info("🚀 Cargando Machines...")
-            path = settings.DATA_PATH / "PdM_machines.csv"
-            df_machines = pl.read_csv(path)
-            db.bulk_insert_mappings(Machine, df_machines.to_dicts())
-            db.commit()
-            logger.info(f"✅ {df_machines.height} máquinas cargadas.")
-
-        # 2. Telemetry (Carga por trozos para optimizar RAM)
-        if not db.query(Telemetry).first():
-            logger.info("🚀 Cargando Telemetría (871k registros)...")
-            path = settings.DATA_PATH / "PdM_telemetry.csv"
-            df_telemetry = pl.read_csv(path).with_columns(
-                pl.col("datetime").str.to_datetime("%Y-%m-%d %H:%M:%S")
-            )
-            
-            chunk_size = 100000
-            for i in range(0, df_telemetry.height, chunk_size):
-                chunk = df_telemetry.slice(i, chunk_size).to_dicts()
-                db.bulk_insert_mappings(Telemetry, chunk)
-                db.commit()
-                logger.info(f"📦 Progress: {min(i + chunk_size, df_telemetry.height)} registros...")
-
-        # 3. Resto de archivos (Errors, Failures, Maint)
-        mapping = {
-            "PdM_errors.csv": (Error, "Errores"),
-            "PdM_failures.csv": (Failure, "Fallas"),
-            "PdM_maint.csv": (Maintenance, "Mantenimiento")
-        }
-
-        for csv_file, (model, display_name) in mapping.items():
-            if not db.query(model).first():
-                logger.info(f"🚀 Cargando {display_name}...")
-                path = settings.DATA_PATH / csv_file
-                df = pl.read_csv(path).with_columns(
-                    pl.col("datetime").str.to_datetime("%Y-%m-%d %H:%M:%S")
-                )
-                db.bulk_insert_mappings(model, df.to_dicts())
-                db.commit()
-                logger.info(f"✅ {display_name} cargado correctamente.")
+        machines_pattern, *dependents = CSV_SOURCES
+        log_result(*ingest_source(machines_pattern))
+
+        if workers <= 1:
+            for pattern in dependents:
+                log_result(*ingest_source(pattern))
+        else:
+            telemetry_pattern = next(p for p in dependents if CSV_SOURCES[p][0] is Telemetry)
+            tasks = [(telemetry_pattern, r) for r in machine_ranges(workers)]
+            tasks += [(p, None) for p in dependents if p != telemetry_pattern]
+
+            # 'spawn': Polars no es seguro tras fork() y así cada worker crea su engine desde cero
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"), initializer=configure_logging) as pool:
+                futures = [pool.submit(ingest_source, *task) for task in tasks]
+                for future in as_completed(futures):
+                    log_result(*future.result())
+
+        logger.info(f"🏁 Ingesta completa en {time.perf_counter() - start:.1f}s con {workers} worker/s.")
 
     except Exception as e:
         logger.error(f"❌ Error crítico en la ingesta: {str(e)}")
-        db.rollback()
         raise e
-    finally:
-        db.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ingesta incremental de los CSV de mantenimiento predictivo.")
+    parser.add_argument("--workers", type=int, default=None, help="Procesos en paralelo (por defecto INGEST_WORKERS).")
+    args = parser.parse_args()
+
+    # Configuración de logging para ver qué pasa en la terminal (sólo al correr como script)
+    configure_logging()
     create_tables()
-    ingest_csv_to_db()
\ No newline at end of file
+    ingest_csv_to_db(workers=args.workers)
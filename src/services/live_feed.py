@@ -0,0 +1,177 @@
+# src/services/live_feed.py
+import asyncio
+import json
+import logging
+from datetime import datetime
+import polars as pl
+from sqlalchemy import DateTime, Integer, and_, column, func, select, values
+
+from src.api.v1.streaming import NDJSON_DATETIME_FORMAT
+from src.core.config import settings
+from src.database.async_session import async_engine
+from src.models.data_version import DataVersion
+from src.models.error import Error
+from src.models.failure import Failure
+from src.models.telemetry import Telemetry
+from src.services.query_cache import SCOPES
+
+logger = logging.getLogger(__name__)
+
+SENSORS = ["volt", "rotate", "pressure", "vibration"]
+
+# Qué se envía de cada fuente (además de machineID y datetime)
+LIVE_SOURCES = {
+    "telemetry": (Telemetry, SENSORS),
+    "errors": (Error, ["errorID"]),
+    "failures": (Failure, ["failure", "id"]),
+}
+# Cursor inicial de máquinas sin datos en una fuente
+NO_DATA = datetime(1900, 1, 1)
+
+class LiveFeed:
+    """
+    Canal de novedades en vivo por máquina (telemetría, errores y fallas nuevas).
+
+    Un solo sondeo por proceso, sin importar cuántos clientes miren: cada LIVE_POLL_SECONDS se lee
+    la versión de datos (una fila por PK) y sólo si cambió se consultan las filas posteriores al
+    cursor de cada máquina suscrita, una consulta por fuente para todas a la vez. El mensaje de cada
+    máquina se serializa una vez y se reparte a las colas de todos sus suscriptores.
+
+    El cursor es el último 'datetime' enviado por máquina y fuente: lo que llegue con fecha anterior
+    (datos tardíos) no se empuja, aparece al recargar la vista.
+    """
+
+    def __init__(self, poll_seconds: float, queue_size: int):
+        self.poll_seconds = poll_seconds
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+        self._cursors: dict[int, dict[str, datetime]] = {}
+        self._version: int | None = None
+        self._task: asyncio.Task | None = None
+        self._subscribe_lock = asyncio.Lock()
+        self.polls = 0
+        self.messages = 0
+
+    async def subscribe(self, machine_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        # Serializado: dos clientes nuevos de la misma máquina no deben leer/pisar su cursor a la vez
+        async with self._subscribe_lock:
+            if machine_id not in self._subscribers:
+                self._cursors[machine_id] = await self._latest(machine_id)
+                self._subscribers[machine_id] = set()
+            self._subscribers[machine_id].add(queue)
+            if self._task is None or self._task.done():
+                self._version = await self._read_version()
+                self._task = asyncio.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, machine_id: int, queue: asyncio.Queue):
+        queues = self._subscribers.get(machine_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[machine_id]
+            del self._cursors[machine_id]
+
+    def close(self):
+        """Termina todas las suscripciones (None = fin del stream) y el sondeo."""
+        for queues in self._subscribers.values():
+            for queue in queues:
+                self._offer(queue, None)
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _latest(self, machine_id: int) -> dict[str, datetime]:
+        """Último 'datetime' existente de cada fuente: la suscripción empuja sólo lo posterior."""
+        async with async_engine.connect() as conn:
+            cursors = {}
+            for name, (model, _) in LIVE_SOURCES.items():
+                last = await conn.scalar(select(func.max(model.datetime)).where(model.machineID == machine_id))
+                cursors[name] = last or NO_DATA
+        return cursors
+
+    async def _read_version(self) -> int:
+        async with async_engine.connect() as conn:
+            try:
+                # Suma de todos los alcances: cambia con cualquier escritura, también los vaciados de la ingesta push
+                version = await conn.scalar(select(func.sum(DataVersion.version)).where(DataVersion.scope.in_(SCOPES)))
+            except Exception:
+                return 0
+        return int(version or 0)
+
+    async def _run(self):
+        # Se detiene solo cuando no quedan suscriptores (lo vuelve a lanzar la próxima suscripción)
+        while self._subscribers:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"❌ Error en el sondeo del canal en vivo: {e}")
+
+    async def poll(self) -> int:
+        """Un ciclo de sondeo; devuelve cuántas máquinas recibieron novedades."""
+        self.polls += 1
+        version = await self._read_version()
+        if version == self._version or not self._subscribers:
+            return 0
+        self._version = version
+
+        machines = list(self._subscribers)
+        deltas = {}
+        async with async_engine.connect() as conn:
+            for name, (model, columns) in LIVE_SOURCES.items():
+                cursor = values(column("machineID", Integer), column("since", DateTime), name="live_cursor").data(
+                    [(m, self._cursors[m][name]) for m in machines]
+                )
+                query = (
+                    select(model.machineID, model.datetime, *[getattr(model, c) for c in columns])
+                    .select_from(model.__table__.join(cursor, and_(model.machineID == cursor.c.machineID, model.datetime > cursor.c.since)))
+                    .order_by(model.machineID, model.datetime)
+                )
+                rows = (await conn.execute(query)).all()
+                deltas[name] = pl.DataFrame(rows, schema=["machineID", "datetime", *columns], orient="row")
+
+        updated = 0
+        for machine_id in machines:
+            if machine_id not in self._subscribers:
+                continue  # se desuscribió durante la consulta
+            message = self._message(machine_id, deltas)
+            if message is None:
+                continue
+            for queue in self._subscribers[machine_id]:
+                self._offer(queue, message)
+            updated += 1
+        self.messages += updated
+        return updated
+
+    def _message(self, machine_id: int, deltas: dict[str, pl.DataFrame]) -> str | None:
+        """JSON con las novedades de una máquina (telemetría en columnas, lista para extendData) o None."""
+        payload = {"machineID": machine_id}
+        for name, df in deltas.items():
+            rows = df.filter(pl.col("machineID") == machine_id).drop("machineID")
+            if rows.is_empty():
+                continue
+            self._cursors[machine_id][name] = rows["datetime"].max()
+            rows = rows.with_columns(pl.col("datetime").dt.strftime(NDJSON_DATETIME_FORMAT))
+            payload[name] = rows.to_dict(as_series=False) if name == "telemetry" else rows.to_dicts()
+        return json.dumps(payload) if len(payload) > 1 else None
+
+    def _offer(self, queue: asyncio.Queue, message: str | None):
+        # Un cliente lento no frena a los demás: se descarta su mensaje más viejo
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(message)
+
+    def stats(self) -> dict:
+        return {
+            "machines": len(self._subscribers),
+            "subscribers": sum(len(q) for q in self._subscribers.values()),
+            "polls": self.polls,
+            "messages": self.messages,
+            "data_version": self._version,
+        }
+
+# Un canal por proceso (cada worker de uvicorn sondea una vez para todos sus clientes)
+live_feed = LiveFeed(poll_seconds=settings.LIVE_POLL_SECONDS, queue_size=settings.LIVE_QUEUE_SIZE)
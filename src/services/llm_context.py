@@ -0,0 +1,238 @@
+# src/services/llm_context.py
+import logging
+from datetime import timedelta
+import polars as pl
+from sqlalchemy import Connection, func, literal, select
+
+from src.analysis.features import COMPONENTS, ERROR_IDS, FEATURE_STEP_HOURS, LOOKBACK, SENSORS, feature_frame
+from src.analysis.reliability_metrics import KPI_COLUMNS
+from src.analysis.telemetry_rollups import fleet_summary
+from src.core.config import settings
+from src.database.session import read_engine
+from src.models.error import Error
+from src.models.failure import Failure
+from src.models.feature import MachineFeature
+from src.models.machine import Machine
+from src.models.maintenance import Maintenance
+from src.models.reliability import ReliabilityStat
+from src.models.telemetry import Telemetry
+from src.services.query_cache import TELEMETRY_SCOPE, query_cache
+from src.services.predictions import cached_predictions
+
+logger = logging.getLogger(__name__)
+
+# Aproximación estándar para texto mixto: ~4 caracteres por token
+CHARS_PER_TOKEN = 4
+# Ventanas de los conteos de eventos, contadas desde la última fila de features de la máquina
+EVENT_WINDOWS = {"7 días": timedelta(days=7), "30 días": timedelta(days=30)}
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def fit_budget(lines: list[str], max_tokens: int) -> str:
+    """
+    Une las líneas (ordenadas de mayor a menor prioridad) hasta agotar el presupuesto de tokens.
+
+    Las que no caben se descartan desde el final y se deja constancia, para que el modelo sepa
+    que el resumen está recortado.
+    """
+    kept, used = [], 0
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line)
+        if used + cost > max_tokens:
+            kept.append(f"(… {len(lines) - i} líneas omitidas por presupuesto)")
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept)
+
+def ranking(df: pl.DataFrame, column: str, k: int, descending: bool, fmt: str) -> str:
+    top = df.drop_nulls(column).sort(column, descending=descending).head(k)
+    return ", ".join(f"M{r['machineID']} {fmt.format(r[column])}" for r in top.iter_rows(named=True))
+
+# --- Agregados base (cacheados por versión de datos) ---
+def load_fleet_kpis() -> pl.DataFrame:
+    with read_engine.connect() as conn:
+        return pl.read_database(
+            select(*[ReliabilityStat.__table__.c[c] for c in KPI_COLUMNS], Machine.model)
+            .join(Machine, Machine.machineID == ReliabilityStat.machineID),
+            connection=conn,
+        )
+
+def load_baselines() -> pl.DataFrame:
+    """Media y desviación histórica de cada sensor por máquina (desde el rollup semanal)."""
+    with read_engine.connect() as conn:
+        return fleet_summary(conn, "weekly")
+
+def raw_features(conn: Connection, machine_id: int) -> dict | None:
+    """
+    Última fila de features calculada al vuelo desde las últimas 24h de telemetría cruda (mismo plan
+    que machine_features): para máquinas que el pipeline de features todavía no procesó.
+    """
+    last = conn.execute(select(func.max(Telemetry.datetime)).where(Telemetry.machineID == machine_id)).scalar()
+    if last is None:
+        return None
+    # La última fila (múltiplo de FEATURE_STEP_HOURS) puede ser hasta un paso anterior a la última lectura
+    since = last - LOOKBACK - timedelta(hours=FEATURE_STEP_HOURS)
+    schema = {"machineID": pl.Int64, "datetime": pl.Datetime("us")}
+    telemetry = pl.read_database(
+        select(Telemetry.machineID, Telemetry.datetime, *[getattr(Telemetry, s) for s in SENSORS])
+        .where(Telemetry.machineID == machine_id, Telemetry.datetime > since),
+        connection=conn, schema_overrides={**schema, **{s: pl.Float64 for s in SENSORS}},
+    )
+    errors = pl.read_database(
+        select(Error.machineID, Error.datetime, Error.errorID).where(Error.machineID == machine_id, Error.datetime > since),
+        connection=conn, schema_overrides={**schema, "errorID": pl.String},
+    )
+    maint = pl.read_database(
+        select(Maintenance.machineID, func.max(Maintenance.datetime).label("datetime"), Maintenance.comp)
+        .where(Maintenance.machineID == machine_id, Maintenance.datetime <= last)
+        .group_by(Maintenance.machineID, Maintenance.comp),
+        connection=conn, schema_overrides={**schema, "comp": pl.String},
+    )
+    features = feature_frame(telemetry.lazy(), errors.lazy(), maint.lazy()).collect()
+    return features.row(-1, named=True) if not features.is_empty() else None
+
+def load_machine_state(machine_id: int) -> dict | None:
+    """
+    Última fila de features de la máquina y sus eventos recientes contados por tipo. Sin fila en
+    machine_features las features salen de la telemetría cruda; None si tampoco hay telemetría.
+    """
+    f = MachineFeature.__table__
+    with read_engine.connect() as conn:
+        latest = conn.execute(
+            select(f).where(f.c.machineID == machine_id).order_by(f.c.datetime.desc()).limit(1)
+        ).mappings().first()
+        raw = latest is None
+        if raw:
+            latest = raw_features(conn, machine_id)
+        if latest is None:
+            return None
+
+        now = latest["datetime"]
+        since = now - max(EVENT_WINDOWS.values())
+        events = []
+        for model, kind in ((Error, Error.errorID), (Failure, Failure.failure), (Maintenance, Maintenance.comp)):
+            events += conn.execute(
+                select(literal(model.__tablename__), kind, model.datetime)
+                .where(model.machineID == machine_id, model.datetime > since, model.datetime <= now)
+            ).all()
+        kpis = conn.execute(
+            select(*[ReliabilityStat.__table__.c[c] for c in KPI_COLUMNS]).where(ReliabilityStat.machineID == machine_id)
+        ).mappings().first()
+    return {
+        "features": dict(latest),
+        "raw": raw,
+        "events": pl.DataFrame(events, schema={"source": pl.String, "kind": pl.String, "datetime": pl.Datetime("us")}, orient="row"),
+        "kpis": dict(kpis) if kpis else None,
+    }
+
+# --- Resúmenes para los prompts ---
+def fleet_digest(kpis: pl.DataFrame, risks: list[dict], max_tokens: int, top_k: int) -> str:
+    """Percentiles, rankings top-K y medianas por modelo: el largo no depende del tamaño de la flota."""
+    if kpis.is_empty():
+        return "Sin KPIs de confiabilidad calculados."
+
+    lines = [
+        f"Flota: {kpis.height} máquinas, {int(kpis['total_failures'].sum())} fallas registradas.",
+        f"MTBF (h): mediana {kpis['MTBF_hours'].median():.0f}, p10 {kpis['MTBF_hours'].quantile(0.1):.0f}, "
+        f"p90 {kpis['MTBF_hours'].quantile(0.9):.0f}.",
+        f"MTTR (h): mediana {kpis['MTTR_hours'].median():.1f}, p90 {kpis['MTTR_hours'].quantile(0.9):.1f}.",
+        f"Peor MTBF (top {top_k}): {ranking(kpis.filter(pl.col('MTBF_hours') > 0), 'MTBF_hours', top_k, False, '{:.0f}h')}.",
+        f"Peor MTTR (top {top_k}): {ranking(kpis, 'MTTR_hours', top_k, True, '{:.1f}h')}.",
+        f"Más fallas (top {top_k}): {ranking(kpis, 'total_failures', top_k, True, '{}')}.",
+    ]
+
+    if risks:
+        top = sorted(risks, key=lambda r: r["risk"], reverse=True)[:top_k]
+        lines.append(
+            f"Mayor riesgo de falla en {settings.FAILURE_HORIZON_HOURS}h: "
+            + ", ".join(f"M{r['machineID']} {r['comp']} {r['risk']:.1%}" for r in top) + "."
+        )
+
+    by_model = (
+        kpis.group_by("model")
+        .agg(pl.len().alias("n"), pl.col("MTBF_hours").median().alias("mtbf"), pl.col("MTTR_hours").median().alias("mttr"))
+        .sort("model")
+    )
+    lines += [f"Modelo {r['model']}: {r['n']} máquinas, MTBF mediana {r['mtbf']:.0f}h, MTTR mediana {r['mttr']:.1f}h."
+              for r in by_model.iter_rows(named=True)]
+    return fit_budget(lines, max_tokens)
+
+def build_fleet_context(max_tokens: int, top_k: int) -> str:
+    kpis = query_cache.get_or_load(("llm_fleet_kpis",), load_fleet_kpis)
+    risks = [r for rows in cached_predictions().values() for r in rows]
+    return fleet_digest(kpis, risks, max_tokens, top_k)
+
+def build_machine_context(machine_id: int, max_tokens: int) -> tuple[str, str]:
+    state = query_cache.get_or_load(("llm_machine_state", machine_id), lambda: load_machine_state(machine_id), scope=TELEMETRY_SCOPE)
+    if state is None:
+        return "Sin telemetría registrada para esta máquina.", "Sin eventos."
+
+    features = state["features"]
+    baselines = query_cache.get_or_load(("llm_baselines",), load_baselines, scope=TELEMETRY_SCOPE)
+    base = baselines.filter(pl.col("machineID") == machine_id).to_dicts()
+    base = base[0] if base else {}
+
+    origin = "calculadas de la telemetría cruda, " if state["raw"] else ""
+    telemetry = [f"Ventana al {features['datetime']:%Y-%m-%d %H:%M} ({origin}medias móviles; z = desvíos vs. histórico de la máquina):"]
+    for s in SENSORS:
+        mean_3h, mean_24h, sd_24h = features[f"{s}_mean_3h"], features[f"{s}_mean_24h"], features[f"{s}_sd_24h"]
+        if mean_3h is None:
+            continue
+        line = f"{s}: 3h {mean_3h:.1f}"
+        if base.get(f"{s}_std"):
+            line += f" (z {(mean_3h - base[f'{s}_mean']) / base[f'{s}_std']:+.1f})"
+        if mean_24h is not None:
+            trend = (mean_3h - mean_24h) / abs(mean_24h) if mean_24h else 0.0
+            line += f", 24h {mean_24h:.1f}, tendencia {trend:+.1%}"
+        if sd_24h is not None and base.get(f"{s}_std"):
+            line += f", variabilidad 24h x{sd_24h / base[f'{s}_std']:.2f} del histórico"
+        telemetry.append(line)
+
+    risks = cached_predictions().get(machine_id)
+    if risks:
+        telemetry.append(f"Riesgo de falla {settings.FAILURE_HORIZON_HOURS}h: " + ", ".join(f"{r['comp']} {r['risk']:.1%}" for r in risks))
+    replaced = [f"{c} {features[f'{c}_hours_since_replacement']:.0f}h" for c in COMPONENTS
+                if features[f"{c}_hours_since_replacement"] is not None]
+    if replaced:
+        telemetry.append("Horas desde el último reemplazo: " + ", ".join(replaced))
+
+    events = []
+    errors_24h = [f"{e} x{features[f'{e}_count_24h']}" for e in ERROR_IDS if features[f"{e}_count_24h"]]
+    events.append("Errores últimas 24h: " + (", ".join(errors_24h) if errors_24h else "ninguno"))
+    recent = state["events"]
+    labels = {"errors": "Errores", "failures": "Fallas", "maint": "Mantenimientos"}
+    for label, window in EVENT_WINDOWS.items():
+        counts = (
+            recent.filter(pl.col("datetime") > features["datetime"] - window)
+            .group_by("source", "kind").agg(pl.len().alias("n"), pl.col("datetime").max().alias("last"))
+            .sort("source", "kind")
+        )
+        for source, name in labels.items():
+            rows = counts.filter(pl.col("source") == source)
+            if not rows.is_empty():
+                events.append(f"{name} últimos {label}: " + ", ".join(
+                    f"{r['kind']} x{r['n']} (último {r['last']:%m-%d})" for r in rows.iter_rows(named=True)
+                ))
+    if state["kpis"]:
+        k = state["kpis"]
+        events.append(f"KPIs: MTBF {k['MTBF_hours']:.0f}h, MTTR {k['MTTR_hours']:.1f}h, {k['total_failures']} fallas históricas.")
+
+    # La telemetría tiene prioridad: los eventos usan lo que quede del presupuesto
+    telemetry_text = fit_budget(telemetry, max_tokens // 2)
+    return telemetry_text, fit_budget(events, max_tokens - estimate_tokens(telemetry_text))
+
+def fleet_context(max_tokens: int | None = None, top_k: int | None = None) -> str:
+    """Resumen de la flota de tamaño acotado (no crece con el número de máquinas) para el prompt estratégico."""
+    max_tokens = max_tokens or settings.AI_CONTEXT_MAX_TOKENS
+    top_k = top_k or settings.AI_CONTEXT_TOP_K
+    return query_cache.get_or_load(("llm_fleet_context", max_tokens, top_k), lambda: build_fleet_context(max_tokens, top_k))
+
+def machine_context(machine_id: int, max_tokens: int | None = None) -> tuple[str, str]:
+    """(telemetría, eventos) de una máquina resumidos para el prompt operacional."""
+    max_tokens = max_tokens or settings.AI_CONTEXT_MAX_TOKENS
+    return query_cache.get_or_load(
+        ("llm_machine_context", machine_id, max_tokens), lambda: build_machine_context(machine_id, max_tokens),
+        scope=TELEMETRY_SCOPE,
+    )
@@ -0,0 +1,411 @@
+# src/services/online_features.py
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+import polars as pl
+from sqlalchemy import Engine, func, select
+
+from src.analysis.features import COMPONENTS, ERROR_IDS, SENSORS
+from src.core.config import settings
+from src.database.session import job_engine
+from src.models.error import Error
+from src.models.maintenance import Maintenance
+from src.models.telemetry import Telemetry
+from src.models.watermark import IngestionWatermark
+
+logger = logging.getLogger(__name__)
+
+# Lecturas horarias: las ventanas de 3h y 24h son las últimas 3 y 24 lecturas de cada máquina
+LONG_WINDOW = 24
+SHORT_WINDOW = 3
+# Una lectura más de LONG_WINDOW horas después de la anterior reinicia las ventanas (hubo un corte)
+MAX_GAP_SECONDS = LONG_WINDOW * 3600
+# Versión del formato del snapshot: uno de otro formato no se carga (arranque en caliente)
+SNAPSHOT_FORMAT = 2
+
+def to_epoch(value: datetime) -> int:
+    return int(np.datetime64(value, "s").astype(np.int64))
+
+class WindowStats:
+    """
+    Media/varianza de ventana deslizante (Welford con altas y bajas) para todas las máquinas y sensores.
+
+    Arrays (slots, sensores): cada lectura suma un valor y, con la ventana llena, resta el que sale,
+    en O(1). Para que el error de redondeo no se acumule, cada vez que el ring da la vuelta la
+    ventana se recalcula exacta desde el buffer (O(ventana) cada 'ventana' lecturas: O(1) amortizado).
+    """
+
+    def __init__(self, slots: int, sensors: int):
+        self.count = np.zeros(slots, dtype=np.int64)
+        self.mean = np.zeros((slots, sensors))
+        self.m2 = np.zeros((slots, sensors))
+
+    def grow(self, slots: int):
+        extra = slots - len(self.count)
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.mean = np.vstack([self.mean, np.zeros((extra, self.mean.shape[1]))])
+        self.m2 = np.vstack([self.m2, np.zeros((extra, self.m2.shape[1]))])
+
+    def add(self, slot: int, x: np.ndarray):
+        self.count[slot] += 1
+        delta = x - self.mean[slot]
+        self.mean[slot] += delta / self.count[slot]
+        self.m2[slot] += delta * (x - self.mean[slot])
+
+    def remove(self, slot: int, x: np.ndarray):
+        self.count[slot] -= 1
+        if self.count[slot] == 0:
+            self.mean[slot] = 0.0
+            self.m2[slot] = 0.0
+            return
+        delta = x - self.mean[slot]
+        self.mean[slot] -= delta / self.count[slot]
+        self.m2[slot] -= delta * (x - self.mean[slot])
+
+    def reset(self, slot: int, window: np.ndarray | None = None):
+        """Recalcula el slot exacto desde los valores de la ventana (o lo vacía)."""
+        if window is None or len(window) == 0:
+            self.count[slot] = 0
+            self.mean[slot] = 0.0
+            self.m2[slot] = 0.0
+            return
+        self.count[slot] = len(window)
+        self.mean[slot] = window.mean(axis=0)
+        self.m2[slot] = ((window - self.mean[slot]) ** 2).sum(axis=0)
+
+    def std(self) -> np.ndarray:
+        # Desviación muestral (ddof=1) como en machine_features; NaN con menos de 2 lecturas
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.sqrt(np.clip(self.m2, 0, None) / (self.count - 1)[:, None])
+
+class OnlineFeatureState:
+    """
+    Estado de features en memoria actualizado lectura a lectura, en tiempo constante.
+
+    Todo vive en arrays numpy indexados por 'slot' (un slot por machineID):
+    - ring:   últimas LONG_WINDOW lecturas de cada sensor (slots, 24, 4) y su posición de escritura.
+    - short/long: media y varianza de las últimas 3 y 24 lecturas (Welford deslizante).
+    - total:  media y varianza de toda la historia vista (Welford clásico), útil para normalizar.
+    - errores: conteos por hora en un ring de LONG_WINDOW horas (slots, 24, errores) con la hora de
+      cada bucket; la suma de los buckets de las últimas 24h es el mismo conteo de ventana que
+      machine_features. Además, cuántos de cada tipo se aplicaron en el último instante visto (para
+      no repetirlos al ponerse al día).
+    - reemplazos: epoch del último reemplazo de cada componente.
+
+    Los nombres de las features coinciden con las columnas de machine_features.
+    Es seguro entre hilos (un lock para escrituras y lecturas).
+    """
+
+    def __init__(self, capacity: int = 128):
+        self.slot_of: dict[int, int] = {}
+        self.machine_ids = np.zeros(0, dtype=np.int64)
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        n_sensors = len(SENSORS)
+        self.ring = np.full((capacity, LONG_WINDOW, n_sensors), np.nan)
+        self.ring_pos = np.zeros(capacity, dtype=np.int64)
+        self.ring_len = np.zeros(capacity, dtype=np.int64)
+        self.last_seen = np.zeros(capacity, dtype=np.int64)
+        self.short = WindowStats(capacity, n_sensors)
+        self.long = WindowStats(capacity, n_sensors)
+        self.total = WindowStats(capacity, n_sensors)
+        self.error_counts = np.zeros((capacity, LONG_WINDOW, len(ERROR_IDS)), dtype=np.int64)
+        self.error_hours = np.full((capacity, LONG_WINDOW), -1, dtype=np.int64)
+        self.error_seen = np.zeros(capacity, dtype=np.int64)
+        self.error_at_seen = np.zeros((capacity, len(ERROR_IDS)), dtype=np.int64)
+        self.replaced_at = np.full((capacity, len(COMPONENTS)), -1, dtype=np.int64)
+
+    def _grow(self):
+        capacity = len(self.ring_pos) * 2
+        extra = capacity - len(self.ring_pos)
+        self.ring = np.concatenate([self.ring, np.full((extra,) + self.ring.shape[1:], np.nan)])
+        self.ring_pos = np.concatenate([self.ring_pos, np.zeros(extra, dtype=np.int64)])
+        self.ring_len = np.concatenate([self.ring_len, np.zeros(extra, dtype=np.int64)])
+        self.last_seen = np.concatenate([self.last_seen, np.zeros(extra, dtype=np.int64)])
+        for stats in (self.short, self.long, self.total):
+            stats.grow(capacity)
+        self.error_counts = np.concatenate([self.error_counts, np.zeros((extra,) + self.error_counts.shape[1:], dtype=np.int64)])
+        self.error_hours = np.vstack([self.error_hours, np.full((extra, LONG_WINDOW), -1, dtype=np.int64)])
+        self.error_seen = np.concatenate([self.error_seen, np.zeros(extra, dtype=np.int64)])
+        self.error_at_seen = np.vstack([self.error_at_seen, np.zeros((extra, len(ERROR_IDS)), dtype=np.int64)])
+        self.replaced_at = np.vstack([self.replaced_at, np.full((extra, len(COMPONENTS)), -1, dtype=np.int64)])
+
+    def _slot(self, machine_id: int) -> int:
+        slot = self.slot_of.get(machine_id)
+        if slot is None:
+            slot = len(self.slot_of)
+            if slot >= len(self.ring_pos):
+                self._grow()
+            self.slot_of[machine_id] = slot
+            self.machine_ids = np.append(self.machine_ids, machine_id)
+        return slot
+
+    def _window(self, slot: int, size: int) -> np.ndarray:
+        """Últimas 'size' lecturas del ring en orden cronológico."""
+        n = min(size, self.ring_len[slot])
+        idx = (self.ring_pos[slot] - n + np.arange(n)) % LONG_WINDOW
+        return self.ring[slot, idx]
+
+    # --- Actualizaciones O(1) ---
+    def update(self, machine_id: int, at: datetime | int, values) -> None:
+        """Aplica una lectura (volt, rotate, pressure, vibration). Lecturas fuera de orden se ignoran."""
+        ts = at if isinstance(at, (int, np.integer)) else to_epoch(at)
+        x = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            slot = self._slot(machine_id)
+            if self.ring_len[slot] and ts <= self.last_seen[slot]:
+                return
+            if self.ring_len[slot] and ts - self.last_seen[slot] > MAX_GAP_SECONDS:
+                # Corte en la serie: las ventanas ya no representan las últimas 24h
+                self.ring_len[slot] = 0
+                self.short.reset(slot)
+                self.long.reset(slot)
+
+            pos = self.ring_pos[slot]
+            if self.ring_len[slot] >= SHORT_WINDOW:
+                self.short.remove(slot, self.ring[slot, (pos - SHORT_WINDOW) % LONG_WINDOW])
+            if self.ring_len[slot] == LONG_WINDOW:
+                self.long.remove(slot, self.ring[slot, pos])
+
+            self.ring[slot, pos] = x
+            self.ring_pos[slot] = (pos + 1) % LONG_WINDOW
+            self.ring_len[slot] = min(self.ring_len[slot] + 1, LONG_WINDOW)
+            self.short.add(slot, x)
+            self.long.add(slot, x)
+            self.total.add(slot, x)
+            self.last_seen[slot] = ts
+
+            if self.ring_pos[slot] == 0:
+                # Vuelta completa del ring: resincroniza las ventanas desde el buffer
+                self.long.reset(slot, self._window(slot, LONG_WINDOW))
+                self.short.reset(slot, self._window(slot, SHORT_WINDOW))
+
+    def record_error(self, machine_id: int, at: datetime | int, error_id: str) -> None:
+        ts = at if isinstance(at, (int, np.integer)) else to_epoch(at)
+        column = ERROR_IDS.index(error_id)
+        with self._lock:
+            slot = self._slot(machine_id)
+            if ts > self.error_seen[slot]:
+                self.error_at_seen[slot] = 0
+            if ts >= self.error_seen[slot]:
+                self.error_at_seen[slot, column] += 1
+            self.error_seen[slot] = max(self.error_seen[slot], ts)
+
+            hour = ts // 3600
+            bucket = hour % LONG_WINDOW
+            if hour < self.error_hours[slot, bucket]:
+                return  # el bucket ya es de una hora posterior: el error quedó fuera de toda ventana futura
+            if hour > self.error_hours[slot, bucket]:
+                self.error_counts[slot, bucket] = 0
+                self.error_hours[slot, bucket] = hour
+            self.error_counts[slot, bucket, column] += 1
+
+    def record_replacement(self, machine_id: int, at: datetime | int, comp: str) -> None:
+        ts = at if isinstance(at, (int, np.integer)) else to_epoch(at)
+        with self._lock:
+            slot = self._slot(machine_id)
+            column = COMPONENTS.index(comp)
+            self.replaced_at[slot, column] = max(self.replaced_at[slot, column], ts)
+
+    # --- Lecturas ---
+    def feature_frame(self, machine_ids: list[int] | None = None) -> pl.DataFrame:
+        """Features actuales de las máquinas pedidas (todas por defecto), calculadas sobre los arrays completos."""
+        with self._lock:
+            n = len(self.slot_of)
+            slots = np.arange(n) if machine_ids is None else np.array([self.slot_of[m] for m in machine_ids if m in self.slot_of], dtype=np.int64)
+            # Máquinas con eventos pero todavía sin lecturas no tienen features
+            slots = slots[self.ring_len[slots] > 0]
+            at = self.last_seen[slots]
+            # Errores de las 24h que terminan en la última lectura de cada máquina: horas (at - 24h, at]
+            hours = self.error_hours[slots]
+            now = (at // 3600)[:, None]
+            in_window = (hours > now - LONG_WINDOW) & (hours <= now)
+            error_counts = (self.error_counts[slots] * in_window[:, :, None]).sum(axis=1)
+            columns = {
+                "machineID": self.machine_ids[slots],
+                "datetime": at.astype("datetime64[s]").astype("datetime64[us]"),
+            }
+            short_mean, short_sd = self.short.mean[slots], self.short.std()[slots]
+            long_mean, long_sd = self.long.mean[slots], self.long.std()[slots]
+            for i, s in enumerate(SENSORS):
+                columns[f"{s}_mean_3h"] = short_mean[:, i]
+                columns[f"{s}_sd_3h"] = short_sd[:, i]
+                columns[f"{s}_mean_24h"] = long_mean[:, i]
+                columns[f"{s}_sd_24h"] = long_sd[:, i]
+            for i, e in enumerate(ERROR_IDS):
+                columns[f"{e}_count_24h"] = error_counts[:, i]
+            for i, c in enumerate(COMPONENTS):
+                replaced = self.replaced_at[slots, i]
+                columns[f"{c}_hours_since_replacement"] = np.where(replaced >= 0, (at - replaced) / 3600, np.nan)
+        return pl.DataFrame(columns).fill_nan(None)
+
+    def stats(self) -> dict:
+        return {
+            "machines": len(self.slot_of),
+            "capacity": len(self.ring_pos),
+            "bytes": sum(a.nbytes for a in self._arrays().values()),
+        }
+
+    # --- Snapshot y arranque en caliente ---
+    def _arrays(self) -> dict[str, np.ndarray]:
+        arrays = {
+            "machine_ids": self.machine_ids, "ring": self.ring, "ring_pos": self.ring_pos, "ring_len": self.ring_len,
+            "last_seen": self.last_seen, "error_counts": self.error_counts,
+            "error_hours": self.error_hours, "error_seen": self.error_seen,
+            "error_at_seen": self.error_at_seen, "replaced_at": self.replaced_at,
+        }
+        for name in ("short", "long", "total"):
+            stats = getattr(self, name)
+            arrays.update({f"{name}_count": stats.count, f"{name}_mean": stats.mean, f"{name}_m2": stats.m2})
+        return arrays
+
+    def save(self, path: Path | None = None) -> Path:
+        """Guarda el estado completo en un .npz (escritura atómica: archivo temporal + rename)."""
+        path = Path(path or settings.ONLINE_SNAPSHOT_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        with self._lock:
+            np.savez_compressed(tmp, format=SNAPSHOT_FORMAT, **self._arrays())
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "OnlineFeatureState":
+        path = Path(path or settings.ONLINE_SNAPSHOT_PATH)
+        data = np.load(path)
+        if "format" not in data.files or int(data["format"]) != SNAPSHOT_FORMAT:
+            raise ValueError(f"Snapshot {path} con otro formato (se esperaba {SNAPSHOT_FORMAT}).")
+        state = cls(capacity=max(len(data["ring_pos"]), 1))
+        for name in ("ring", "ring_pos", "ring_len", "last_seen", "error_counts", "error_hours", "error_seen", "error_at_seen", "replaced_at", "machine_ids"):
+            setattr(state, name, data[name])
+        for name in ("short", "long", "total"):
+            stats = getattr(state, name)
+            stats.count, stats.mean, stats.m2 = data[f"{name}_count"], data[f"{name}_mean"], data[f"{name}_m2"]
+        state.slot_of = {int(m): i for i, m in enumerate(state.machine_ids)}
+        return state
+
+    def synced_until(self) -> datetime | None:
+        """Lectura más antigua entre las últimas de cada máquina: desde ahí hay que ponerse al día."""
+        seen = self.last_seen[: len(self.slot_of)]
+        seen = seen[seen > 0]
+        if not len(seen):
+            return None
+        return np.datetime64(int(seen.min()), "s").astype(datetime)
+
+    def replay(self, since: datetime | None = None, hours: int | None = None, bind: Engine = job_engine) -> int:
+        """
+        Aplica la telemetría y los errores leídos de la DB, más el último reemplazo de cada componente.
+
+        - since: todo lo posterior a esa fecha (ponerse al día tras cargar un snapshot).
+        - hours: las últimas 'hours' horas de cada máquina según su marca de agua de ingesta
+          (arranque en caliente; así una máquina que dejó de reportar también queda cargada).
+
+        Sólo recorre esos rangos (índices por datetime), nunca la historia completa.
+        """
+        wm = IngestionWatermark.__table__
+        latest = (
+            select(wm.c.machineID, wm.c.last_datetime)
+            .where(wm.c.table_name == Telemetry.__tablename__)
+            .subquery("latest")
+        )
+
+        with bind.connect() as conn:
+            def after(model, *columns):
+                query = select(model.machineID, model.datetime, *columns)
+                if hours is not None:
+                    query = query.join(latest, latest.c.machineID == model.machineID).where(
+                        model.datetime > latest.c.last_datetime - timedelta(hours=hours)
+                    )
+                elif since is not None:
+                    query = query.where(model.datetime > since)
+                return conn.execute(query.order_by(model.datetime)).all()
+
+            readings = after(Telemetry, *[getattr(Telemetry, s) for s in SENSORS])
+            errors = after(Error, Error.errorID)
+            # Para "horas desde el último reemplazo" hace falta el último de cada componente, no sólo los recientes
+            replacements = conn.execute(
+                select(Maintenance.machineID, func.max(Maintenance.datetime), Maintenance.comp)
+                .group_by(Maintenance.machineID, Maintenance.comp)
+            ).all()
+
+        for machine_id, at, comp in replacements:
+            self.record_replacement(machine_id, at, comp)
+        # Errores y lecturas intercalados en orden temporal (los buckets por hora dependen del orden)
+        events = sorted(
+            [(at, 0, machine_id, values) for machine_id, at, *values in readings]
+            + [(at, 1, machine_id, error_id) for machine_id, at, error_id in errors],
+            key=lambda event: (event[0], event[1]),
+        )
+        # Un snapshot se pone al día desde la máquina más atrasada: los errores anteriores al último
+        # visto de cada máquina ya están aplicados, y en ese mismo instante sólo los ya contados
+        # (puede haber varios errores de una máquina en la misma hora)
+        seen, pending = self.error_seen.copy(), self.error_at_seen.copy()
+        for at, kind, machine_id, payload in events:
+            if kind == 0:
+                if None not in payload:
+                    self.update(machine_id, at, payload)
+                continue
+            slot, ts = self.slot_of.get(machine_id), to_epoch(at)
+            if slot is not None and slot < len(seen) and ts <= seen[slot]:
+                if ts < seen[slot]:
+                    continue
+                column = ERROR_IDS.index(payload)
+                if pending[slot, column] > 0:
+                    pending[slot, column] -= 1
+                    continue
+            self.record_error(machine_id, at, payload)
+        return len(readings)
+
+    @classmethod
+    def warm_start(cls, hours: int | None = None, bind: Engine = job_engine) -> "OnlineFeatureState":
+        """Estado nuevo alimentado con las últimas 'hours' horas de la DB (no toda la historia)."""
+        hours = hours or settings.ONLINE_WARMUP_HOURS
+        state = cls()
+        with bind.connect() as conn:
+            has_watermarks = conn.execute(
+                select(IngestionWatermark.machineID).where(IngestionWatermark.table_name == Telemetry.__tablename__).limit(1)
+            ).first() is not None
+            latest = conn.execute(select(func.max(Telemetry.datetime))).scalar()
+
+        if has_watermarks:
+            state.replay(hours=hours, bind=bind)
+        elif latest is not None:
+            # Sin marcas de ingesta (datos cargados por otra vía): últimas horas globales
+            state.replay(since=latest - timedelta(hours=hours), bind=bind)
+        return state
+
+    @classmethod
+    def restore(cls, path: Path | None = None, bind: Engine = job_engine) -> "OnlineFeatureState":
+        """Snapshot + lo ingerido después de él; si no hay snapshot, arranque en caliente."""
+        path = Path(path or settings.ONLINE_SNAPSHOT_PATH)
+        if not path.exists():
+            logger.info("🌡 Sin snapshot de features online: arranque en caliente desde la DB.")
+            return cls.warm_start(bind=bind)
+        try:
+            state = cls.load(path)
+        except ValueError as e:
+            logger.warning(f"⚠️ {e} Arranque en caliente desde la DB.")
+            return cls.warm_start(bind=bind)
+        since = state.synced_until()
+        if since is None:
+            return cls.warm_start(bind=bind)
+        caught_up = state.replay(since=since, bind=bind)
+        logger.info(f"🌡 Snapshot {path} cargado ({len(state.slot_of)} máquinas, {caught_up} lecturas nuevas aplicadas).")
+        return state
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Estado online de features (snapshot / arranque en caliente).")
+    parser.add_argument("--hours", type=int, default=None, help="Horas de historia para el arranque en caliente.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    state = OnlineFeatureState.warm_start(hours=args.hours)
+    path = state.save()
+    print(f"✅ Snapshot de {state.stats()['machines']} máquinas guardado en {path} ({time.perf_counter() - start:.1f}s).")
@@ -0,0 +1,223 @@
+# src/services/parquet_lake.py
+import argparse
+import logging
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Iterator
+import polars as pl
+from sqlalchemy import select
+
+from src.core.config import settings
+from src.database.session import job_engine
+from src.models.error import Error
+from src.models.failure import Failure
+from src.models.machine import Machine
+from src.models.maintenance import Maintenance
+from src.models.telemetry import Telemetry
+from src.services.columnar_export import export_columns, polars_schema
+from src.services.csv_sources import CSV_SOURCES, scan_source
+
+logger = logging.getLogger(__name__)
+
+# Tablas del lago (directorio -> modelo). Las que tienen 'datetime' se particionan por año/mes (estilo Hive)
+LAKE_TABLES = {
+    "machines": Machine,
+    "telemetry": Telemetry,
+    "errors": Error,
+    "failures": Failure,
+    "maint": Maintenance,
+}
+PARTITION_COLUMNS = ["year", "month"]
+# Archivo con la generación publicada: cada materialización escribe un directorio nuevo y lo publica al final
+CURRENT_FILE = "CURRENT"
+# Filas por lote al leer de PostgreSQL (cada lote se escribe como un archivo por partición)
+EXPORT_BATCH_ROWS = 500_000
+# Filas por row group: dentro de cada mes los datos van ordenados por (machineID, datetime), así las
+# estadísticas de cada row group permiten saltar las otras máquinas al leer la historia de una
+ROW_GROUP_ROWS = 16_384
+
+SENSORS = ["volt", "rotate", "pressure", "vibration"]
+# Grano -> intervalo de dt.truncate ('1w' trunca al lunes, igual que date_trunc('week') en PostgreSQL)
+GRAINS = {"daily": "1d", "weekly": "1w"}
+
+def lake_version() -> int:
+    """Generación publicada del lago (0 si nunca se materializó): hace de versión de datos del modo parquet."""
+    try:
+        return int((settings.PARQUET_PATH / CURRENT_FILE).read_text())
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def generation_path(version: int) -> Path:
+    return settings.PARQUET_PATH / f"gen-{version:06d}"
+
+def scan(table: str) -> pl.LazyFrame:
+    """LazyFrame de una tabla de la generación publicada (con 'year'/'month' si está particionada)."""
+    version = lake_version()
+    if not version:
+        raise FileNotFoundError(
+            f"No hay datos en {settings.PARQUET_PATH}: ejecute 'python -m src.services.parquet_lake' para materializarlos."
+        )
+    path = generation_path(version) / table
+    if "datetime" in LAKE_TABLES[table].__table__.columns:
+        return pl.scan_parquet(path / "**" / "*.parquet", hive_partitioning=True)
+    return pl.scan_parquet(path / "*.parquet")
+
+def month_filter(start: datetime | None, end: datetime | None) -> pl.Expr:
+    """Predicado sobre las columnas de partición: sólo se abren los meses que tocan [start, end)."""
+    year, month = pl.col("year"), pl.col("month")
+    condition = pl.lit(True)
+    if start is not None:
+        condition &= (year > start.year) | ((year == start.year) & (month >= start.month))
+    if end is not None:
+        condition &= (year < end.year) | ((year == end.year) & (month <= end.month))
+    return condition
+
+# --- Materialización ---
+def postgres_batches(model, bind=job_engine) -> Iterator[pl.DataFrame]:
+    """Tabla completa desde PostgreSQL en lotes (cursor de servidor: la memoria no depende del tamaño)."""
+    columns = export_columns(model)
+    query = select(*[model.__table__.c[c] for c in columns])
+    if "datetime" in columns:
+        query = query.order_by(model.machineID, model.datetime)
+    with bind.connect().execution_options(stream_results=True) as conn:
+        yield from pl.read_database(
+            query, connection=conn, iter_batches=True, batch_size=EXPORT_BATCH_ROWS,
+            schema_overrides=polars_schema(model, columns),
+        )
+
+def csv_batches(model, data_path: Path | None = None) -> Iterator[pl.DataFrame]:
+    """
+    Tabla desde los PdM_*.csv (sin PostgreSQL). Los eventos no traen 'id' en el CSV: se numeran
+    en el orden de los archivos, el mismo en que la ingesta los inserta en una base vacía.
+    """
+    data_path = data_path or settings.DATA_PATH
+    pattern = next(p for p, (m, _) in CSV_SOURCES.items() if m is model)
+    paths = sorted(data_path.glob(pattern))
+    if not paths:
+        logger.warning(f"⚠️ No hay archivos {pattern} en {data_path}")
+        return
+    lf = scan_source(paths, model)
+    columns = export_columns(model)
+    if "id" in columns and "id" not in lf.collect_schema().names():
+        lf = lf.with_row_index("id", offset=1)
+    df = lf.select(columns).cast(polars_schema(model, columns)).collect()
+    yield df.sort("machineID", "datetime") if "datetime" in columns else df
+
+def write_table(path: Path, batches: Iterator[pl.DataFrame]) -> int:
+    """Escribe los lotes bajo 'path' (year=YYYY/month=M/part-NNNNN.parquet si hay 'datetime'); devuelve filas."""
+    path.mkdir(parents=True)
+    rows = 0
+    for i, batch in enumerate(batches):
+        rows += batch.height
+        if "datetime" not in batch.columns:
+            batch.write_parquet(path / f"part-{i:05d}.parquet")
+            continue
+        batch = batch.with_columns(year=pl.col("datetime").dt.year(), month=pl.col("datetime").dt.month())
+        for (year, month), part in batch.partition_by(PARTITION_COLUMNS, as_dict=True, maintain_order=True).items():
+            folder = path / f"year={year}" / f"month={month}"
+            folder.mkdir(parents=True, exist_ok=True)
+            part.drop(PARTITION_COLUMNS).write_parquet(folder / f"part-{i:05d}.parquet", row_group_size=ROW_GROUP_ROWS)
+    return rows
+
+def materialize(source: str = "postgres", bind=job_engine, data_path: Path | None = None) -> dict[str, int]:
+    """
+    Escribe una generación nueva del lago con todas las tablas y la publica al final.
+
+    La publicación es un reemplazo atómico del archivo CURRENT: los lectores ven la generación
+    anterior completa o la nueva completa, nunca una a medias. Se conserva la generación anterior
+    (consultas en curso) y se borran las más viejas.
+    """
+    if source not in ("postgres", "csv"):
+        raise ValueError(f"Origen desconocido: {source} (use 'postgres' o 'csv')")
+    previous = lake_version()
+    version = previous + 1
+    target = generation_path(version)
+    if target.exists():
+        shutil.rmtree(target)  # restos de una materialización interrumpida
+
+    written = {}
+    for table, model in LAKE_TABLES.items():
+        batches = postgres_batches(model, bind) if source == "postgres" else csv_batches(model, data_path)
+        written[table] = write_table(target / table, batches)
+        logger.info(f"📦 {table}: {written[table]:,} filas")
+
+    pending = settings.PARQUET_PATH / f"{CURRENT_FILE}.tmp"
+    pending.write_text(str(version))
+    os.replace(pending, settings.PARQUET_PATH / CURRENT_FILE)
+    for old in settings.PARQUET_PATH.glob("gen-*"):
+        if old.name not in (target.name, generation_path(previous).name):
+            shutil.rmtree(old, ignore_errors=True)
+    return written
+
+# --- Consultas ---
+def machine_ids_and_models() -> pl.DataFrame:
+    return scan("machines").select("machineID", "model").sort("machineID").collect()
+
+def machine_info(machine_id: int) -> dict | None:
+    rows = scan("machines").filter(pl.col("machineID") == machine_id).select("model", "age").collect()
+    return rows.row(0, named=True) if rows.height else None
+
+def latest_events(table: str, machine_id: int, columns: list[str], limit: int = 10) -> list[dict]:
+    """Los 'limit' eventos más recientes de una máquina (más nuevo primero)."""
+    return (
+        scan(table).filter(pl.col("machineID") == machine_id)
+        .select("datetime", *columns).sort("datetime", descending=True).head(limit)
+        .collect().to_dicts()
+    )
+
+def telemetry_span(machine_id: int) -> tuple[datetime | None, datetime | None]:
+    """Primer y último día con telemetría de una máquina (como rollup_span)."""
+    span = (
+        scan("telemetry").filter(pl.col("machineID") == machine_id)
+        .select(pl.col("datetime").min().dt.truncate("1d").alias("first"), pl.col("datetime").max().dt.truncate("1d").alias("last"))
+        .collect()
+    )
+    return span["first"][0], span["last"][0]
+
+def machine_telemetry(machine_id: int, start: datetime | None = None, end: datetime | None = None) -> pl.LazyFrame:
+    """Telemetría cruda de una máquina en [start, end): poda por partición y por estadísticas de row group."""
+    lf = scan("telemetry").filter(month_filter(start, end), pl.col("machineID") == machine_id)
+    if start is not None:
+        lf = lf.filter(pl.col("datetime") >= start)
+    if end is not None:
+        lf = lf.filter(pl.col("datetime") < end)
+    return lf.select("datetime", *SENSORS).sort("datetime")
+
+def telemetry_buckets(machine_id: int, grain: str = "daily",
+                      start: datetime | None = None, end: datetime | None = None) -> pl.DataFrame:
+    """Agregado por bucket calculado al vuelo, con las mismas columnas que rollup_series."""
+    aggregates = []
+    for s in SENSORS:
+        aggregates += [
+            pl.col(s).mean().alias(f"{s}_mean"),
+            pl.col(s).min().alias(f"{s}_min"),
+            pl.col(s).max().alias(f"{s}_max"),
+            pl.col(s).std().alias(f"{s}_std"),
+            pl.col(s).count().cast(pl.Int64).alias(f"{s}_count"),
+        ]
+    # Como en los rollups, entran los buckets que empiezan en [start, end) completos (una semana puede empezar antes)
+    lf = scan("telemetry").filter(
+        month_filter(start - timedelta(days=7) if start else None, end), pl.col("machineID") == machine_id
+    )
+    bucket = pl.col("datetime").dt.truncate(GRAINS[grain]).alias("bucket")
+    buckets = lf.group_by(bucket).agg(pl.len().cast(pl.Int64).alias("samples"), *aggregates)
+    if start is not None:
+        buckets = buckets.filter(pl.col("bucket") >= start)
+    if end is not None:
+        buckets = buckets.filter(pl.col("bucket") < end)
+    return buckets.sort("bucket").collect()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Materializa las tablas en Parquet particionado para ANALYTICS_BACKEND=parquet.")
+    parser.add_argument("--source", choices=["postgres", "csv"], default="postgres",
+                        help="'csv' lee los PdM_*.csv de DATA_PATH y no necesita PostgreSQL.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = materialize(args.source)
+    print(f"✅ Lago Parquet v{lake_version()} en {settings.PARQUET_PATH} ({time.perf_counter() - start:.1f}s): "
+          + ", ".join(f"{name} {n:,}" for name, n in rows.items()))
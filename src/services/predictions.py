@@ -0,0 +1,25 @@
+# src/services/predictions.py
+from sqlalchemy import select
+
+from src.database.session import read_engine
+from src.models.prediction import FailurePrediction
+from src.services.query_cache import query_cache
+
+# Lecturas de los riesgos que escribe src/services/scoring.py, separadas del modelo: la API y el
+# dashboard las usan en cada request y así no cargan numpy ni el pipeline de features al arrancar.
+
+def load_predictions() -> dict[int, list[dict]]:
+    """Todos los riesgos vigentes agrupados por máquina (un dict en memoria para búsquedas O(1))."""
+    p = FailurePrediction.__table__
+    with read_engine.connect() as conn:
+        rows = conn.execute(
+            select(p.c.machineID, p.c.comp, p.c.risk, p.c.features_at, p.c.model_version).order_by(p.c.machineID, p.c.comp)
+        ).mappings().all()
+    by_machine: dict[int, list[dict]] = {}
+    for row in rows:
+        by_machine.setdefault(row["machineID"], []).append(dict(row))
+    return by_machine
+
+def cached_predictions() -> dict[int, list[dict]]:
+    # Se invalida con la versión de datos que sube score_fleet
+    return query_cache.get_or_load(("failure_predictions",), load_predictions)
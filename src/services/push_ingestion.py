@@ -0,0 +1,236 @@
+# src/services/push_ingestion.py
+import asyncio
+import io
+import logging
+import time
+import polars as pl
+from sqlalchemy import Engine, select
+
+from src.analysis.telemetry_rollups import refresh_rollups, touched_windows
+from src.core.config import settings
+from src.database.bulk_copy import upsert_frame
+from src.database.partitions import ensure_partitions, month_start
+from src.database.session import engine
+from src.models.machine import Machine
+from src.models.telemetry import Telemetry
+from src.database.watermarks import advance_watermarks
+from src.services.query_cache import TELEMETRY_SCOPE, bump_data_version
+
+logger = logging.getLogger(__name__)
+
+# Columnas (y tipos) que aceptamos de los gateways: las mismas de la tabla 'telemetry'
+PUSH_SCHEMA = {
+    "datetime": pl.Datetime("us"),
+    "machineID": pl.Int64,
+    "volt": pl.Float64,
+    "rotate": pl.Float64,
+    "pressure": pl.Float64,
+    "vibration": pl.Float64,
+}
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def parse_readings(body: bytes, content_type: str) -> pl.DataFrame:
+    """
+    Lote de lecturas (JSON: lista de objetos; Arrow: stream IPC) -> frame con PUSH_SCHEMA.
+
+    Lanza ValueError si faltan columnas o la clave (datetime, machineID) viene vacía.
+    """
+    if content_type.startswith(ARROW_MEDIA_TYPE):
+        df = pl.read_ipc_stream(io.BytesIO(body))
+    else:
+        df = pl.read_json(io.BytesIO(body), infer_schema_length=None)
+
+    missing = [c for c in PUSH_SCHEMA if c not in df.columns]
+    if missing:
+        raise ValueError(f"Faltan columnas: {', '.join(missing)}")
+    if df.schema["datetime"] == pl.String:
+        df = df.with_columns(pl.col("datetime").str.to_datetime(time_unit="us"))
+    df = df.select([pl.col(c).cast(dtype) for c, dtype in PUSH_SCHEMA.items()])
+    if df.select(pl.col("datetime", "machineID").null_count()).sum_horizontal().item():
+        raise ValueError("'datetime' y 'machineID' son obligatorios en todas las lecturas.")
+    return df
+
+def write_telemetry_batch(batch: pl.DataFrame, bind: Engine = engine) -> tuple[int, int]:
+    """
+    Escribe un lote acumulado en una sola transacción: upsert (COPY + ON CONFLICT), marcas de agua,
+    rollups de los buckets tocados y versión de datos, igual que un lote de la ingesta de CSV. La
+    versión que sube es la de TELEMETRY_SCOPE: un vaciado por segundo no vacía las cachés de KPIs
+    ni de eventos, sólo las de telemetría.
+
+    Las lecturas de máquinas inexistentes se descartan (romperían la FK del lote entero).
+    Devuelve (filas escritas, filas descartadas).
+    """
+    if settings.TELEMETRY_PARTITIONING:
+        months = batch.select(pl.col("datetime").dt.truncate("1mo").unique())["datetime"]
+        ensure_partitions({month_start(m) for m in months}, bind=bind)
+
+    with bind.begin() as conn:
+        ids = batch["machineID"].unique().to_list()
+        known = conn.execute(select(Machine.machineID).where(Machine.machineID.in_(ids))).scalars().all()
+        valid = batch.filter(pl.col("machineID").is_in(known))
+        if valid.is_empty():
+            return 0, batch.height
+
+        written = upsert_frame(conn, Telemetry.__table__, valid)
+        advance_watermarks(conn, Telemetry.__tablename__, valid)
+        refresh_rollups(conn, touched_windows(valid))
+        if written:
+            bump_data_version(conn, TELEMETRY_SCOPE)
+    return written, batch.height - valid.height
+
+class TelemetryBuffer:
+    """
+    Buffer en memoria de lecturas empujadas por la API, vaciado a 'telemetry' por micro-lotes.
+
+    - Se vacía al llegar a 'flush_rows' filas o cada 'flush_seconds', lo que ocurra primero;
+      cada vaciado es un único COPY + upsert en una transacción (nunca una por lectura).
+    - Es acotado: si aceptar un lote superaría 'max_rows' pendientes (incluido el lote que se está
+      escribiendo), offer() lo rechaza y la API responde 429 para que el gateway reintente.
+    - Un vaciado que falla no pierde las lecturas (ya respondidas con 202): el lote vuelve al frente
+      de la cola, sigue contando para 'max_rows' y se reintenta con backoff exponencial. Mientras
+      tanto, con la cola llena la API responde 503. Tras 'retry_attempts' fallos seguidos el lote se
+      descarta y recién ahí cuenta como 'failed'.
+    - La escritura corre en un hilo (psycopg2 + COPY) para no bloquear el event loop.
+    """
+
+    def __init__(self, flush_rows: int, flush_seconds: float, max_rows: int, bind: Engine = engine,
+                 retry_attempts: int = 5, retry_base_seconds: float = 0.5, retry_max_seconds: float = 10.0):
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_rows = max_rows
+        self.bind = bind
+        self.retry_attempts = retry_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self._frames: list[pl.DataFrame] = []
+        self._pending = 0
+        self._in_flight = 0
+        self._failures = 0
+        self._retry_at = 0.0
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._counters = {"accepted": 0, "flushed": 0, "dropped": 0, "rejected": 0, "failed": 0, "retries": 0, "flushes": 0}
+        self._last_flush_seconds = 0.0
+
+    @property
+    def queued(self) -> int:
+        return self._pending + self._in_flight
+
+    @property
+    def retrying(self) -> bool:
+        """True si el último vaciado falló y hay un lote esperando su reintento."""
+        return self._failures > 0
+
+    @property
+    def retry_in(self) -> float:
+        """Segundos hasta el próximo reintento (0 si no hay ninguno pendiente)."""
+        return max(0.0, self._retry_at - time.monotonic()) if self.retrying else 0.0
+
+    def offer(self, readings: pl.DataFrame) -> bool:
+        """Encola un lote completo o ninguna fila (False = buffer lleno)."""
+        if self.queued + readings.height > self.max_rows:
+            self._counters["dropped"] += readings.height
+            return False
+        self._frames.append(readings)
+        self._pending += readings.height
+        self._counters["accepted"] += readings.height
+        if self._pending >= self.flush_rows:
+            self._wakeup.set()
+        return True
+
+    async def flush(self) -> int:
+        """Escribe todo lo pendiente en un solo lote. Devuelve las filas escritas."""
+        async with self._flush_lock:
+            if not self._frames:
+                return 0
+            frames, self._frames = self._frames, []
+            batch = pl.concat(frames)
+            self._pending, self._in_flight = 0, batch.height
+            start = time.perf_counter()
+            try:
+                written, rejected = await asyncio.to_thread(write_telemetry_batch, batch, self.bind)
+            except Exception as e:
+                self._in_flight = 0
+                self._requeue(batch, e)
+                return 0
+            self._in_flight = 0
+            self._failures = 0
+            self._last_flush_seconds = time.perf_counter() - start
+            self._counters["flushed"] += written
+            self._counters["rejected"] += rejected
+            self._counters["flushes"] += 1
+            if rejected:
+                logger.warning(f"⚠️ {rejected} lecturas descartadas: machineID inexistente.")
+            logger.debug(f"📦 Push: {written} lecturas escritas en {self._last_flush_seconds * 1000:.0f} ms.")
+            return written
+
+    def _requeue(self, batch: pl.DataFrame, error: Exception):
+        """Devuelve un lote fallido al frente de la cola y programa su reintento, o lo descarta si ya no quedan."""
+        self._failures += 1
+        if self._failures > self.retry_attempts:
+            # Recién ahora se pierde: lo contamos para que se vea en /api/v1/ingest/stats
+            self._failures = 0
+            self._counters["failed"] += batch.height
+            logger.error(f"❌ {batch.height} lecturas empujadas descartadas tras {self.retry_attempts} reintentos: {error}")
+            return
+        self._frames.insert(0, batch)
+        self._pending += batch.height
+        delay = min(self.retry_base_seconds * 2 ** (self._failures - 1), self.retry_max_seconds)
+        self._retry_at = time.monotonic() + delay
+        self._counters["retries"] += 1
+        logger.warning(f"⚠️ Error escribiendo {batch.height} lecturas empujadas (intento {self._failures}), reintento en {delay:.1f}s: {error}")
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(self.flush_seconds, self.retry_in))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self.retry_in > 0:
+                # En backoff: los lotes nuevos se acumulan (hasta max_rows) y van con el reintento
+                continue
+            await self.flush()
+            if self._pending >= self.flush_rows:
+                # Llegó otro lote completo mientras escribíamos
+                self._wakeup.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            # Primitivas nuevas en el loop actual (asyncio las ata al loop donde se usan por primera vez)
+            self._wakeup = asyncio.Event()
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Detiene el vaciado periódico y escribe lo que quede pendiente (con los mismos reintentos)."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        while self.retrying:
+            await asyncio.sleep(self.retry_in)
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queued,
+            **self._counters,
+            "last_flush_ms": round(self._last_flush_seconds * 1000, 1),
+            "max_queued": self.max_rows,
+        }
+
+# Un buffer por proceso (cada worker de uvicorn vacía el suyo)
+telemetry_buffer = TelemetryBuffer(
+    flush_rows=settings.TELEMETRY_PUSH_FLUSH_ROWS,
+    flush_seconds=settings.TELEMETRY_PUSH_FLUSH_SECONDS,
+    max_rows=settings.TELEMETRY_PUSH_MAX_QUEUED_ROWS,
+    retry_attempts=settings.TELEMETRY_PUSH_RETRY_ATTEMPTS,
+    retry_base_seconds=settings.TELEMETRY_PUSH_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.TELEMETRY_PUSH_RETRY_MAX_SECONDS,
+)
@@ -0,0 +1,153 @@
+# src/services/query_cache.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+from sqlalchemy import Connection, select
+from sqlalchemy.dialects.postgresql import insert
+
+from src.core.config import settings
+from src.database.session import read_engine
+from src.models.data_version import DataVersion
+
+logger = logging.getLogger(__name__)
+
+# Contadores de versión por alcance. Cualquier escritura (ingesta, KPIs, scoring) sube DATA_SCOPE e
+# invalida toda la caché; la ingesta push (un vaciado por segundo) sube TELEMETRY_SCOPE, que sólo
+# invalida las entradas cargadas con scope=TELEMETRY_SCOPE (telemetría cruda y rollups).
+DATA_SCOPE = "dashboard"
+TELEMETRY_SCOPE = "telemetry"
+SCOPES = (DATA_SCOPE, TELEMETRY_SCOPE)
+
+def bump_data_version(conn: Connection, scope: str = DATA_SCOPE) -> None:
+    """Sube el contador de 'scope' dentro de la transacción del escritor (se publica con su COMMIT)."""
+    DataVersion.__table__.create(conn, checkfirst=True)
+    stmt = insert(DataVersion.__table__).values(scope=scope, version=1)
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=["scope"], set_={"version": DataVersion.__table__.c.version + 1}
+    ))
+    query_cache.invalidate(scope)
+
+def read_data_versions() -> dict[str, int]:
+    if settings.ANALYTICS_BACKEND == "parquet":
+        # El lago se publica entero de una vez: su generación es la versión (import diferido: parquet_lake usa este módulo)
+        from src.services.parquet_lake import lake_version
+        return {DATA_SCOPE: lake_version()}
+    # Del mismo servidor que las lecturas cacheadas: con réplica, versión y datos llegan con el mismo retraso
+    with read_engine.connect() as conn:
+        try:
+            rows = conn.execute(select(DataVersion.scope, DataVersion.version).where(DataVersion.scope.in_(SCOPES))).all()
+        except Exception:
+            # La tabla aún no existe (create_tables no ha corrido): no hay nada que invalidar
+            return {}
+    return {scope: version for scope, version in rows}
+
+class QueryCache:
+    """
+    Caché LRU con TTL para resultados de consultas, segura entre hilos.
+
+    Cada entrada queda asociada a un alcance de versión (DATA_SCOPE por defecto). Las versiones
+    se consultan en la DB como mucho cada 'version_poll' segundos: si cambió DATA_SCOPE se vacía la
+    caché; si cambió otro alcance, sólo se descartan sus entradas. Así las vistas repetidas no tocan
+    PostgreSQL y los datos nuevos aparecen en segundos.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, version_poll: float, version_reader: Callable[[], dict[str, int]]):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version_poll = version_poll
+        self._version_reader = version_reader
+        self._entries: OrderedDict[Hashable, tuple[float, Any, str]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions: dict[str, int] | None = None
+        self._version_checked_at = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_version(self):
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_poll:
+            return
+        self._version_checked_at = now
+        versions = self._version_reader()
+        if versions != self._versions:
+            with self._lock:
+                if self._versions is not None:
+                    changed = {s for s in set(versions) | set(self._versions) if versions.get(s) != self._versions.get(s)}
+                    self._drop(DATA_SCOPE if DATA_SCOPE in changed else changed)
+                self._versions = versions
+
+    def _drop(self, scopes: str | set[str]):
+        """Vacía la caché (DATA_SCOPE) o sólo las entradas de los alcances dados. Con el lock tomado."""
+        if scopes == DATA_SCOPE:
+            self._entries.clear()
+        else:
+            for key in [k for k, entry in self._entries.items() if entry[2] in scopes]:
+                del self._entries[key]
+        self.invalidations += 1
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """(True, valor) si 'key' está vigente en la caché; (False, None) si no."""
+        self._sync_version()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+        return False, None
+
+    def put(self, key: Hashable, value: Any, ttl: float | None = None, scope: str = DATA_SCOPE):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value, scope)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    @property
+    def data_version(self) -> int | None:
+        """Versión de DATA_SCOPE vigente (releída de la DB como mucho cada 'version_poll' segundos)."""
+        self._sync_version()
+        return (self._versions or {}).get(DATA_SCOPE, 0)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: float | None = None, scope: str = DATA_SCOPE) -> Any:
+        """Devuelve el valor cacheado de 'key' o lo calcula con 'loader' y lo guarda en 'scope'."""
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = loader()
+        self.put(key, value, ttl, scope)
+        return value
+
+    def invalidate(self, scope: str = DATA_SCOPE):
+        """Vacía la caché local (o las entradas de 'scope') y fuerza a releer la versión en la próxima consulta."""
+        with self._lock:
+            self._drop(scope if scope == DATA_SCOPE else {scope})
+        self._version_checked_at = 0.0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "data_version": (self._versions or {}).get(DATA_SCOPE),
+        }
+
+# Instancia por proceso compartida por los callbacks del dashboard
+query_cache = QueryCache(
+    max_entries=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.CACHE_TTL_SECONDS,
+    version_poll=settings.CACHE_VERSION_POLL_SECONDS,
+    version_reader=read_data_versions,
+)
@@ -0,0 +1,217 @@
+# src/services/scoring.py
+import argparse
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+import numpy as np
+import polars as pl
+from sqlalchemy import Engine, select, true
+
+from src.analysis.features import COMPONENTS, feature_columns
+from src.core.config import settings
+from src.database.bulk_copy import upsert_frame
+from src.database.session import job_engine
+from src.models.failure import Failure
+from src.models.feature import MachineFeature
+from src.models.machine import Machine
+from src.models.prediction import FailurePrediction
+from src.services.query_cache import bump_data_version
+
+logger = logging.getLogger(__name__)
+
+# Columnas de machine_features que entran al modelo (todas menos la clave)
+MODEL_FEATURES = [c for c in feature_columns() if c not in ("machineID", "datetime")]
+
+class FailureModel:
+    """
+    Regresión logística multi-salida: un riesgo de falla por componente en las próximas FAILURE_HORIZON_HOURS.
+
+    Todo el modelo son unos pocos arrays (centro/escala de cada feature, pesos y sesgos), así que
+    puntuar la flota entera es una sola multiplicación de matrices.
+    """
+
+    def __init__(self, features: list[str], components: list[str], center: np.ndarray, scale: np.ndarray,
+                 weights: np.ndarray, bias: np.ndarray, version: str):
+        self.features = features
+        self.components = components
+        self.center = center
+        self.scale = scale
+        self.weights = weights
+        self.bias = bias
+        self.version = version
+
+    def standardize(self, df: pl.DataFrame) -> np.ndarray:
+        """Matriz (máquinas, features) estandarizada; los nulos se imputan con la media de entrenamiento (0)."""
+        X = df.select(self.features).cast(pl.Float64).to_numpy()
+        Z = (X - self.center) / self.scale
+        return np.nan_to_num(Z, nan=0.0)
+
+    def predict(self, df: pl.DataFrame) -> np.ndarray:
+        """Riesgos (máquinas, componentes) en [0, 1] para todas las filas de una vez."""
+        logits = self.standardize(df) @ self.weights + self.bias
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def save(self, path: Path | None = None) -> Path:
+        path = Path(path or settings.FAILURE_MODEL_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, features=np.array(self.features), components=np.array(self.components), center=self.center,
+                 scale=self.scale, weights=self.weights, bias=self.bias, version=np.array(self.version))
+        tmp.replace(path)
+        return path
+
+    @classmethod
+    def load(cls, path: Path | None = None) -> "FailureModel":
+        data = np.load(Path(path or settings.FAILURE_MODEL_PATH))
+        return cls(
+            features=data["features"].tolist(), components=data["components"].tolist(), center=data["center"],
+            scale=data["scale"], weights=data["weights"], bias=data["bias"], version=str(data["version"]),
+        )
+
+# --- Entrenamiento ---
+def label_failures(features: pl.DataFrame, failures: pl.DataFrame, horizon_hours: int) -> pl.DataFrame:
+    """Agrega una columna 0/1 por componente: ¿falla ese componente en (t, t + horizonte]?"""
+    features = features.sort("datetime")
+    for comp in COMPONENTS:
+        upcoming = (
+            failures.filter(pl.col("failure") == comp)
+            .select("machineID", pl.col("datetime").alias("next_failure"))
+            .unique()
+            .sort("next_failure")
+        )
+        features = (
+            features.join_asof(upcoming, left_on="datetime", right_on="next_failure", by="machineID",
+                               strategy="forward", tolerance=timedelta(hours=horizon_hours), check_sortedness=False)
+            .with_columns(pl.col("next_failure").is_not_null().cast(pl.Float64).alias(f"label_{comp}"))
+            .drop("next_failure")
+        )
+    return features
+
+def fit_logistic(Z: np.ndarray, Y: np.ndarray, l2: float = 1e-3, iterations: int = 500, lr: float = 0.5):
+    """
+    Descenso de gradiente por lotes completos para todas las salidas a la vez, con pesos balanceados por clase
+    (las fallas son raras: sin balancear el modelo aprende a predecir siempre 0). Al final el sesgo se
+    corrige con la prevalencia real, para que 'risk' sea una probabilidad y no un puntaje centrado en 0.5.
+    """
+    n, d = Z.shape
+    positives = Y.sum(axis=0).clip(min=1)
+    sample_weight = np.where(Y == 1, n / (2 * positives), n / (2 * (n - positives).clip(min=1)))
+    W = np.zeros((d, Y.shape[1]))
+    b = np.zeros(Y.shape[1])
+    for _ in range(iterations):
+        P = 1.0 / (1.0 + np.exp(-(Z @ W + b)))
+        G = (P - Y) * sample_weight / n
+        W -= lr * (Z.T @ G + l2 * W)
+        b -= lr * G.sum(axis=0)
+    prevalence = (positives / n).clip(1e-6, 1 - 1e-6)
+    return W, b + np.log(prevalence / (1 - prevalence))
+
+def train_model(bind: Engine = job_engine, horizon_hours: int | None = None) -> FailureModel:
+    """Entrena el modelo con toda la historia de machine_features etiquetada con las fallas reales."""
+    horizon_hours = horizon_hours or settings.FAILURE_HORIZON_HOURS
+    with bind.connect() as conn:
+        features = pl.read_database(
+            select(*[MachineFeature.__table__.c[c] for c in feature_columns()]), connection=conn, infer_schema_length=None
+        )
+        failures = pl.read_database(
+            select(Failure.machineID, Failure.datetime, Failure.failure), connection=conn,
+            schema_overrides={"machineID": pl.Int64, "datetime": pl.Datetime("us"), "failure": pl.String},
+        )
+    if features.is_empty():
+        raise ValueError("machine_features está vacía: ejecute antes python -m src.analysis.features")
+
+    labeled = label_failures(features, failures, horizon_hours)
+    X = labeled.select(MODEL_FEATURES).cast(pl.Float64).to_numpy()
+    center = np.nanmean(X, axis=0)
+    scale = np.nanstd(X, axis=0)
+    scale[~np.isfinite(scale) | (scale == 0)] = 1.0
+    center[~np.isfinite(center)] = 0.0
+    Z = np.nan_to_num((X - center) / scale, nan=0.0)
+    Y = labeled.select([f"label_{c}" for c in COMPONENTS]).to_numpy()
+
+    W, b = fit_logistic(Z, Y)
+    version = f"logreg-{horizon_hours}h-{datetime.now():%Y%m%d%H%M%S}"
+    logger.info(f"🧠 Modelo {version} entrenado con {len(Y):,} filas ({int(Y.sum()):,} positivas).")
+    return FailureModel(MODEL_FEATURES, COMPONENTS, center, scale, W, b, version)
+
+# --- Modelo cargado una vez por proceso ---
+_model: FailureModel | None = None
+_model_lock = threading.Lock()
+
+def get_model() -> FailureModel:
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = FailureModel.load()
+                logger.info(f"🧠 Modelo de riesgo {_model.version} cargado.")
+    return _model
+
+# --- Scoring de la flota ---
+def latest_features(bind: Engine = job_engine) -> pl.DataFrame:
+    """Última fila de machine_features de cada máquina (una búsqueda por PK por máquina, vía LATERAL)."""
+    f = MachineFeature.__table__
+    latest = (
+        select(*[f.c[c] for c in feature_columns()])
+        .where(f.c.machineID == Machine.machineID)
+        .order_by(f.c.datetime.desc())
+        .limit(1)
+        .lateral("latest")
+    )
+    with bind.connect() as conn:
+        return pl.read_database(
+            select(latest).select_from(Machine.__table__.join(latest, true())), connection=conn, infer_schema_length=None
+        )
+
+def predictions_frame(model: FailureModel, features: pl.DataFrame) -> pl.DataFrame:
+    """Riesgos en formato largo (machineID, comp, risk, features_at, model_version)."""
+    risk = model.predict(features)
+    wide = features.select("machineID", pl.col("datetime").alias("features_at")).with_columns(
+        [pl.Series(comp, risk[:, i]) for i, comp in enumerate(model.components)]
+    )
+    return (
+        wide.unpivot(index=["machineID", "features_at"], on=model.components, variable_name="comp", value_name="risk")
+        .with_columns(pl.lit(model.version).alias("model_version"))
+        .select("machineID", "comp", "risk", "features_at", "model_version")
+    )
+
+def score_fleet(features: pl.DataFrame | None = None, bind: Engine = job_engine, model: FailureModel | None = None) -> int:
+    """
+    Puntúa toda la flota en un solo lote y reemplaza los riesgos en 'failure_predictions'.
+
+    Por defecto usa la última fila de machine_features de cada máquina; también acepta un frame
+    con las mismas columnas y ventanas (p.ej. OnlineFeatureState.feature_frame()). Devuelve las filas escritas.
+    """
+    model = model or get_model()
+    features = latest_features(bind) if features is None else features
+    if features.is_empty():
+        return 0
+    predictions = predictions_frame(model, features)
+    with bind.begin() as conn:
+        FailurePrediction.__table__.create(conn, checkfirst=True)
+        written = upsert_frame(conn, FailurePrediction.__table__, predictions)
+        bump_data_version(conn)
+    return written
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Modelo de riesgo de falla: entrenamiento y scoring de la flota.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("train", help="Entrena el modelo con machine_features y lo guarda en FAILURE_MODEL_PATH.")
+    score = sub.add_parser("score", help="Puntúa la flota y escribe failure_predictions.")
+    score.add_argument("--loop", action="store_true", help="Repite cada SCORING_INTERVAL_SECONDS.")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        path = train_model().save()
+        print(f"✅ Modelo guardado en {path}")
+    else:
+        while True:
+            start = time.perf_counter()
+            rows = score_fleet()
+            print(f"✅ {rows:,} riesgos escritos en {time.perf_counter() - start:.2f}s.")
+            if not args.loop:
+                break
+            time.sleep(settings.SCORING_INTERVAL_SECONDS)
@@ -0,0 +1,142 @@
+# src/services/synthetic_data.py
+import argparse
+import logging
+import time
+from datetime import datetime
+from pathlib import Path
+import numpy as np
+import polars as pl
+
+from src.database.bulk_copy import COPY_DATETIME_FORMAT
+
+logger = logging.getLogger(__name__)
+
+# Mismo inicio y forma que el dataset original (Azure PdM: 100 máquinas, 2015, lecturas horarias)
+START = datetime(2015, 1, 1, 6)
+HOURS_PER_YEAR = 8760
+MODELS = ["model1", "model2", "model3", "model4"]
+
+# Media y desviación de cada sensor en el dataset original
+SENSOR_PROFILE = {"volt": (170.8, 15.5), "rotate": (446.6, 52.7), "pressure": (100.9, 11.0), "vibration": (40.4, 5.4)}
+
+# Eventos por máquina y año en el dataset original (3.919 errores, 761 fallas, 3.286 mantenimientos)
+ERROR_RATES = {"error1": 10.1, "error2": 9.9, "error3": 8.4, "error4": 7.3, "error5": 3.6}
+FAILURE_RATES = {"comp1": 1.9, "comp2": 2.6, "comp3": 1.3, "comp4": 1.8}
+# Mantenimiento preventivo: un componente cada ~15 días, siempre a las 06:00 (las fallas también generan su mantenimiento)
+SCHEDULED_MAINT_DAYS = 15
+
+# Antes de cada falla su sensor asociado deriva hasta +2σ (señal para el modelo de riesgo)
+# y con cierta probabilidad aparece su error asociado en las 24h previas
+FAILURE_SIGNATURE = {"comp1": ("volt", "error1"), "comp2": ("rotate", "error2"), "comp3": ("pressure", "error3"), "comp4": ("vibration", "error4")}
+PRECURSOR_HOURS = 48
+PRECURSOR_ERROR_PROBABILITY = 0.6
+
+# Máquinas generadas por tanda (acota la memoria: ~9k filas de telemetría por máquina y año)
+MACHINE_CHUNK = 100
+
+def event_times(rng: np.random.Generator, machines: np.ndarray, rate_per_year: float, hours: int, daily: bool) -> tuple[np.ndarray, np.ndarray]:
+    """(machineID, hora desde START) de eventos Poisson por máquina; 'daily' los deja a las 06:00 como en el original."""
+    counts = rng.poisson(rate_per_year * hours / HOURS_PER_YEAR, machines.size)
+    ids = np.repeat(machines, counts)
+    if daily:
+        offsets = rng.integers(1, max(hours // 24, 2), ids.size) * 24
+    else:
+        offsets = rng.integers(1, hours, ids.size)
+    return ids, offsets
+
+def events_frame(ids: np.ndarray, offsets: np.ndarray, column: str, values) -> pl.DataFrame:
+    return pl.DataFrame({
+        "datetime": np.datetime64(START, "us") + offsets.astype("timedelta64[h]"),
+        "machineID": ids,
+        column: values if not isinstance(values, str) else [values] * ids.size,
+    }, schema_overrides={column: pl.String})
+
+def generate_chunk(rng: np.random.Generator, machines: np.ndarray, hours: int) -> dict[str, pl.DataFrame]:
+    """Telemetría y eventos de una tanda de máquinas, con las fallas precedidas por su firma en los sensores."""
+    n = machines.size
+    sensors = {s: rng.normal(mean, sd, n * hours) for s, (mean, sd) in SENSOR_PROFILE.items()}
+
+    failures, errors, maint = [], [], []
+    for comp, rate in FAILURE_RATES.items():
+        ids, offsets = event_times(rng, machines, rate, hours, daily=True)
+        failures.append(events_frame(ids, offsets, "failure", comp))
+        maint.append(events_frame(ids, offsets, "comp", comp))
+
+        # Deriva lineal hasta +2σ en las PRECURSOR_HOURS previas (índice plano: máquina * hours + hora)
+        sensor, error = FAILURE_SIGNATURE[comp]
+        lags = np.arange(1, PRECURSOR_HOURS + 1)
+        rows = ((ids - machines[0]) * hours + offsets)[:, None] - lags
+        drift = np.broadcast_to(2 * SENSOR_PROFILE[sensor][1] * (1 - lags / PRECURSOR_HOURS), rows.shape)
+        valid = rows >= ((ids - machines[0]) * hours)[:, None]
+        np.add.at(sensors[sensor], rows[valid], drift[valid])
+
+        warned = rng.random(ids.size) < PRECURSOR_ERROR_PROBABILITY
+        errors.append(events_frame(ids[warned], np.maximum(offsets[warned] - rng.integers(1, 25, warned.sum()), 0), "errorID", error))
+
+    for error, rate in ERROR_RATES.items():
+        ids, offsets = event_times(rng, machines, rate, hours, daily=False)
+        errors.append(events_frame(ids, offsets, "errorID", error))
+
+    ids, offsets = event_times(rng, machines, 365 / SCHEDULED_MAINT_DAYS, hours, daily=True)
+    maint.append(events_frame(ids, offsets, "comp", rng.choice(list(FAILURE_RATES), ids.size)))
+
+    start = np.datetime64(START, "us")
+    telemetry = pl.DataFrame({
+        "datetime": np.tile(start + np.arange(hours).astype("timedelta64[h]"), n),
+        "machineID": np.repeat(machines, hours),
+        **sensors,
+    })
+    return {
+        "telemetry": telemetry,
+        "errors": pl.concat(errors).unique(maintain_order=True).sort("datetime", "machineID"),
+        "failures": pl.concat(failures).unique(maintain_order=True).sort("datetime", "machineID"),
+        "maint": pl.concat(maint).unique(maintain_order=True).sort("datetime", "machineID"),
+    }
+
+def generate_dataset(out_dir: Path, machines: int, years: float, seed: int = 0) -> dict[str, int]:
+    """
+    Escribe PdM_machines/telemetry/errors/failures/maint.csv con la forma de los originales
+    para 'machines' máquinas y 'years' años. Devuelve las filas escritas por archivo.
+
+    Se genera por tandas de MACHINE_CHUNK máquinas y cada tanda se agrega al CSV, así la
+    memoria no depende del tamaño total.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    hours = int(years * HOURS_PER_YEAR)
+
+    ids = np.arange(1, machines + 1)
+    pl.DataFrame({
+        "machineID": ids,
+        "model": rng.choice(MODELS, machines),
+        "age": rng.integers(0, 21, machines),
+    }).write_csv(out_dir / "PdM_machines.csv")
+    written = {"machines": machines}
+
+    files = {name: open(out_dir / f"PdM_{name}.csv", "wb") for name in ("telemetry", "errors", "failures", "maint")}
+    try:
+        for offset in range(0, machines, MACHINE_CHUNK):
+            chunk = generate_chunk(rng, ids[offset:offset + MACHINE_CHUNK], hours)
+            for name, df in chunk.items():
+                df.write_csv(files[name], include_header=offset == 0, datetime_format=COPY_DATETIME_FORMAT)
+                written[name] = written.get(name, 0) + df.height
+            logger.info(f"🧪 {min(offset + MACHINE_CHUNK, machines)}/{machines} máquinas generadas...")
+    finally:
+        for f in files.values():
+            f.close()
+    return written
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Genera CSV sintéticos con la forma de los PdM_*.csv originales.")
+    parser.add_argument("--machines", type=int, default=100)
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", type=Path, required=True, help="Directorio de salida (p.ej. Data/synthetic).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    rows = generate_dataset(args.out, args.machines, args.years, args.seed)
+    print(f"✅ Datos sintéticos en {args.out} ({time.perf_counter() - start:.1f}s): "
+          + ", ".join(f"{name} {n:,}" for name, n in rows.items()))
@@ -0,0 +1,16 @@
+# tests/conftest.py
+import os
+
+# Settings exige estas variables al importar src; los tests no abren conexiones (los engines son perezosos)
+for name, value in {
+    "ENVIRONMENT": "test",
+    "PROJECT_NAME": "pdm-tests",
+    "ALLOWED_ORIGINS": "*",
+    "WEBSITE_URL": "http://localhost",
+    "DB_USER": "postgres",
+    "DB_PASSWORD": "postgres",
+    "DB_HOST": "localhost",
+    "DB_PORT": "5432",
+    "DB_NAME": "pdm",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,29 @@
+# tests/test_health.py
+import asyncio
+
+from src.services import health
+from src.services.health import HealthMonitor
+from src.services.query_cache import DATA_SCOPE, query_cache
+
+def cache_check() -> dict:
+    return asyncio.run(HealthMonitor(ttl=0, timeout=1)._cache())
+
+def test_cache_reads_versions_instead_of_memoized_value(monkeypatch):
+    # Aunque la caché tenga una versión memorizada, el chequeo vuelve a leer (y ve la caída)
+    monkeypatch.setattr(query_cache, "_versions", {DATA_SCOPE: 7})
+
+    def unreachable():
+        raise ConnectionError("la base de datos no responde")
+    monkeypatch.setattr(health, "read_data_versions", unreachable)
+    report = cache_check()
+    assert report == {"ok": False, "error": "la base de datos no responde"}
+
+def test_cache_without_versions_is_not_ready(monkeypatch):
+    monkeypatch.setattr(health, "read_data_versions", lambda: {})
+    assert cache_check()["ok"] is False
+
+def test_cache_with_versions_is_ready(monkeypatch):
+    monkeypatch.setattr(health, "read_data_versions", lambda: {DATA_SCOPE: 3})
+    report = cache_check()
+    assert report["ok"] is True
+    assert report["data_version"] == 3
@@ -0,0 +1,78 @@
+# tests/test_push_ingestion.py
+import asyncio
+from datetime import datetime
+import polars as pl
+
+from src.services import push_ingestion
+from src.services.push_ingestion import PUSH_SCHEMA, TelemetryBuffer
+
+def readings(n: int) -> pl.DataFrame:
+    return pl.DataFrame({
+        "datetime": [datetime(2016, 1, 1, hour) for hour in range(n)],
+        "machineID": [1] * n,
+        "volt": [170.0] * n,
+        "rotate": [450.0] * n,
+        "pressure": [100.0] * n,
+        "vibration": [40.0] * n,
+    }, schema=PUSH_SCHEMA)
+
+def flaky_writer(failures: int):
+    """Escritor que falla las primeras 'failures' llamadas y después escribe todo el lote."""
+    calls = []
+
+    def write(batch: pl.DataFrame, bind) -> tuple[int, int]:
+        calls.append(batch.height)
+        if len(calls) <= failures:
+            raise ConnectionError("la base de datos no responde")
+        return batch.height, 0
+    return write, calls
+
+def test_failed_flush_is_written_on_next_flush(monkeypatch):
+    write, calls = flaky_writer(failures=1)
+    monkeypatch.setattr(push_ingestion, "write_telemetry_batch", write)
+    buffer = TelemetryBuffer(flush_rows=100, flush_seconds=1, max_rows=100)
+
+    async def scenario():
+        assert buffer.offer(readings(3))
+        assert await buffer.flush() == 0
+        assert buffer.retrying and buffer.queued == 3
+        assert await buffer.flush() == 3
+    asyncio.run(scenario())
+
+    assert calls == [3, 3]
+    assert not buffer.retrying and buffer.queued == 0
+    stats = buffer.stats()
+    assert (stats["flushed"], stats["failed"], stats["retries"]) == (3, 0, 1)
+
+def test_requeued_batch_goes_first_and_counts_toward_the_cap(monkeypatch):
+    write, calls = flaky_writer(failures=1)
+    monkeypatch.setattr(push_ingestion, "write_telemetry_batch", write)
+    buffer = TelemetryBuffer(flush_rows=100, flush_seconds=1, max_rows=5)
+    first, second = readings(4), readings(2).with_columns(pl.col("machineID") + 1)
+
+    async def scenario():
+        assert buffer.offer(first)
+        await buffer.flush()
+        # El lote fallido sigue ocupando la cola: uno que supere el tope se rechaza
+        assert not buffer.offer(second)
+        assert buffer.offer(second.head(1))
+        assert await buffer.flush() == 5
+    asyncio.run(scenario())
+
+    assert calls == [4, 5]
+    assert buffer.stats()["dropped"] == 2
+
+def test_rows_count_as_failed_only_when_discarded(monkeypatch):
+    write, calls = flaky_writer(failures=10)
+    monkeypatch.setattr(push_ingestion, "write_telemetry_batch", write)
+    buffer = TelemetryBuffer(flush_rows=100, flush_seconds=1, max_rows=100, retry_attempts=2, retry_base_seconds=0)
+
+    async def scenario():
+        assert buffer.offer(readings(3))
+        await buffer.stop()
+    asyncio.run(scenario())
+
+    assert calls == [3, 3, 3]
+    assert buffer.queued == 0 and not buffer.retrying
+    stats = buffer.stats()
+    assert (stats["failed"], stats["retries"]) == (3, 2)